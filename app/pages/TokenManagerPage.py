@@ -15,8 +15,8 @@ from utils.symbol_resolver import SymbolResolver
 from brokers.angel_client import AngelClient
 from datetime import datetime
 import pandas as pd
-from config.TradeFriendConfig import SEARCH_DELAY
 from db.tradefindinstrument_db import TradeFindDB
+from utils.symbol_search_index import TradeFriendSymbolSearchIndex
 logger = logging.getLogger(__name__)
 
 class TokenManagerPage(tb.Frame):
@@ -33,6 +33,9 @@ class TokenManagerPage(tb.Frame):
 
         # Memory cache
         self.all_tokens = self.db.get_all() or []  # list of all tokens
+        self.symbol_search = TradeFriendSymbolSearchIndex(
+            [t.get("symbol", "") for t in self.all_tokens]
+        )
         self.token_vars = {}  # checkbox variables keyed by symbol
 
         # --- Search Frame ---
@@ -104,9 +107,9 @@ class TokenManagerPage(tb.Frame):
         query = self.search_var.get().lower().strip()
         tokens = self.all_tokens.copy()
 
-        # Apply search filter
+        # Apply search filter (substring, table order kept)
         if query:
-            tokens = [t for t in tokens if query in t.get("symbol","").lower()]
+            tokens = [self.all_tokens[i] for i in self.symbol_search.filter_ids(query)]
 
         # Apply active/inactive filter
         f = self.filter_var.get()
@@ -297,8 +300,7 @@ class TokenManagerPage(tb.Frame):
             self.refresh_table()
             return
 
-        all_symbols = [t["symbol"] for t in self.all_tokens]
-        suggestions = [s for s in all_symbols if value in s.lower()]
+        suggestions = self.symbol_search.search(value, limit=20)
 
         if suggestions:
             self.lb_autocomplete.delete(0, tk.END)
@@ -567,8 +569,6 @@ class TokenManagerPage(tb.Frame):
             # -------------------------------------------------
             for symbol in symbols:
                 try:
-                    time.sleep(SEARCH_DELAY + random.uniform(0, 0.2))
-    
                     search_name = symbol.replace("-EQ", "")
                     result = self.helper.search_symbol("NSE", search_name)
     
@@ -26,8 +26,9 @@ class TradeAnalysisTab(ttk.Frame):
         ttk.Radiobutton(top_frame, text="By Name", variable=self.mode_var, value="name", bootstyle="primary").grid(row=0, column=1, padx=5, pady=5)
         ttk.Radiobutton(top_frame, text="By Symbol", variable=self.mode_var, value="symbol", bootstyle="primary").grid(row=0, column=2, padx=5, pady=5)
 
-        self.input_symbol = ttk.Entry(top_frame)
+        self.input_symbol = ttk.Combobox(top_frame)
         self.input_symbol.grid(row=1, column=0, columnspan=2, padx=5, pady=5, sticky=EW)
+        self.input_symbol.bind("<KeyRelease>", self.on_input_keyrelease)
 
         self.btn_resolve = ttk.Button(top_frame, text="Resolve Symbol", bootstyle="success", command=self.resolve_symbol)
         self.btn_resolve.grid(row=1, column=2, padx=5, pady=5, sticky=EW)
@@ -84,6 +85,20 @@ class TradeAnalysisTab(ttk.Frame):
         self.output_area = ttk.Text(self, height=15, wrap="word")
         self.output_area.pack(fill=BOTH, expand=True, padx=10, pady=10)
 
+    def on_input_keyrelease(self, event):
+        """
+        Autocomplete from the shared search index (names or NSE symbols).
+        """
+        value = self.input_symbol.get().strip()
+        if len(value) < 2:
+            self.input_symbol.configure(values=[])
+            return
+        if self.mode_var.get() == "name":
+            suggestions = SymbolResolver.search_by_name(value)
+        else:
+            suggestions = self.resolver.index.search_symbols(value, limit=20)
+        self.input_symbol.configure(values=suggestions)
+
     def resolve_symbol(self):
         value = self.input_symbol.get().strip()
         if not value:
@@ -94,10 +109,14 @@ class TradeAnalysisTab(ttk.Frame):
             if mode == "name":
                 logger.info(f"TradeAnalysis Search by name: {value}")
                 resolved = self.resolver.get_symbol_tradefinder(value)
+                if not resolved:
+                    raise ValueError(f"No instrument matches '{value}'")
                 self.selected_symbol = f'{resolved["trading_symbol"]}-EQ'
             else:
                 logger.info(f"TradeAnalysis Search by symbol: {value}")
                 resolved = self.resolver.resolve_symbol(value)
+                if not resolved:
+                    raise ValueError(f"Token not found for {value}")
                 self.selected_symbol = f'{resolved["trading_symbol"]}'
 
             if resolved:
@@ -1,5 +1,6 @@
 import threading
 import tkinter.messagebox as messagebox
+import tkinter.simpledialog as simpledialog
 from tkinter import ttk, StringVar
 from datetime import datetime, time
 
@@ -31,7 +32,6 @@ class TradeFriendDashboard(ttk.Frame):
         self.provider = TradeFriendDataProvider()
         
         self.trade_mode = self.settings_repo.get_trade_mode()
-        self.ltp_cache = {}
 
         # 🕒 5-MIN TRIGGER STATE
         self._last_trigger_minute = None
@@ -120,6 +120,12 @@ class TradeFriendDashboard(ttk.Frame):
             command=self.run_manual_wrapper
         ).pack(side="left", padx=5)
 
+        ttk.Button(
+            bar,
+            text="🎯 Rescan",
+            command=self.run_rescan
+        ).pack(side="left", padx=5)
+
         ttk.Button(
             bar,
             text="🔄 Refresh",
@@ -207,6 +213,9 @@ class TradeFriendDashboard(ttk.Frame):
             active = self.trade_repo.fetch_active_trades()
             history = self.trade_history_repo.fetch_recent_closed()
 
+            # ---------------- LTP PREFETCH (ONE BULK CALL) ----------------
+            self._prefetch_ltps(dict(r).get("symbol") for r in active)
+
             # ---------------- KPI (ACTIVE ONLY) ----------------
             total_pnl = 0.0
             win = 0
@@ -365,34 +374,26 @@ class TradeFriendDashboard(ttk.Frame):
     from datetime import datetime, time
 
 
+    def _prefetch_ltps(self, symbols):
+        symbols = [s for s in symbols if s]
+        if not symbols:
+            return
+        try:
+            # Warms the shared quote cache → per-row reads below are hits
+            self.provider.get_ltp_many(symbols, consumer="dashboard")
+        except Exception as e:
+            logger.warning(f"LTP prefetch failed: {e}")
+
     def _get_ltp_cached(self, symbol):
-        now = datetime.now()
-        weekday = now.weekday()   # 0=Mon, 6=Sun
-        current_time = now.time()
-
-        # market_closed = (
-        #     weekday in (5, 6) or                         # Sat, Sun
-        #     current_time < time(9, 15) or                # Before market
-        #     current_time > time(15, 30)                   # After market
-        # )
-
-        # # ---------------- Market Closed ----------------
-        # if market_closed:
-        #     cached = self.ltp_cache.get(symbol)
-        #     return cached[0] if cached else None
-
-        # ---------------- Market Open ----------------
+        """
+        Shared quote cache (dashboard policy: 60s fresh, stale values
+        served while a background refresh runs).
+        """
         try:
-            ltp = self.provider.get_ltp_byLtp(symbol)
-            if ltp:
-                self.ltp_cache[symbol] = (ltp, now)
-                return ltp
+            return self.provider.get_ltp_byLtp(symbol, consumer="dashboard")
         except Exception:
-            pass
-
-        # ---------------- Fallback ----------------
-        cached = self.ltp_cache.get(symbol)
-        return cached[0] if cached else None
+            quote = self.provider.quote_cache.peek(symbol)
+            return quote["ltp"] if quote else None
 
 
     def toggle_trade_mode(self):
@@ -420,6 +421,33 @@ class TradeFriendDashboard(ttk.Frame):
     def run_monitor(self):
         self._run_bg(lambda: self.manager.tf_monitor())
 
+    def run_rescan(self):
+        """
+        Rescan the selected watchlist symbols now (or the symbols typed
+        in), re-evaluating them even if their inputs did not change.
+        """
+        symbols = [
+            self.watchlist_table.item(item, "values")[0]
+            for item in self.watchlist_table.selection()
+        ]
+        if not symbols:
+            text = simpledialog.askstring(
+                "Rescan", "Symbols to rescan (comma separated):", parent=self
+            )
+            symbols = [s.strip().upper() for s in (text or "").split(",") if s.strip()]
+        if not symbols:
+            return
+
+        def task():
+            result = self.manager.tf_rescan(symbols, force=True)
+            self.after(0, lambda: messagebox.showinfo(
+                "Rescan",
+                f"VALID={len(result['valid'])} | REJECTED={len(result['rejected'])} | "
+                f"SKIPPED={len(result['skipped'])}"
+            ))
+
+        self._run_bg(task)
+
     def _run_bg(self, task):
         threading.Thread(
             target=lambda: (task(), self.after(0, self.refresh_data)),
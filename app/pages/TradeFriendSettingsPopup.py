@@ -1,8 +1,12 @@
 # ui/TradeFriendSettingsPopup.py
 
+import threading
 import tkinter as tk
 from tkinter import ttk, messagebox
 from db.TradeFriendSettingsRepo import TradeFriendSettingsRepo
+from db.TradeFriendScanJournalRepo import TradeFriendScanJournalRepo
+from db.TradeFriendWatchlistRepo import TradeFriendWatchlistRepo
+from utils.TradeFriendManager import TradeFriendManager
 
 
 class TradeFriendSettingsPopup(tk.Toplevel):
@@ -123,6 +127,12 @@ class TradeFriendSettingsPopup(tk.Toplevel):
         self.fixed_mode.set(row["target_sl_mode"] == "FIXED")
         self._toggle_fixed()
 
+    def _rescan_bg(self, symbols):
+        threading.Thread(
+            target=lambda: TradeFriendManager().tf_rescan(symbols, force=True),
+            daemon=True
+        ).start()
+
     def _save(self):
         try:
             data = {}
@@ -139,7 +149,17 @@ class TradeFriendSettingsPopup(tk.Toplevel):
                 data["available_swing_capital"] = data["max_swing_capital"]
 
             self.repo.update(data)
-            messagebox.showinfo("Saved", "Settings updated")
+
+            # Carried scan outcomes were computed under the old settings
+            TradeFriendScanJournalRepo().clear_fingerprints()
+
+            symbols = sorted(TradeFriendWatchlistRepo().get_all_symbols())
+            if symbols and messagebox.askyesno(
+                "Saved", f"Settings updated.\n\nRescan the {len(symbols)} watchlist symbols now?"
+            ):
+                self._rescan_bg(symbols)
+            else:
+                messagebox.showinfo("Saved", "Settings updated")
             self.destroy()
 
         except Exception as e:
@@ -9,12 +9,14 @@ Usage:
 ================================================================================
 """
 import time
-import pyotp
-from SmartApi import SmartConnect
 from utils.logger import get_logger
+from brokers.tradefriend_rate_limiter import rate_limited
+from brokers.tradefriend_circuit_breaker import CircuitOpenError, guarded_call, backoff_delay
+from brokers.tradefriend_angel_session import get_angel_session
 import pandas as pd
 from datetime import datetime, timedelta
-from config.settings import api_key, username, pin, totp_qr,DEFAULT_INTERVAL,LOOKBACK_DAYS, RangeBoundLOOKBACK_DAYS
+from config.settings import username, DEFAULT_INTERVAL, LOOKBACK_DAYS, RangeBoundLOOKBACK_DAYS
+from config.TradeFriendConfig import BULK_QUOTE_MAX_TOKENS, BACKOFF_BASE_SEC
 
 logger = get_logger(__name__)
 
@@ -44,33 +46,44 @@ class AngelClient:
     def __init__(self):
         if self._initialized:
             return
-        self.smart_api = None
+        self.session = get_angel_session()
+        self.client_code = username
         self.login()
         self._initialized = True
 
+    # --------------------------------------------------
+    # SESSION (shared with the order adapter)
+    # --------------------------------------------------
+    @property
+    def smart_api(self):
+        """SmartConnect of the shared session (refreshed ahead of expiry)."""
+        return self.session.get_client()
+
+    @property
+    def auth_token(self):
+        return self.session.jwt_token
+
+    @property
+    def feed_token(self):
+        return self.session.feed_token
 
     # ================================================================================
-    def login(self):
-        """Login to SmartAPI and store session if successful."""
-        try:
-            smart_api = SmartConnect(api_key=api_key)
-            totp = pyotp.TOTP(totp_qr).now()
-            data = smart_api.generateSession(username, pin, totp)
-
-            if data.get("status", False):
-                self.smart_api = smart_api
-                logger.info(" Logged in to Angel One SmartAPI")
-            else:
-                logger.error(" Angel One login failed")
-        except Exception as e:
-            logger.error(f"SmartAPI login error: {e}")
+    def login(self, force: bool = False):
+        """
+        Ensure a live SmartAPI session (persisted → refresh → TOTP login).
+        `force` re-validates after the broker rejected the current JWT.
+        """
+        if self.session.get_client(force_login=force) is None:
+            logger.error(" Angel One login failed")
 
     # ================================================================================
     def get_ltp(self, resolved_symbol: dict):
         """Fetch LTP for a single resolved symbol."""
         try:
             logger.info(f"Fetched LTP for {resolved_symbol['symbol']}")
-            data = self.smart_api.ltpData(
+            data = guarded_call(
+                "ltp",
+                self.smart_api.ltpData,
                 resolved_symbol["exchange"],
                 resolved_symbol["symbol"],
                 str(resolved_symbol["token"])
@@ -98,13 +111,72 @@ class AngelClient:
 
     # ================================================================================
     def get_ltp_bulk(self, resolved_list):
-        """Fetch LTP for multiple resolved symbols."""
+        """Fetch LTP for multiple resolved symbols (batched getMarketData)."""
+        quotes = self.get_quotes_bulk(resolved_list)
+        results = {
+            symbol: q["ltp"] for symbol, q in quotes.items()
+            if q.get("ltp") is not None
+        }
+        logger.info(f"Fetched LTP for {len(results)} symbols.")
+        return results
+
+    # ================================================================================
+    def get_quotes_bulk(self, resolved_list, mode="FULL"):
+        """
+        Fetch LTP / OHLC / volume for many resolved symbols with
+        getMarketData — up to BULK_QUOTE_MAX_TOKENS tokens per request.
+
+        Returns:
+            dict: {symbol: {ltp, open, high, low, close, volume}}
+        """
         results = {}
+        if not resolved_list:
+            return results
+
+        # exchange → token → [symbols]  (one token may back several names)
+        by_exchange = {}
         for item in resolved_list:
-            ltp = self.get_ltp(item)
-            if ltp is not None:
-                results[item["symbol"]] = ltp
-        logger.info(f"Fetched LTP for {len(results)} symbols.")
+            exchange = item.get("exchange") or "NSE"
+            token = str(item["token"])
+            by_exchange.setdefault(exchange, {}).setdefault(token, []).append(item["symbol"])
+
+        for exchange, token_map in by_exchange.items():
+            tokens = list(token_map.keys())
+
+            for i in range(0, len(tokens), BULK_QUOTE_MAX_TOKENS):
+                chunk = tokens[i:i + BULK_QUOTE_MAX_TOKENS]
+                try:
+                    response = guarded_call(
+                        "quote",
+                        self.smart_api.getMarketData,
+                        mode=mode,
+                        exchangeTokens={exchange: chunk}
+                    )
+                except CircuitOpenError as e:
+                    logger.warning(f"🚫 Bulk quote skipped | {e}")
+                    break
+                except Exception as e:
+                    logger.error(f"Bulk quote failed | {exchange} | {len(chunk)} tokens | {e}")
+                    continue
+
+                data = (response or {}).get("data") or {}
+                for row in data.get("fetched") or []:
+                    quote = {
+                        "ltp": _to_float(row.get("ltp")),
+                        "open": _to_float(row.get("open")),
+                        "high": _to_float(row.get("high")),
+                        "low": _to_float(row.get("low")),
+                        "close": _to_float(row.get("close")),
+                        "volume": _to_float(row.get("tradeVolume")),
+                    }
+                    for symbol in token_map.get(str(row.get("symbolToken")), []):
+                        results[symbol] = quote
+
+                unfetched = data.get("unfetched") or []
+                if unfetched:
+                    logger.warning(f"⚠️ Bulk quote unfetched | {exchange} | {unfetched}")
+
+        logger.info(f"Fetched quotes for {len(results)}/{len(resolved_list)} symbols.")
         return results
 
     # ================================================================================
@@ -119,12 +191,23 @@ class AngelClient:
         """
         try:
             logger.info(f" Searching symbol {symbol} in Angel API...")
-            result = self.smart_api.searchScrip(exchange, symbol)
+            result = guarded_call("search", self.smart_api.searchScrip, exchange, symbol)
             return result
         except Exception as e:
             logger.error(f"Search failed for {symbol}: {e}")
             return {}
 
+    # ================================================================================
+    def _get_candle_data(self, params: dict):
+        """
+        getCandleData that RAISES on the broker's throttle reply, so the
+        breaker counts it as a failure instead of an empty answer.
+        """
+        data = self.smart_api.getCandleData(params)
+        if isinstance(data, dict) and _is_throttled(data.get("message")):
+            raise RuntimeError(f"Angel throttled: {data.get('message')}")
+        return data
+
     # ================================================================================
     def get_historical_data(
         self,
@@ -133,10 +216,18 @@ class AngelClient:
         interval=DEFAULT_INTERVAL,
         days=None,
         max_retries=3,
-        delay=2
+        delay=BACKOFF_BASE_SEC,
+        from_date=None
     ):
         """
         Fetch historical OHLC candles with retry & session reset handling.
+
+        from_date (optional) overrides the `days` window — used by the
+        candle store to request only bars after the last stored one.
+
+        Returns None on failure (circuit open, throttled, retries
+        exhausted) and an EMPTY frame when the broker answered with no
+        bars — callers can tell "nothing new" from "fetch failed".
         """
         session_reset_done = False
         if days is None:
@@ -146,7 +237,8 @@ class AngelClient:
         for attempt in range(1, max_retries + 1):
             try:
                 to_date = datetime.now()
-                from_date = to_date - timedelta(days=days)
+                if from_date is None:
+                    from_date = to_date - timedelta(days=days)
                 logger.info(f"For ({token}) Date Range : from_date {from_date}  to_date {to_date}.")
                 params = {
                     "exchange": "NSE",
@@ -157,7 +249,7 @@ class AngelClient:
                     "symbol": symbol,
                 }
 
-                data = self.smart_api.getCandleData(params)
+                data = guarded_call("candles", self._get_candle_data, params)
                 msg = data.get("message", "Unknown error") if isinstance(data, dict) else "No response"
 
                 if not data or "data" not in data:
@@ -166,11 +258,11 @@ class AngelClient:
 
                 if isinstance(data.get("data"), list) and len(data["data"]) == 0:
                     logger.warning(f"{symbol} ({token}) → No historical data available (empty list)")
-                    return None
+                    return pd.DataFrame(columns=["datetime", "open", "high", "low", "close", "volume"])
 
                 if "Session" in msg and not session_reset_done:
                     logger.warning("⚠️ Session expired. Re-logging in...")
-                    self.login()
+                    self.login(force=True)
                     session_reset_done = True
                     continue
 
@@ -181,6 +273,10 @@ class AngelClient:
                 df["datetime"] = pd.to_datetime(df["datetime"])
                 return df
 
+            except CircuitOpenError as e:
+                logger.warning(f"🚫 {symbol} ({token}) skipped | {e}")
+                return None
+
             except Exception as e:
                 err_msg = str(e)
                 logger.error(f"Attempt {attempt}/{max_retries} failed for {symbol} ({token}): {err_msg}")
@@ -189,8 +285,9 @@ class AngelClient:
                     return None
 
             if attempt < max_retries:
-                logger.info(f"Retrying {symbol} ({token}) after {delay}s...")
-                time.sleep(delay)
+                wait = backoff_delay(attempt, base=delay)
+                logger.info(f"Retrying {symbol} ({token}) after {wait:.1f}s...")
+                time.sleep(wait)
 
         logger.error(f" Failed to fetch candles for {symbol} ({token}) after {max_retries} attempts")
         return None
@@ -203,7 +300,7 @@ class AngelClient:
         interval=DEFAULT_INTERVAL,
         days=None,
         max_retries=3,
-        delay=2
+        delay=BACKOFF_BASE_SEC
     ):
         """
         Fetch historical OHLC candles with retry & session reset handling.
@@ -227,7 +324,7 @@ class AngelClient:
                     "symbol": symbol,
                 }
 
-                data = self.smart_api.getCandleData(params)
+                data = guarded_call("candles", self._get_candle_data, params)
                 msg = data.get("message", "Unknown error") if isinstance(data, dict) else "No response"
 
                 if not data or "data" not in data:
@@ -240,7 +337,7 @@ class AngelClient:
 
                 if "Session" in msg and not session_reset_done:
                     logger.warning("⚠️ Session expired. Re-logging in...")
-                    self.login()
+                    self.login(force=True)
                     session_reset_done = True
                     continue
 
@@ -251,6 +348,10 @@ class AngelClient:
                 df["datetime"] = pd.to_datetime(df["datetime"])
                 return df
 
+            except CircuitOpenError as e:
+                logger.warning(f"🚫 {symbol} ({token}) skipped | {e}")
+                return None
+
             except Exception as e:
                 err_msg = str(e)
                 logger.error(f"Attempt {attempt}/{max_retries} failed for {symbol} ({token}): {err_msg}")
@@ -259,8 +360,9 @@ class AngelClient:
                     return None
 
             if attempt < max_retries:
-                logger.info(f"Retrying {symbol} ({token}) after {delay}s...")
-                time.sleep(delay)
+                wait = backoff_delay(attempt, base=delay)
+                logger.info(f"Retrying {symbol} ({token}) after {wait:.1f}s...")
+                time.sleep(wait)
 
         logger.error(f" Failed to fetch candles for {symbol} ({token}) after {max_retries} attempts")
         return None
@@ -269,7 +371,7 @@ class AngelClient:
     # ================================================================================
     def get_intraday_candles(self, symbol: str, token: str, interval="FIFTEEN_MINUTE", lookback_days=5):
             """
-            Fetch intraday candles for the last N days using live market data (FULL mode).
+            Fetch intraday candles for the last N days (getCandleData).
 
             Args:
                 symbol (str): Symbol name (e.g., "RELIANCE")
@@ -283,61 +385,32 @@ class AngelClient:
                         "prev": last 3 candles of previous trading day,
                         "today": candles of the current day
                     }
+
+            Live, tick-built bars come from TradeFriendCandleAggregator
+            (via TradeFriendDataProvider.get_intraday_data).
             """
             try:
-                import pandas as pd
-                from datetime import datetime
-
-                # Interval mapping
-                interval_map = {
-                    "ONE_MINUTE": "1T",
-                    "FIVE_MINUTE": "5T",
-                    "FIFTEEN_MINUTE": "15T"
-                }
-                resample_interval = interval_map.get(interval, "15T")
-
-                # Fetch live market data
-                exchangeTokens = {"1": [14552]}
-               
-                marketData = self.smart_api.getMarketData(mode="FULL", exchangeTokens=exchangeTokens)
-
-                if not marketData or "NSE" not in marketData or token not in marketData["NSE"]:
-                    logger.error(f" No market data available for {symbol} ({token})")
-                    return {"prev": pd.DataFrame(), "today": pd.DataFrame()}
+                candles = self.get_historical_data(
+                    symbol=symbol,
+                    token=token,
+                    interval=interval,
+                    days=lookback_days
+                )
 
-                ticks = marketData["NSE"][token]
-                if not ticks:
-                    logger.warning(f" No ticks found for {symbol} ({token})")
+                if candles is None or candles.empty:
+                    logger.error(f" No intraday candles available for {symbol} ({token})")
                     return {"prev": pd.DataFrame(), "today": pd.DataFrame()}
 
-                # Convert ticks to DataFrame
-                df = pd.DataFrame(ticks)
-                df["datetime"] = pd.to_datetime(df["timestamp"], unit="ms")
-                df.sort_values("datetime", inplace=True)
-
-                # Aggregate into OHLCV candles
-                candles = df.resample(resample_interval, on="datetime").agg({
-                    "open": "first",
-                    "high": "max",
-                    "low": "min",
-                    "close": "last",
-                    "volume": "sum"
-                })
-                candles.dropna(inplace=True)
-                candles.reset_index(inplace=True)
+                candles = candles.sort_values("datetime").reset_index(drop=True)
                 candles["date"] = candles["datetime"].dt.date
 
                 today_date = pd.Timestamp.today().date()
-                trading_days = sorted(d for d in candles["date"].unique() if d <= today_date)
-
-                prev_day_last3 = pd.DataFrame()
-                today_candles = pd.DataFrame()
 
                 # Previous trading day last 3 candles
-                prev_days = [d for d in trading_days if d < today_date]
-                if prev_days:
-                    prev_day_last = prev_days[-1]
-                    prev_day_last3 = candles[candles["date"] == prev_day_last].tail(3)
+                prev_day_last3 = pd.DataFrame()
+                prev_days = candles.loc[candles["date"] < today_date, "date"]
+                if not prev_days.empty:
+                    prev_day_last3 = candles[candles["date"] == prev_days.iloc[-1]].tail(3)
 
                 # Today’s candles
                 today_candles = candles[candles["date"] == today_date]
@@ -375,6 +448,7 @@ class AngelClient:
             if not self.smart_api:
                 raise Exception("Angel client not logged in")
 
+            rate_limited("orders")
             order_id = self.smart_api.placeOrder(payload)
             return order_id
 
@@ -382,6 +456,19 @@ class AngelClient:
             logger.error(f"Angel place_order failed: {e}")
             raise
 
+
+def _is_throttled(message) -> bool:
+    text = str(message or "").lower()
+    return "access rate" in text or "exceeding" in text or "too many" in text
+
+
+def _to_float(value):
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
 # ================================================================================
 # Singleton-style Helper Functions
 # ================================================================================
@@ -1,11 +1,11 @@
 # brokers/tradefriend_angel_order_adapter.py
 
 import logging
-import pyotp
-from SmartApi import SmartConnect
 
-from config.settings import api_key, username, pin, totp_qr
 from db.tradefindinstrument_db import TradeFindDB
+from brokers.tradefriend_rate_limiter import rate_limited
+from brokers.tradefriend_angel_session import get_angel_session
+from utils.instrument_index import get_instrument_index
 
 logger = logging.getLogger(__name__)
 
@@ -15,7 +15,8 @@ class TradeFriendAngelOrderAdapter:
     PURPOSE:
     - Place LIVE orders via AngelOne SmartAPI
     - NSE Equity only
-    - Token resolution strictly from TradeFindDB
+    - Token resolution strictly from TradeFindDB (active rows only);
+      rows stored without a token are filled from the instrument index
     - OMS-compatible adapter
     """
 
@@ -26,30 +27,16 @@ class TradeFriendAngelOrderAdapter:
     DURATION = "DAY"
 
     def __init__(self):
-        self.client = None
+        self.session = get_angel_session()
         self.instrument_repo = TradeFindDB()
-        self._login()
+        self.instrument_index = get_instrument_index()
 
     # --------------------------------------------------
-    # LOGIN
+    # SESSION (shared with AngelClient, no login per instance)
     # --------------------------------------------------
-    def _login(self):
-        try:
-            smart = SmartConnect(api_key)
-            totp = pyotp.TOTP(totp_qr).now()
-
-            data = smart.generateSession(username, pin, totp)
-            if not data.get("status"):
-                raise Exception(data)
-
-            smart.generateToken(data["data"]["refreshToken"])
-            self.client = smart
-
-            logger.info("✅ AngelOne login successful")
-
-        except Exception:
-            logger.exception("❌ AngelOne login failed")
-            self.client = None
+    @property
+    def client(self):
+        return self.session.get_client()
 
     # --------------------------------------------------
     # PLACE ORDER (OMS ENTRY POINT)
@@ -68,7 +55,8 @@ class TradeFriendAngelOrderAdapter:
         }
         """
 
-        if not self.client:
+        client = self.client
+        if not client:
             logger.error("Angel client not initialized")
             return False
 
@@ -83,6 +71,11 @@ class TradeFriendAngelOrderAdapter:
             resolved = self.instrument_repo.resolve_active_symbol(symbol)
             if not resolved:
                 raise Exception(f"Token not found in DB for {symbol}")
+            if not resolved["token"]:
+                row = self.instrument_index.by_symbol(resolved["symbol"])
+                if not row:
+                    raise Exception(f"Token not found for {resolved['symbol']}")
+                resolved["token"] = row["token"]
 
             params = {
                 "variety": self.VARIETY,
@@ -97,7 +90,8 @@ class TradeFriendAngelOrderAdapter:
                 "quantity": qty,
             }
 
-            order_id = self.client.placeOrder(params)
+            rate_limited("orders")
+            order_id = client.placeOrder(params)
 
             logger.info(
                 f"✅ Angel order placed | "
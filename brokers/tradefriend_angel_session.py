@@ -0,0 +1,309 @@
+# brokers/tradefriend_angel_session.py
+
+import os
+import json
+import time
+import base64
+import threading
+
+from config.settings import api_key, username, pin, totp_qr
+from config.TradeFriendConfig import (
+    SESSION_REFRESH_AHEAD_SEC, SESSION_DEFAULT_TTL_SEC, SESSION_LOGIN_RETRY_SEC,
+    BROKER_MODE
+)
+from brokers.tradefriend_circuit_breaker import guarded_call
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# -------------------------------------------------
+# SESSION FILE (tokens only — never credentials)
+# -------------------------------------------------
+SESSION_FOLDER = "dbdata"
+SESSION_FILE = os.path.join(SESSION_FOLDER, "angel_session.json")
+
+# ------------------------------------------------------------------------
+# Singleton Session Holder
+# ------------------------------------------------------------------------
+_session = None
+_session_lock = threading.Lock()
+
+
+# ================================================================================
+# CLASS: TradeFriendAngelSession
+# ================================================================================
+class TradeFriendAngelSession:
+    """
+    PURPOSE:
+    - ONE Angel SmartAPI session per process (data + order paths)
+    - Owns JWT / refresh / feed tokens and their expiry
+    - Persists tokens to disk → cold restarts skip the TOTP login
+    - Refreshes ahead of expiry (generateToken), full login only
+      when the refresh token is gone or rejected
+
+    ORDER OF PREFERENCE:
+    1. In-memory session still valid
+    2. Persisted session still valid (no network call)
+    3. Refresh with refreshToken
+    4. Full TOTP generateSession
+    """
+
+    def __init__(self, session_file: str = SESSION_FILE):
+        self.session_file = session_file
+        self._lock = threading.RLock()
+
+        self.smart = None
+        self.jwt_token = None
+        self.refresh_token = None
+        self.feed_token = None
+        self.client_code = username
+        self.expires_at = 0.0
+
+        self._last_login_failure = 0.0
+        self._cassette_client = None
+
+    # --------------------------------------------------
+    # PUBLIC
+    # --------------------------------------------------
+    def get_client(self, force_login: bool = False):
+        """
+        SmartConnect with a valid session, or None when login fails.
+        Cheap when the session is valid (timestamp check only).
+        BROKER_MODE=REPLAY / RECORD swaps in the cassette clients.
+        """
+        if BROKER_MODE == "REPLAY":
+            return self._replay_client()
+
+        smart = self._live_client(force_login)
+        if smart is not None and BROKER_MODE == "RECORD":
+            return self._recording_client(smart)
+        return smart
+
+    def _live_client(self, force_login: bool = False):
+        if not force_login and self.smart is not None and not self._expiring():
+            return self.smart
+
+        with self._lock:
+            if force_login:
+                # JWT rejected by the broker — the refresh token may still work
+                self.expires_at = 0.0
+            elif self.smart is not None and not self._expiring():
+                return self.smart
+
+            if self.smart is None and self._load() and not self._expiring():
+                logger.info("♻️ Angel session restored from disk")
+                return self.smart
+
+            if self.refresh_token and self._refresh():
+                return self.smart
+
+            return self._login()
+
+    # --------------------------------------------------
+    # CASSETTE MODES
+    # --------------------------------------------------
+    def _replay_client(self):
+        if self._cassette_client is None:
+            from brokers.tradefriend_broker_cassette import TradeFriendReplaySmartApi
+            with self._lock:
+                if self._cassette_client is None:
+                    self._cassette_client = TradeFriendReplaySmartApi()
+                    logger.warning("📼 Broker REPLAY mode — no live SmartAPI calls")
+        return self._cassette_client
+
+    def _recording_client(self, smart):
+        client = self._cassette_client
+        if client is None or client._smart is not smart:
+            from brokers.tradefriend_broker_cassette import (
+                TradeFriendCassetteStore, TradeFriendRecordingSmartApi
+            )
+            with self._lock:
+                store = client._store if client is not None else TradeFriendCassetteStore()
+                client = self._cassette_client = TradeFriendRecordingSmartApi(smart, store)
+        return client
+
+    def invalidate(self):
+        """
+        Broker said the session is gone → next get_client() logs in.
+        """
+        with self._lock:
+            self._clear()
+            self._delete_file()
+
+    def seconds_left(self) -> float:
+        return max(0.0, self.expires_at - time.time())
+
+    # --------------------------------------------------
+    # TOKEN LIFECYCLE
+    # --------------------------------------------------
+    def _expiring(self) -> bool:
+        return (self.expires_at - time.time()) <= SESSION_REFRESH_AHEAD_SEC
+
+    def _refresh(self) -> bool:
+        smart = self.smart or self._build_client()
+        try:
+            data = guarded_call("login", smart.generateToken, self.refresh_token)
+            if not data or not data.get("status"):
+                raise Exception(data)
+
+            payload = data["data"]
+            self._adopt(
+                smart,
+                payload.get("jwtToken"),
+                payload.get("refreshToken") or self.refresh_token,
+                payload.get("feedToken") or self.feed_token,
+            )
+            logger.info("🔄 Angel session refreshed")
+            return True
+
+        except Exception as e:
+            logger.warning(f"⚠️ Angel token refresh failed, full login next | {e}")
+            self.refresh_token = None
+            return False
+
+    def _login(self):
+        if time.time() - self._last_login_failure < SESSION_LOGIN_RETRY_SEC:
+            # Recently failed — keep a not-yet-expired session meanwhile
+            return self.smart if self.seconds_left() > 0 else None
+
+        try:
+            import pyotp
+            from SmartApi import SmartConnect
+
+            smart = SmartConnect(api_key=api_key)
+            totp = pyotp.TOTP(totp_qr).now()
+            data = guarded_call("login", smart.generateSession, username, pin, totp)
+            if not data or not data.get("status"):
+                raise Exception(data)
+
+            payload = data["data"]
+            self._adopt(
+                smart,
+                payload.get("jwtToken"),
+                payload.get("refreshToken"),
+                payload.get("feedToken") or smart.getfeedToken(),
+            )
+            logger.info(" Logged in to Angel One SmartAPI")
+            return self.smart
+
+        except Exception as e:
+            self._last_login_failure = time.time()
+            logger.error(f"SmartAPI login error: {e}")
+            return self.smart if self.seconds_left() > 0 else None
+
+    def _adopt(self, smart, jwt_token, refresh_token, feed_token):
+        self.smart = smart
+        self.jwt_token = _strip_bearer(jwt_token)
+        self.refresh_token = refresh_token
+        self.feed_token = feed_token
+        self.expires_at = _jwt_expiry(self.jwt_token) or (time.time() + SESSION_DEFAULT_TTL_SEC)
+
+        smart.setAccessToken(self.jwt_token)
+        if refresh_token:
+            smart.setRefreshToken(refresh_token)
+        if feed_token:
+            smart.setFeedToken(feed_token)
+        smart.setUserId(self.client_code)
+
+        self._save()
+
+    def _build_client(self):
+        # Lazy: REPLAY runs need neither SmartApi nor credentials
+        from SmartApi import SmartConnect
+
+        return SmartConnect(
+            api_key=api_key,
+            access_token=self.jwt_token,
+            refresh_token=self.refresh_token,
+            feed_token=self.feed_token,
+            userId=self.client_code,
+        )
+
+    def _clear(self):
+        self.smart = None
+        self.jwt_token = None
+        self.refresh_token = None
+        self.feed_token = None
+        self.expires_at = 0.0
+
+    # --------------------------------------------------
+    # PERSISTENCE
+    # --------------------------------------------------
+    def _load(self) -> bool:
+        try:
+            with open(self.session_file, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+
+        # Tokens of another account / API key are useless here
+        if data.get("client_code") != self.client_code or data.get("api_key") != api_key:
+            return False
+        if not data.get("jwt_token") or data.get("expires_at", 0) <= time.time():
+            # JWT gone — the refresh token may still be good
+            self.refresh_token = data.get("refresh_token")
+            return False
+
+        self.jwt_token = data["jwt_token"]
+        self.refresh_token = data.get("refresh_token")
+        self.feed_token = data.get("feed_token")
+        self.expires_at = float(data["expires_at"])
+        self.smart = self._build_client()
+        return True
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.session_file) or ".", exist_ok=True)
+        data = {
+            "client_code": self.client_code,
+            "api_key": api_key,
+            "jwt_token": self.jwt_token,
+            "refresh_token": self.refresh_token,
+            "feed_token": self.feed_token,
+            "expires_at": self.expires_at,
+            "saved_at": time.time(),
+        }
+
+        tmp = self.session_file + ".tmp"
+        try:
+            fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w") as f:
+                json.dump(data, f)
+            os.replace(tmp, self.session_file)
+        except OSError as e:
+            logger.warning(f"⚠️ Angel session not persisted | {e}")
+
+    def _delete_file(self):
+        try:
+            os.remove(self.session_file)
+        except OSError:
+            pass
+
+
+# -------------------------------------------------
+# JWT HELPERS
+# -------------------------------------------------
+def _strip_bearer(token):
+    if token and token.startswith("Bearer "):
+        return token[len("Bearer "):]
+    return token
+
+
+def _jwt_expiry(token):
+    """
+    `exp` claim of a JWT (epoch seconds) without verifying it.
+    """
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        return float(json.loads(base64.urlsafe_b64decode(payload))["exp"])
+    except Exception:
+        return None
+
+
+def get_angel_session() -> TradeFriendAngelSession:
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = TradeFriendAngelSession()
+    return _session
@@ -0,0 +1,293 @@
+# brokers/tradefriend_broker_cassette.py
+
+import os
+import json
+import time
+import random
+import sqlite3
+import threading
+from datetime import datetime
+
+from utils.logger import get_logger
+from config.TradeFriendConfig import (
+    BROKER_CASSETTE,
+    REPLAY_LATENCY_SCALE, REPLAY_FIXED_LATENCY_MS,
+    REPLAY_ERROR_RATE, REPLAY_THROTTLE_RATE, REPLAY_SEED
+)
+
+logger = get_logger(__name__)
+
+# -------------------------------------------------
+# CASSETTE STORE CONFIG
+# -------------------------------------------------
+CASSETTE_FOLDER = os.path.join("dbdata", "cassettes")
+
+# Request fields that change every run (dates are relative to "now");
+# the candle key keeps the window LENGTH instead (full vs gap fetch)
+VOLATILE_FIELDS = {"fromdate", "todate"}
+
+THROTTLE_REPLY = {
+    "status": False,
+    "message": "Access denied because of exceeding access rate",
+    "errorcode": "AB1004",
+}
+
+
+# ================================================================================
+# CLASS: TradeFriendCassetteStore
+# ================================================================================
+class TradeFriendCassetteStore:
+    """
+    PURPOSE:
+    - One SQLite file per cassette (dbdata/cassettes/<name>.db)
+    - Row per (endpoint, request key): response JSON + observed latency
+    - Re-recording the same request overwrites it (latest wins)
+    """
+
+    def __init__(self, name: str = BROKER_CASSETTE):
+        os.makedirs(CASSETTE_FOLDER, exist_ok=True)
+        self.name = name
+        self.path = os.path.join(CASSETTE_FOLDER, f"{name}.db")
+
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL;")
+        self._lock = threading.Lock()
+        self._create_table()
+
+    def _create_table(self):
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS broker_cassette (
+                endpoint TEXT NOT NULL,
+                request_key TEXT NOT NULL,
+                response TEXT,
+                error TEXT,
+                latency_ms REAL,
+                recorded_at TEXT,
+                PRIMARY KEY (endpoint, request_key)
+            )
+        """)
+        self.conn.commit()
+
+    def save(self, endpoint: str, key: str, response=None, error: str = None, latency_ms: float = 0.0):
+        with self._lock:
+            self.conn.execute("""
+                INSERT OR REPLACE INTO broker_cassette
+                    (endpoint, request_key, response, error, latency_ms, recorded_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (
+                endpoint, key,
+                json.dumps(response, default=str) if error is None else None,
+                error,
+                latency_ms,
+                datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            ))
+            self.conn.commit()
+
+    def load(self, endpoint: str, key: str) -> dict | None:
+        with self._lock:
+            row = self.conn.execute("""
+                SELECT response, error, latency_ms
+                FROM broker_cassette
+                WHERE endpoint = ? AND request_key = ?
+            """, (endpoint, key)).fetchone()
+
+        if not row:
+            return None
+        return {
+            "response": json.loads(row[0]) if row[0] is not None else None,
+            "error": row[1],
+            "latency_ms": row[2] or 0.0,
+        }
+
+    def count(self) -> dict:
+        rows = self.conn.execute(
+            "SELECT endpoint, COUNT(*) FROM broker_cassette GROUP BY endpoint"
+        ).fetchall()
+        return dict(rows)
+
+    def close(self):
+        try:
+            self.conn.close()
+        except Exception:
+            pass
+
+
+# ================================================================================
+# CLASS: TradeFriendRecordingSmartApi
+# ================================================================================
+class TradeFriendRecordingSmartApi:
+    """
+    PURPOSE:
+    - Wraps a live SmartConnect
+    - getCandleData / ltpData / searchScrip / getMarketData / placeOrder
+      are forwarded AND saved (response or error + latency)
+    - Everything else is passed straight through
+    """
+
+    def __init__(self, smart, store: TradeFriendCassetteStore):
+        self._smart = smart
+        self._store = store
+
+    def __getattr__(self, name):
+        return getattr(self._smart, name)
+
+    def _record(self, endpoint: str, key: str, fn, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = fn(*args, **kwargs)
+        except Exception as e:
+            self._store.save(endpoint, key, error=str(e),
+                             latency_ms=(time.perf_counter() - started) * 1000)
+            raise
+        self._store.save(endpoint, key, response=response,
+                         latency_ms=(time.perf_counter() - started) * 1000)
+        return response
+
+    def getCandleData(self, params):
+        return self._record("candles", _candle_key(params), self._smart.getCandleData, params)
+
+    def ltpData(self, exchange, tradingsymbol, symboltoken):
+        key = _key(exchange, tradingsymbol, symboltoken)
+        return self._record("ltp", key, self._smart.ltpData, exchange, tradingsymbol, symboltoken)
+
+    def searchScrip(self, exchange, searchscrip):
+        return self._record("search", _key(exchange, searchscrip), self._smart.searchScrip, exchange, searchscrip)
+
+    def getMarketData(self, mode, exchangeTokens):
+        key = _key(mode, exchangeTokens)
+        return self._record("quote", key, self._smart.getMarketData, mode=mode, exchangeTokens=exchangeTokens)
+
+    def placeOrder(self, orderparams):
+        return self._record("orders", _key(orderparams), self._smart.placeOrder, orderparams)
+
+
+# ================================================================================
+# CLASS: TradeFriendReplaySmartApi
+# ================================================================================
+class TradeFriendReplaySmartApi:
+    """
+    PURPOSE:
+    - Drop-in SmartConnect stand-in fed by a cassette (no network)
+    - AngelClient, rate limiter and circuit breaker run unchanged on top
+    - Latency: recorded latency x scale, or a fixed value
+    - Error injection: random exceptions / throttle replies (seedable)
+    - placeOrder NEVER reaches a broker (synthetic order ids on a miss)
+    """
+
+    def __init__(self, store: TradeFriendCassetteStore = None,
+                 latency_scale: float = REPLAY_LATENCY_SCALE,
+                 fixed_latency_ms: float = REPLAY_FIXED_LATENCY_MS,
+                 error_rate: float = REPLAY_ERROR_RATE,
+                 throttle_rate: float = REPLAY_THROTTLE_RATE,
+                 seed=REPLAY_SEED):
+        self._store = store or TradeFriendCassetteStore()
+        self.latency_scale = latency_scale
+        self.fixed_latency_ms = fixed_latency_ms
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+        self._order_seq = 0
+
+        self.stats = {"hits": 0, "misses": 0, "errors": 0, "throttled": 0}
+
+    # --------------------------------------------------
+    # SESSION SURFACE (no-ops)
+    # --------------------------------------------------
+    def setAccessToken(self, token): pass
+    def setRefreshToken(self, token): pass
+    def setFeedToken(self, token): pass
+    def setUserId(self, user_id): pass
+    def getfeedToken(self): return None
+
+    # --------------------------------------------------
+    # CORE
+    # --------------------------------------------------
+    def _replay(self, endpoint: str, key: str, miss_response):
+        with self._random_lock:
+            roll = self._random.random()
+
+        entry = self._store.load(endpoint, key)
+
+        if self.fixed_latency_ms is not None:
+            latency_ms = self.fixed_latency_ms
+        else:
+            latency_ms = (entry["latency_ms"] if entry else 0.0) * self.latency_scale
+        if latency_ms > 0:
+            time.sleep(latency_ms / 1000.0)
+
+        if roll < self.error_rate:
+            self.stats["errors"] += 1
+            raise RuntimeError(f"Injected broker error ({endpoint})")
+        if roll < self.error_rate + self.throttle_rate:
+            self.stats["throttled"] += 1
+            return dict(THROTTLE_REPLY)
+
+        if entry is None:
+            self.stats["misses"] += 1
+            logger.debug(f"📼 Cassette miss | {endpoint} | {key}")
+            return miss_response
+
+        self.stats["hits"] += 1
+        if entry["error"]:
+            raise RuntimeError(entry["error"])
+        return entry["response"]
+
+    # --------------------------------------------------
+    # BROKER SURFACE
+    # --------------------------------------------------
+    def getCandleData(self, params):
+        return self._replay("candles", _candle_key(params), _miss("No data in cassette"))
+
+    def ltpData(self, exchange, tradingsymbol, symboltoken):
+        return self._replay("ltp", _key(exchange, tradingsymbol, symboltoken), _miss("No LTP in cassette"))
+
+    def searchScrip(self, exchange, searchscrip):
+        return self._replay("search", _key(exchange, searchscrip), _miss("No scrip in cassette"))
+
+    def getMarketData(self, mode, exchangeTokens):
+        return self._replay("quote", _key(mode, exchangeTokens),
+                            {"status": True, "data": {"fetched": [], "unfetched": []}})
+
+    def placeOrder(self, orderparams):
+        recorded = self._replay("orders", _key(orderparams), None)
+        if recorded is not None:
+            return recorded
+        with self._random_lock:
+            self._order_seq += 1
+            return f"REPLAY-{self._order_seq}"
+
+    def generateSession(self, *args, **kwargs):
+        return {"status": True, "data": {"jwtToken": None, "refreshToken": None, "feedToken": None}}
+
+    def generateToken(self, refresh_token):
+        return self.generateSession()
+
+
+# -------------------------------------------------
+# KEY HELPERS
+# -------------------------------------------------
+def _key(*parts) -> str:
+    return json.dumps(parts, sort_keys=True, default=str)
+
+
+def _candle_key(params: dict) -> str:
+    # Date window is relative to "now" → key on what and how far back,
+    # not when: a 2-day gap fetch never replays as a full history
+    key = {k: v for k, v in params.items() if k not in VOLATILE_FIELDS}
+    key["window_days"] = _window_days(params.get("fromdate"), params.get("todate"))
+    return _key(key)
+
+
+def _window_days(fromdate, todate):
+    try:
+        start = datetime.strptime(str(fromdate)[:10], "%Y-%m-%d")
+        end = datetime.strptime(str(todate)[:10], "%Y-%m-%d")
+    except ValueError:
+        return None
+    return (end - start).days
+
+
+def _miss(message: str) -> dict:
+    return {"status": False, "message": message, "errorcode": ""}
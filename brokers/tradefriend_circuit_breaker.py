@@ -0,0 +1,240 @@
+# brokers/tradefriend_circuit_breaker.py
+
+import time
+import random
+import threading
+from collections import deque
+
+from utils.logger import get_logger
+from brokers.tradefriend_rate_limiter import rate_limited
+from config.TradeFriendConfig import (
+    CIRCUIT_BREAKER_DEFAULTS, CIRCUIT_BREAKER_OVERRIDES,
+    BACKOFF_BASE_SEC, BACKOFF_MAX_SEC
+)
+
+logger = get_logger(__name__)
+
+CLOSED = "CLOSED"
+OPEN = "OPEN"
+HALF_OPEN = "HALF_OPEN"
+
+# ------------------------------------------------------------------------
+# Singleton Registry Holder
+# ------------------------------------------------------------------------
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+class CircuitOpenError(RuntimeError):
+    """
+    Raised when an endpoint's breaker is OPEN (call not attempted).
+    Subclasses RuntimeError so existing cooldown handlers keep working.
+    """
+
+
+# ================================================================================
+# Backoff
+# ================================================================================
+def backoff_delay(attempt: int, base: float = BACKOFF_BASE_SEC, cap: float = BACKOFF_MAX_SEC) -> float:
+    """
+    Full-jitter exponential backoff: uniform(0, min(cap, base * 2^(attempt-1))).
+    Spreads retries of parallel workers instead of syncing them up.
+    """
+    return random.uniform(0, min(cap, base * (2 ** max(0, attempt - 1))))
+
+
+# ================================================================================
+# CLASS: TradeFriendCircuitBreaker
+# ================================================================================
+class TradeFriendCircuitBreaker:
+    """
+    PURPOSE:
+    - One breaker per broker endpoint (candles / ltp / quote / search / login)
+    - CLOSED    → calls flow; failures counted in a rolling window
+    - OPEN      → calls rejected at once (CircuitOpenError)
+    - HALF_OPEN → one probe call; success closes, failure re-opens
+    - Each consecutive trip doubles the open time (jittered, capped)
+
+    Trips when EITHER
+    - `failure_threshold` consecutive failures, OR
+    - error rate >= `error_rate` over `window_sec` (with >= `min_calls`)
+    """
+
+    def __init__(self, endpoint: str, failure_threshold: int = 5, error_rate: float = 0.5,
+                 window_sec: float = 60, min_calls: int = 10,
+                 open_base_sec: float = 5, open_max_sec: float = 120):
+        self.endpoint = endpoint
+        self.failure_threshold = failure_threshold
+        self.error_rate = error_rate
+        self.window_sec = window_sec
+        self.min_calls = min_calls
+        self.open_base_sec = open_base_sec
+        self.open_max_sec = open_max_sec
+
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._window = deque()          # (ts, ok)
+        self._consecutive = 0
+        self._trips = 0
+        self._open_until = 0.0
+        self._probe_inflight = False
+
+        self._stats = {"calls": 0, "failures": 0, "rejected": 0, "trips": 0}
+
+    # --------------------------------------------------
+    # GATE
+    # --------------------------------------------------
+    def allow(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+
+            if self._state == OPEN:
+                if now < self._open_until:
+                    self._stats["rejected"] += 1
+                    return False
+                self._state = HALF_OPEN
+                self._probe_inflight = False
+                logger.info(f"🟡 Circuit HALF_OPEN | {self.endpoint}")
+
+            if self._state == HALF_OPEN:
+                if self._probe_inflight:
+                    self._stats["rejected"] += 1
+                    return False
+                self._probe_inflight = True
+
+            self._stats["calls"] += 1
+            return True
+
+    def check(self):
+        """
+        allow() or raise CircuitOpenError.
+        """
+        if not self.allow():
+            raise CircuitOpenError(
+                f"Circuit open for {self.endpoint} "
+                f"({max(0.0, self._open_until - time.monotonic()):.1f}s left)"
+            )
+
+    # --------------------------------------------------
+    # OUTCOMES
+    # --------------------------------------------------
+    def record_success(self):
+        with self._lock:
+            now = time.monotonic()
+            self._window.append((now, True))
+            self._prune(now)
+            self._consecutive = 0
+
+            if self._state == HALF_OPEN:
+                self._state = CLOSED
+                self._trips = 0
+                self._probe_inflight = False
+                self._window.clear()    # old failures must not re-trip
+                logger.info(f"🟢 Circuit CLOSED | {self.endpoint}")
+
+    def record_failure(self, error=None):
+        with self._lock:
+            now = time.monotonic()
+            self._window.append((now, False))
+            self._prune(now)
+            self._consecutive += 1
+            self._stats["failures"] += 1
+
+            if self._state == HALF_OPEN:
+                self._trip(now, f"probe failed: {error}")
+                return
+
+            if self._state == CLOSED and self._should_trip():
+                self._trip(now, error)
+
+    def _should_trip(self) -> bool:
+        if self._consecutive >= self.failure_threshold:
+            return True
+
+        calls = len(self._window)
+        if calls < self.min_calls:
+            return False
+        failures = sum(1 for _, ok in self._window if not ok)
+        return failures / calls >= self.error_rate
+
+    def _trip(self, now: float, error=None):
+        self._trips += 1
+        self._stats["trips"] += 1
+        ceiling = min(self.open_max_sec, self.open_base_sec * (2 ** (self._trips - 1)))
+        open_for = ceiling * random.uniform(0.8, 1.2)
+
+        self._state = OPEN
+        self._open_until = now + open_for
+        self._probe_inflight = False
+
+        logger.warning(
+            f"🔴 Circuit OPEN | {self.endpoint} | {open_for:.1f}s | "
+            f"trip #{self._trips} | {error}"
+        )
+
+    def _prune(self, now: float):
+        cutoff = now - self.window_sec
+        while self._window and self._window[0][0] < cutoff:
+            self._window.popleft()
+
+    # --------------------------------------------------
+    # REPORT
+    # --------------------------------------------------
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and time.monotonic() >= self._open_until:
+                return HALF_OPEN
+            return self._state
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            calls = len(self._window)
+            failures = sum(1 for _, ok in self._window if not ok)
+            return dict(
+                self._stats,
+                endpoint=self.endpoint,
+                state=self._state,
+                open_for_sec=round(max(0.0, self._open_until - time.monotonic()), 1),
+                window_error_rate=round(failures / calls, 2) if calls else 0.0,
+            )
+
+
+# ================================================================================
+# Singleton-style Helpers
+# ================================================================================
+def get_circuit_breaker(endpoint: str) -> TradeFriendCircuitBreaker:
+    breaker = _breakers.get(endpoint)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.get(endpoint)
+            if breaker is None:
+                params = dict(CIRCUIT_BREAKER_DEFAULTS)
+                params.update(CIRCUIT_BREAKER_OVERRIDES.get(endpoint, {}))
+                breaker = _breakers[endpoint] = TradeFriendCircuitBreaker(endpoint, **params)
+    return breaker
+
+
+def circuit_states() -> dict:
+    """
+    {endpoint: snapshot} for every breaker created so far.
+    """
+    return {name: b.snapshot() for name, b in list(_breakers.items())}
+
+
+def guarded_call(endpoint: str, fn, *args, **kwargs):
+    """
+    Run a broker call behind the endpoint's breaker + rate limiter.
+    Raises CircuitOpenError without calling (or spending rate budget)
+    when the circuit is open.
+    """
+    breaker = get_circuit_breaker(endpoint)
+    breaker.check()
+    rate_limited(endpoint)
+    try:
+        result = fn(*args, **kwargs)
+    except Exception as e:
+        breaker.record_failure(e)
+        raise
+    breaker.record_success()
+    return result
@@ -0,0 +1,125 @@
+# brokers/tradefriend_rate_limiter.py
+
+import time
+import threading
+
+from utils.logger import get_logger
+from config.TradeFriendConfig import BROKER_RATE_LIMITS
+
+logger = get_logger(__name__)
+
+# ------------------------------------------------------------------------
+# Singleton Limiter Holder
+# ------------------------------------------------------------------------
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+# ================================================================================
+# CLASS: TokenBucket
+# ================================================================================
+class TokenBucket:
+    """
+    Classic token bucket: `capacity` requests, refilled evenly over `per_sec`.
+
+    acquire() RESERVES a token immediately (the balance may go negative)
+    and returns how long the caller must wait for it. Callers sleep
+    outside the lock, so waiting threads never block each other longer
+    than their own reservation requires.
+    """
+
+    def __init__(self, capacity: int, per_sec: float):
+        self.capacity = float(capacity)
+        self.rate = float(capacity) / float(per_sec)
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        elapsed = now - self.updated
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.updated = now
+
+    def reserve(self, now: float, tokens: float = 1.0) -> float:
+        self._refill(now)
+        self.tokens -= tokens
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens / self.rate
+
+
+# ================================================================================
+# CLASS: TradeFriendRateLimiter
+# ================================================================================
+class TradeFriendRateLimiter:
+    """
+    PURPOSE:
+    - ONE process-wide limiter for every broker call
+    - Per endpoint (candles / ltp / quote / search / orders / login)
+    - Each endpoint may stack several windows (per-second + per-minute)
+    - Threads sleep only for their own reservation
+    """
+
+    def __init__(self, limits: dict = None):
+        self._lock = threading.Lock()
+        self._buckets = {}
+        self._stats = {}
+
+        for endpoint, windows in (limits or BROKER_RATE_LIMITS).items():
+            self._buckets[endpoint] = [
+                TokenBucket(capacity, per_sec) for capacity, per_sec in windows
+            ]
+            self._stats[endpoint] = {"calls": 0, "waited_sec": 0.0}
+
+    # --------------------------------------------------
+    # PUBLIC
+    # --------------------------------------------------
+    def acquire(self, endpoint: str, tokens: float = 1.0) -> float:
+        """
+        Block until `endpoint` may be called. Returns seconds waited.
+        Unknown endpoints are not limited (logged once per call site).
+        """
+        buckets = self._buckets.get(endpoint)
+        if not buckets:
+            logger.warning(f"⚠️ No rate limit configured for endpoint={endpoint}")
+            return 0.0
+
+        with self._lock:
+            now = time.monotonic()
+            wait = max(b.reserve(now, tokens) for b in buckets)
+
+            stats = self._stats[endpoint]
+            stats["calls"] += 1
+            stats["waited_sec"] += wait
+
+        if wait > 0:
+            logger.debug(f"⏳ Rate limit | {endpoint} | wait {wait:.3f}s")
+            time.sleep(wait)
+
+        return wait
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {k: dict(v) for k, v in self._stats.items()}
+
+
+# ================================================================================
+# Singleton-style Helper
+# ================================================================================
+def get_rate_limiter() -> TradeFriendRateLimiter:
+    """
+    Shared limiter for AngelClient, order adapters and helpers.
+    """
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = TradeFriendRateLimiter()
+    return _limiter
+
+
+def rate_limited(endpoint: str) -> float:
+    """
+    Shorthand: get_rate_limiter().acquire(endpoint)
+    """
+    return get_rate_limiter().acquire(endpoint)
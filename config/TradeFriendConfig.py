@@ -1,3 +1,5 @@
+import os
+
 # ---------------- CAPITAL & RISK ----------------
 SWING_CAPITAL = 10000
 RISK_PERCENT = 1.0
@@ -11,6 +13,90 @@ HISTORY_DELAY = 0.50
 RETRY_DELAY = 1.5
 MAX_RETRIES = 3
 
+# Broker published limits → [(requests, per_seconds), ...] per endpoint
+BROKER_RATE_LIMITS = {
+    "candles": [(3, 1), (180, 60)],
+    "ltp":     [(10, 1), (500, 60)],
+    "quote":   [(10, 1), (500, 60)],
+    "search":  [(1, 1)],
+    "orders":  [(20, 1), (500, 60)],
+    "login":   [(1, 1)],
+}
+
+# Circuit breaker per endpoint (orders are never gated)
+CIRCUIT_BREAKER_DEFAULTS = {
+    "failure_threshold": 5,     # consecutive failures → OPEN
+    "error_rate": 0.5,          # or this error rate ...
+    "window_sec": 60,           # ... over this rolling window
+    "min_calls": 10,            # ... with at least this many calls
+    "open_base_sec": 5,         # first open period (doubles per trip)
+    "open_max_sec": 120,
+}
+CIRCUIT_BREAKER_OVERRIDES = {
+    # Exit-critical prices: trip late, recover fast
+    "ltp":   {"failure_threshold": 8, "open_max_sec": 15},
+    "quote": {"failure_threshold": 8, "open_max_sec": 15},
+}
+BACKOFF_BASE_SEC = 1.0
+BACKOFF_MAX_SEC = 8.0
+
+# Angel session (shared by data + order paths, persisted to dbdata/)
+SESSION_REFRESH_AHEAD_SEC = 15 * 60     # refresh JWT this long before expiry
+SESSION_DEFAULT_TTL_SEC = 8 * 60 * 60   # when the JWT carries no `exp`
+SESSION_LOGIN_RETRY_SEC = 30            # min gap between failed TOTP logins
+
+BULK_QUOTE_MAX_TOKENS = 50   # getMarketData tokens per request
+
+# ---------------- BROKER MODE (record / replay) ----------------
+# LIVE   → real SmartAPI
+# RECORD → real SmartAPI, every response saved to the cassette
+# REPLAY → cassette only (no network, no credentials)
+BROKER_MODE = os.environ.get("TRADEFRIEND_BROKER_MODE", "LIVE").upper()
+BROKER_CASSETTE = os.environ.get("TRADEFRIEND_CASSETTE", "default")
+REPLAY_LATENCY_SCALE = 1.0      # x recorded latency (0 = instant)
+REPLAY_FIXED_LATENCY_MS = None  # overrides recorded latency when set
+REPLAY_ERROR_RATE = 0.0         # share of calls raising an exception
+REPLAY_THROTTLE_RATE = 0.0      # share of calls answered "access rate" denied
+REPLAY_SEED = None              # fixed seed → repeatable error injection
+
+# ---------------- CANDLE STORE ----------------
+CANDLE_STORE_ENABLED = True
+CANDLE_INTRADAY_REFRESH_SEC = 300   # re-ask broker for the live bar
+
+# ---------------- TICK STREAM ----------------
+TICK_STREAM_ENABLED = True
+TICK_MAX_AGE_SEC = 30          # older board prices fall back to REST
+TICK_RESYNC_SEC = 30           # re-read trades / holdings for subscriptions
+TICK_RECONNECT_SEC = 5
+TICK_REACT_ENABLED = True      # ticks drive entry / exit checks (scheduler sweep stays as fallback)
+TICK_REACT_MIN_GAP_SEC = 0.5   # coalesce tick bursts into one check cycle
+
+# ---------------- QUOTE CACHE (process-wide) ----------------
+# consumer -> max age (sec) a quote may have to count as fresh
+QUOTE_MAX_AGE_SEC = {
+    "monitor": 5,
+    "trigger": 5,
+    "dashboard": 60,
+    "default": 60,
+}
+# consumer -> extra seconds a stale quote is still served while
+# a background refresh runs (0 = always wait for a fresh one)
+QUOTE_STALE_GRACE_SEC = {
+    "monitor": 0,
+    "trigger": 0,
+    "dashboard": 600,
+    "default": 60,
+}
+QUOTE_WAIT_TIMEOUT_SEC = 15     # max wait on another thread's fetch
+
+# ---------------- INTRADAY BARS (tick aggregator) ----------------
+INTRADAY_BAR_INTERVALS = {
+    "ONE_MINUTE": 60,
+    "FIVE_MINUTE": 300,
+    "FIFTEEN_MINUTE": 900,
+}
+INTRADAY_BAR_CAPACITY = 750    # bars kept per token / interval (ring buffer)
+
 # ---------------- MODE ----------------
 PAPER_TRADE = True
 
@@ -24,12 +110,44 @@ ALLOW_TRAILING_SL = True
 TRAIL_START_R = 1.0
 TRAIL_ATR_MULTIPLE = 1.5
 
+# ---------------- VOLATILITY (ATR) ----------------
+ATR_PERIOD = 14
+ATR_HISTORY_BARS = 120    # daily bars per token behind the Wilder seed
+
 # ---------------- PARTIAL BOOKING ----------------
 ENABLE_PARTIAL_BOOKING = True
 PARTIAL_BOOK_RR = 1.0
 PARTIAL_BOOK_PERCENT = 0.5
 HARD_EXIT_R_MULTIPLE = 2.0
 MIN_SCAN_CONFIDENCE = 5
+
+# ---------------- SCAN PIPELINE ----------------
+SCAN_FETCH_WORKERS = BROKER_RATE_LIMITS["candles"][0][0]   # one in-flight fetch per candle req/s
+SCAN_CPU_WORKERS = max(1, (os.cpu_count() or 2) - 1)       # 0 → evaluate in-process
+SCAN_BATCH_SIZE = 50          # symbols per vectorized indicator panel
+SCAN_BATCH_WAIT_SEC = 1.0     # flush a partial batch when fetch stalls this long
+SCAN_QUEUE_SIZE = 100         # bound of each inter-stage queue (backpressure)
+SCAN_STATS_LOG_SEC = 10
+PERSIST_BATCH_SIZE = 200      # accepted symbols per watchlist / plan write transaction
+
+# ---------------- SCAN JOURNAL (resume / retry) ----------------
+SCAN_CHECKPOINT_EVERY = 100   # finished symbols per journal checkpoint
+SCAN_MAX_ATTEMPTS = 2         # first pass + bounded retry passes per symbol
+SCAN_RETRY_REASONS = ("No data", "LTP unavailable", "LTP validation error")   # transient rejections
+SCAN_RETRY_DELAY_SEC = 15     # let the broker circuit recover before retrying
+SCAN_JOURNAL_KEEP_DAYS = 14
+
+# ---------------- INCREMENTAL RESCAN ----------------
+# Fingerprint = last bar + planner settings (TradeFriendSwingEntryPlanner.
+# SETTINGS_KEYS) + this version; bump the version whenever scanner /
+# planner / scorer logic changes. Saving settings clears all fingerprints.
+SCAN_STRATEGY_VERSION = 1
+
+# ---------------- UNIVERSE PRE-FILTER ----------------
+PREFILTER_ENABLED = True
+UNIVERSE_STATS_BARS = 260         # ~52 weeks of daily bars per token
+UNIVERSE_REVALIDATE_DAYS = 7      # stats older than this never exclude → symbol re-fetched
+PREFILTER_PRICE_BAND = 0.20       # max move per calendar day assumed since the last stored bar
 # ---------------- SAFETY ----------------
 DISABLE_NEW_TRADES = False
 SL_ON_CLOSE = True
@@ -45,4 +163,11 @@ MORNING_CONFIRM_TIMES = [
     (9, 21),
     (9, 26),
     (9, 31),
-]
\ No newline at end of file
+]
+# ---------------- INDICATOR STATE (incremental) ----------------
+INDICATOR_STATE_ENABLED = True
+INDICATOR_STATE_TAIL_BARS = 5    # recent outputs kept per indicator (EMA slope)
+
+# ---------------- INDICATOR CACHE (process-wide memo) ----------------
+INDICATOR_CACHE_MAX_ENTRIES = 20000
+INDICATOR_CACHE_MAX_BYTES = 64 * 1024 * 1024
@@ -18,12 +18,16 @@ CREDENTIALS_FILE = os.path.join(CONFIG_DIR, "credentials.json")  # corrected
 INSTRUMENTS_FILE = os.path.join(DATA_DIR, "instruments.json")
 HOLDINGS_FILE = os.path.join(DATA_DIR, "holdings.json")
 NSE_EQTY_FILE = os.path.join(MASTERDATA_DIR, "NSEEQTYdata.json")  # <-- new
+SYMBOL_NAME_MASTER_FILE = os.path.join(MASTERDATA_DIR, "symbolnamemaster.json")
 INDICATOR_FILE = os.path.join(CONFIG_DIR, "indicator_helper.json")
 CONTROL_FILE = os.path.join("control", "control.json")
 TOKEN_FILE = os.path.join(CONFIG_DIR, "dhan_token.json")
-# Load credentials
-with open(CREDENTIALS_FILE, "r") as f:
-    creds = json.load(f)
+# Load credentials (optional → offline / replay runs need none)
+try:
+    with open(CREDENTIALS_FILE, "r") as f:
+        creds = json.load(f)
+except (OSError, ValueError):
+    creds = {}
 
 dhan_creds = creds.get("dhan", {})
 
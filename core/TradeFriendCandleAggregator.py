@@ -0,0 +1,299 @@
+# core/TradeFriendCandleAggregator.py
+
+import time
+import threading
+
+import numpy as np
+import pandas as pd
+
+from utils.logger import get_logger
+from config.TradeFriendConfig import INTRADAY_BAR_INTERVALS, INTRADAY_BAR_CAPACITY
+
+logger = get_logger(__name__)
+
+MARKET_TZ = "Asia/Kolkata"
+_EPOCH_UTC = pd.Timestamp("1970-01-01", tz="UTC")
+BAR_FIELDS = ("ts", "open", "high", "low", "close", "volume")
+
+# Short aliases accepted by get_intraday_data()
+INTERVAL_ALIASES = {
+    "1m": "ONE_MINUTE",
+    "5m": "FIVE_MINUTE",
+    "15m": "FIFTEEN_MINUTE",
+}
+
+# ------------------------------------------------------------------------
+# Singleton Aggregator Holder
+# ------------------------------------------------------------------------
+_aggregator = None
+_aggregator_lock = threading.Lock()
+
+
+# ================================================================================
+# CLASS: TradeFriendBarRing
+# ================================================================================
+class TradeFriendBarRing:
+    """
+    Fixed-size ring of CLOSED bars (one per token / interval).
+    append() is O(1); the oldest bar is overwritten when full.
+    `ts` is the bar start (epoch seconds).
+    """
+
+    def __init__(self, capacity: int = INTRADAY_BAR_CAPACITY):
+        self.capacity = capacity
+        self.data = np.zeros((capacity, len(BAR_FIELDS)), dtype=np.float64)
+        self.head = 0          # next write slot
+        self.count = 0
+
+    def append(self, bar):
+        self.data[self.head] = bar
+        self.head = (self.head + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+
+    def clear(self):
+        self.head = 0
+        self.count = 0
+
+    def last_ts(self):
+        if not self.count:
+            return None
+        return self.data[(self.head - 1) % self.capacity, 0]
+
+    def last(self, n: int = None) -> np.ndarray:
+        """
+        Oldest → newest copy of the last `n` bars (all when None).
+        """
+        n = self.count if n is None else min(n, self.count)
+        if n == 0:
+            return self.data[:0].copy()
+        start = (self.head - n) % self.capacity
+        if start + n <= self.capacity:
+            return self.data[start:start + n].copy()
+        return np.concatenate((self.data[start:], self.data[:self.head]))
+
+
+# ================================================================================
+# CLASS: TradeFriendCandleAggregator
+# ================================================================================
+class TradeFriendCandleAggregator:
+    """
+    PURPOSE:
+    - Ticks in → rolling 1 / 5 / 15 minute OHLCV bars out
+    - O(1) per tick per interval (no resampling)
+    - Closed bars live in fixed-size rings; the open bar is the "partial"
+    - Bar-close listeners: callback(token, interval, bar_dict)
+    - Can be seeded from historical candles so readers get full windows
+
+    VOLUME:
+    - Ticks may carry the CUMULATIVE day volume (SnapQuote); the bar
+      volume is the delta between ticks. LTP-only ticks add 0.
+    """
+
+    def __init__(self, intervals: dict = None, capacity: int = INTRADAY_BAR_CAPACITY):
+        self.intervals = dict(intervals or INTRADAY_BAR_INTERVALS)
+        self.capacity = capacity
+
+        self._lock = threading.Lock()
+        self._rings = {}        # (token, interval) -> TradeFriendBarRing
+        self._partials = {}     # (token, interval) -> [ts, o, h, l, c, v]
+        self._day_volume = {}   # token -> last cumulative volume
+        self._seeded_at = {}    # (token, interval) -> epoch
+        self._listeners = []
+
+        self.dropped_ticks = 0
+
+    # --------------------------------------------------
+    # EVENTS
+    # --------------------------------------------------
+    def on_bar_close(self, callback):
+        self._listeners.append(callback)
+
+    def _emit(self, closed):
+        for token, interval, bar in closed:
+            event = dict(zip(BAR_FIELDS, bar))
+            for callback in self._listeners:
+                try:
+                    callback(token, interval, event)
+                except Exception as e:
+                    logger.warning(f"⚠️ Bar-close listener failed | {token} {interval} | {e}")
+
+    # --------------------------------------------------
+    # WRITE (tick thread)
+    # --------------------------------------------------
+    def on_tick(self, token: str, ltp: float, ts: float = None, volume: float = None):
+        token = str(token)
+        ts = ts or time.time()
+        closed = []
+
+        with self._lock:
+            qty = 0.0
+            if volume is not None:
+                prev = self._day_volume.get(token)
+                if prev is not None and volume >= prev:
+                    qty = volume - prev
+                self._day_volume[token] = volume
+
+            for interval, seconds in self.intervals.items():
+                key = (token, interval)
+                bucket = ts - (ts % seconds)
+                bar = self._partials.get(key)
+
+                if bar is None:
+                    self._partials[key] = [bucket, ltp, ltp, ltp, ltp, qty]
+                    continue
+
+                if bucket < bar[0]:
+                    # Late tick for a bar already closed
+                    self.dropped_ticks += 1
+                    continue
+
+                if bucket > bar[0]:
+                    self._ring(key).append(bar)
+                    closed.append((token, interval, tuple(bar)))
+                    self._partials[key] = [bucket, ltp, ltp, ltp, ltp, qty]
+                    continue
+
+                if ltp > bar[2]:
+                    bar[2] = ltp
+                if ltp < bar[3]:
+                    bar[3] = ltp
+                bar[4] = ltp
+                bar[5] += qty
+
+        if closed:
+            self._emit(closed)
+
+    def flush(self, now: float = None):
+        """
+        Close partial bars whose window has ended (illiquid tokens
+        may not tick again for a while).
+        """
+        now = now or time.time()
+        closed = []
+
+        with self._lock:
+            for key, bar in list(self._partials.items()):
+                if bar[0] + self.intervals[key[1]] <= now:
+                    self._ring(key).append(bar)
+                    closed.append((key[0], key[1], tuple(bar)))
+                    del self._partials[key]
+
+        if closed:
+            self._emit(closed)
+
+    def seed(self, token: str, interval: str, df: pd.DataFrame):
+        """
+        Load historical candles (DatetimeIndex or `datetime` column,
+        naive market time) as closed bars. Bars at or after the current
+        partial are skipped — ticks own those.
+        """
+        if interval not in self.intervals or df is None or df.empty:
+            return
+
+        token = str(token)
+        key = (token, interval)
+
+        stamps = df.index if isinstance(df.index, pd.DatetimeIndex) else pd.to_datetime(df["datetime"])
+        stamps = pd.DatetimeIndex(stamps)
+        if stamps.tz is None:
+            stamps = stamps.tz_localize(MARKET_TZ)
+        epochs = np.asarray((stamps - _EPOCH_UTC) // pd.Timedelta(seconds=1))
+
+        volume = df["volume"].to_numpy(dtype=np.float64) if "volume" in df.columns else np.zeros(len(df))
+        bars = np.column_stack((
+            epochs.astype(np.float64),
+            df["open"].to_numpy(dtype=np.float64),
+            df["high"].to_numpy(dtype=np.float64),
+            df["low"].to_numpy(dtype=np.float64),
+            df["close"].to_numpy(dtype=np.float64),
+            np.nan_to_num(volume),
+        ))
+
+        with self._lock:
+            partial = self._partials.get(key)
+            if partial is not None:
+                bars = bars[bars[:, 0] < partial[0]]
+
+            ring = TradeFriendBarRing(self.capacity)
+            for bar in bars[-self.capacity:]:
+                ring.append(bar)
+            self._rings[key] = ring
+            self._seeded_at[key] = time.time()
+
+    def _ring(self, key) -> TradeFriendBarRing:
+        ring = self._rings.get(key)
+        if ring is None:
+            ring = self._rings[key] = TradeFriendBarRing(self.capacity)
+        return ring
+
+    # --------------------------------------------------
+    # READ
+    # --------------------------------------------------
+    def supports(self, interval: str) -> bool:
+        return interval in self.intervals
+
+    def seeded_at(self, token: str, interval: str):
+        return self._seeded_at.get((str(token), interval))
+
+    def get_partial(self, token: str, interval: str) -> dict | None:
+        bar = self._partials.get((str(token), interval))
+        return dict(zip(BAR_FIELDS, bar)) if bar else None
+
+    def get_last_bar(self, token: str, interval: str) -> dict | None:
+        with self._lock:
+            ring = self._rings.get((str(token), interval))
+            if not ring or not ring.count:
+                return None
+            return dict(zip(BAR_FIELDS, ring.last(1)[0]))
+
+    def get_bars(self, token: str, interval: str, n: int = None,
+                 include_partial: bool = False) -> np.ndarray:
+        """
+        (n, 6) array [ts, open, high, low, close, volume], oldest first.
+        """
+        token = str(token)
+        self.flush()
+
+        with self._lock:
+            ring = self._rings.get((token, interval))
+            bars = ring.last(n) if ring else np.zeros((0, len(BAR_FIELDS)))
+
+            partial = self._partials.get((token, interval)) if include_partial else None
+            if partial is not None:
+                bars = np.vstack((bars, np.asarray(partial, dtype=np.float64)))
+                if n is not None:
+                    bars = bars[-n:]
+
+        return bars
+
+    def to_frame(self, token: str, interval: str, since=None, n: int = None,
+                 include_partial: bool = False) -> pd.DataFrame | None:
+        """
+        Broker-shaped frame (datetime, open, high, low, close, volume)
+        in naive market time, or None when nothing is held.
+        """
+        bars = self.get_bars(token, interval, n=n, include_partial=include_partial)
+        if not len(bars):
+            return None
+
+        df = pd.DataFrame(bars[:, 1:], columns=list(BAR_FIELDS[1:]))
+        df.insert(0, "datetime", (
+            pd.to_datetime(bars[:, 0].astype(np.int64), unit="s", utc=True)
+            .tz_convert(MARKET_TZ)
+            .tz_localize(None)
+        ))
+
+        if since is not None:
+            df = df[df["datetime"] >= pd.Timestamp(since)].reset_index(drop=True)
+
+        return df
+
+
+def get_candle_aggregator() -> TradeFriendCandleAggregator:
+    global _aggregator
+    if _aggregator is None:
+        with _aggregator_lock:
+            if _aggregator is None:
+                _aggregator = TradeFriendCandleAggregator()
+    return _aggregator
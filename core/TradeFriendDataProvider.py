@@ -1,10 +1,26 @@
 import time
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 from brokers.angel_client import AngelClient, getltp,init_client
+from brokers.tradefriend_circuit_breaker import (
+    CircuitOpenError, OPEN, backoff_delay, get_circuit_breaker
+)
 from utils.symbol_resolver import SymbolResolver
 from utils.logger import get_logger
-from config.TradeFriendConfig import ERROR_COOLDOWN_SEC, MAX_RETRIES, REQUEST_DELAY_SEC, RETRY_DELAY
+from utils.ohlcv import OHLCVSeries
+from utils import indicator_kernels as kernels
+from db.TradeFriendCandleRepo import TradeFriendCandleRepo
+from db.TradeFriendCandleArrayStore import TradeFriendCandleArrayStore
+from core.TradeFriendTickService import get_live_ltp
+from core.TradeFriendCandleAggregator import get_candle_aggregator, INTERVAL_ALIASES
+from core.TradeFriendQuoteCache import get_quote_cache
+from core.TradeFriendVolatilityService import get_volatility_service
+from config.settings import DEFAULT_INTERVAL, LOOKBACK_DAYS
+from config.TradeFriendConfig import (
+    MAX_RETRIES, RETRY_DELAY,
+    CANDLE_STORE_ENABLED, CANDLE_INTRADAY_REFRESH_SEC, ATR_PERIOD
+)
 from datetime import datetime, time as dtime
 
 logger = get_logger(__name__)
@@ -21,42 +37,254 @@ class TradeFriendDataProvider:
             logger.warning("⚠️ Broker not ready yet — will retry lazily")
 
         self.resolver = SymbolResolver()
+        self.candle_repo = TradeFriendCandleRepo() if CANDLE_STORE_ENABLED else None
+        self._candle_arrays = {}
 
         # REQUIRED STATE
-        self._error_until = 0
-        self._last_request_ts = 0
-        self._ltp_cache = {}
+        self.quote_cache = get_quote_cache()
         logger.info("✅ DataProvider ready | throttle initialized")
 
-    def get_daily_data(self, trading_symbol, token):
+    def get_daily_data(self, trading_symbol, token, days=None):
         """
         Used by scanners (run once daily)
         """
-        return self._fetch(trading_symbol, token)
+        return self._fetch(trading_symbol, token, days=days)
+
+    def get_daily_series(self, trading_symbol, token, days=None):
+        """
+        get_daily_data() as an OHLCVSeries (scan hot path).
+        Served straight from the memory-mapped snapshot when it is
+        current — no DataFrame is built at all.
+        """
+        return self._fetch(trading_symbol, token, days=days, as_series=True)
 
-    def get_intraday_data(self, symbol, interval="15m", days=5):
+    def get_intraday_data(self, symbol, interval="15m", days=5, include_partial=False):
         """
         Used for next-day confirmation (15-min candle)
+
+        - Streamed bars from the tick aggregator when they are current
+        - Otherwise broker / candle store, which also (re)seeds the
+          aggregator so following calls are served from memory
         """
-        return self._fetch(symbol, interval=interval, days=days)
+        interval = INTERVAL_ALIASES.get(interval, interval)
+
+        resolved = self.resolver.resolve_symbol(symbol)
+        if not resolved:
+            logger.warning(f"⚠️ Symbol resolution failed | {symbol}")
+            return None
+        token = str(resolved["token"])
+
+        aggregator = get_candle_aggregator()
+        if not aggregator.supports(interval):
+            return self._fetch(symbol, token, interval=interval, days=days)
+
+        if not self._needs_intraday_seed(aggregator, token, interval):
+            df = aggregator.to_frame(
+                token, interval,
+                since=datetime.now() - timedelta(days=days),
+                include_partial=include_partial
+            )
+            if df is not None and not df.empty:
+                return self._normalize_ohlc(df, symbol)
+
+        df = self._fetch(symbol, token, interval=interval, days=days)
+        if df is not None:
+            aggregator.seed(token, interval, df)
+        return df
+
+    def _needs_intraday_seed(self, aggregator, token: str, interval: str) -> bool:
+        seeded_at = aggregator.seeded_at(token, interval)
+        if seeded_at is None:
+            return True
+        # Ticks flowing → aggregator stays current on its own
+        if get_live_ltp(token) is not None:
+            return False
+        return (time.time() - seeded_at) >= CANDLE_INTRADAY_REFRESH_SEC
 
     # --------------------------------------------------
     # CORE FETCH (ONLY source of data)
     # --------------------------------------------------
-    def _fetch(self, trading_symbol: str, token: str):
+    def _fetch(self, trading_symbol: str, token: str = None, interval=DEFAULT_INTERVAL, days=None,
+               as_series: bool = False):
         if not token:
             logger.warning(f"No token for {trading_symbol}")
             return None
 
-        df = self.broker.get_historical_data(
-            symbol=trading_symbol,
-            token=token
-        )
+        days = days or LOOKBACK_DAYS
+
+        if self.candle_repo is None:
+            df = self.broker.get_historical_data(
+                symbol=trading_symbol,
+                token=token,
+                interval=interval,
+                days=days
+            )
+        else:
+            df = self._fetch_from_store(trading_symbol, token, interval, days, as_series)
 
         if df is None or df.empty:
             return None
+        if isinstance(df, OHLCVSeries):
+            return df
+
+        df = self._normalize_ohlc(df, trading_symbol)
+        if as_series and df is not None:
+            return OHLCVSeries.from_frame(df)
+        return df
 
-        return self._normalize_ohlc(df)
+    # --------------------------------------------------
+    # CANDLE STORE (local first, broker for the gap only)
+    # --------------------------------------------------
+    def _fetch_from_store(self, trading_symbol: str, token: str, interval: str, days: int,
+                          as_series: bool = False):
+        window_start = datetime.now() - timedelta(days=days)
+        meta = self.candle_repo.get_meta(token, interval)
+
+        covered = (
+            meta is not None
+            and meta["last_ts"] is not None
+            and meta["covered_from"] is not None
+            and meta["covered_from"] <= window_start
+        )
+
+        if not covered:
+            # First sight (or longer window than stored) → full pull
+            logger.info(f"🗄️ Candle store miss | {trading_symbol} | full {days}d fetch")
+            fresh = self.broker.get_historical_data(
+                symbol=trading_symbol,
+                token=token,
+                interval=interval,
+                days=days
+            )
+            if fresh is None or fresh.empty:
+                return None
+            self.candle_repo.upsert(token, interval, fresh, covered_from=window_start)
+
+        elif not self._is_store_fresh(meta):
+            # Re-ask from the last stored bar (it may have been partial)
+            logger.debug(f"🗄️ Candle store gap | {trading_symbol} | since {meta['last_ts']}")
+            fresh = self.broker.get_historical_data(
+                symbol=trading_symbol,
+                token=token,
+                interval=interval,
+                from_date=meta["last_ts"]
+            )
+            if fresh is None:
+                # Broker failure (circuit open / throttled / retries spent):
+                # never pass the stored window off as current
+                logger.error(f"🗄️ Candle gap fetch failed | {trading_symbol} | stored data not served")
+                return None
+            # Empty answer → nothing new; still stamps fetched_at so the
+            # same gap is not re-requested on every call
+            self.candle_repo.upsert(token, interval, fresh)
+
+        else:
+            logger.debug(f"🗄️ Candle store hit | {trading_symbol}")
+
+            # Nothing new since the last snapshot → serve from the mapping
+            frame = self._fetch_from_arrays(token, interval, meta, window_start, as_series)
+            if frame is not None:
+                return frame
+
+        return self.candle_repo.fetch(token, interval, since=window_start)
+
+    def _array_store(self, interval: str) -> TradeFriendCandleArrayStore:
+        store = self._candle_arrays.get(interval)
+        if store is None:
+            store = TradeFriendCandleArrayStore(interval)
+            self._candle_arrays[interval] = store
+        return store
+
+    def _fetch_from_arrays(self, token: str, interval: str, meta: dict, window_start: datetime,
+                           as_series: bool = False):
+        store = self._array_store(interval)
+        info = store.series_info(token)
+
+        if not info or info["last_ts"] != meta["last_ts"]:
+            return None
+
+        # Same timestamp is not enough: a partial bar is rewritten in
+        # place → the snapshot's last bar must match the store's too
+        if not self._snapshot_last_bar_current(store, token, interval):
+            return None
+
+        if as_series:
+            cols = store.get(token, since=window_start)
+            return OHLCVSeries.from_arrays(cols) if cols is not None else None
+        return store.to_frame(token, since=window_start)
+
+    def _snapshot_last_bar_current(self, store, token: str, interval: str) -> bool:
+        stored = self.candle_repo.last_bar(token, interval)
+        cols = store.get(token, bars=1)
+        if stored is None or cols is None or not len(cols["close"]):
+            return False
+        return all(
+            float(cols[field][-1]) == float(stored[field] or 0)
+            for field in ("open", "high", "low", "close", "volume")
+        )
+
+    # --------------------------------------------------
+    # COLUMNAR ACCESS (numpy views, no DataFrame)
+    # --------------------------------------------------
+    def get_daily_arrays(self, token: str, days=None, interval=DEFAULT_INTERVAL):
+        """
+        Zero-copy {open, high, low, close, volume, ts} views from the
+        last published snapshot. None if the token is not in it.
+        """
+        since = datetime.now() - timedelta(days=days or LOOKBACK_DAYS)
+        return self._array_store(interval).get(token, since=since)
+
+    def publish_candle_arrays(self, interval=DEFAULT_INTERVAL):
+        """
+        Rebuild the memory-mapped snapshot from the candle store.
+        Called once at the end of a universe scan.
+        """
+        if self.candle_repo is None:
+            return 0
+        try:
+            return TradeFriendCandleArrayStore.build(interval, self.candle_repo)
+        except Exception as e:
+            logger.exception(f"Candle array publish failed: {e}")
+            return 0
+
+    def is_series_current(self, token, interval=DEFAULT_INTERVAL) -> bool:
+        """
+        True when the stored series was confirmed by the broker after the
+        last session close (or within the intraday refresh window).
+        Without a candle store every series comes straight from the broker.
+        """
+        if self.candle_repo is None:
+            return True
+        meta = self.candle_repo.get_meta(str(token), interval)
+        return meta is not None and self._is_store_fresh(meta)
+
+    def _is_store_fresh(self, meta: dict) -> bool:
+        """
+        Stored series is fresh when it was fetched after the most recent
+        session close — or, during market hours, within the refresh window.
+        """
+        fetched_at = meta.get("fetched_at")
+        if fetched_at is None:
+            return False
+
+        now = datetime.now()
+
+        if self._is_trading_session(now):
+            age = (now - fetched_at).total_seconds()
+            return age < CANDLE_INTRADAY_REFRESH_SEC
+
+        return fetched_at >= self._last_session_close(now)
+
+    def _is_trading_session(self, now: datetime) -> bool:
+        return now.weekday() < 5 and dtime(9, 15) <= now.time() <= dtime(15, 30)
+
+    def _last_session_close(self, now: datetime) -> datetime:
+        close = now.replace(hour=15, minute=30, second=0, microsecond=0)
+        if now < close:
+            close -= timedelta(days=1)
+        while close.weekday() >= 5:
+            close -= timedelta(days=1)
+        return close
     # --------------------------------------------------
     # is_market_open
     # --------------------------------------------------
@@ -82,14 +310,39 @@ class TradeFriendDataProvider:
     def fetch_daily(self, trading_symbol: str, token: str):
         return self._fetch(trading_symbol, token)
 
+    # --------------------------------------------------
+    # VOLATILITY (ATR)
+    # --------------------------------------------------
+    def get_atr(self, symbol: str, period: int = ATR_PERIOD):
+        """
+        Live Wilder ATR for one symbol, or None.
+        Served from the volatility service's daily snapshot; other
+        periods / tokens missing from the snapshot read the history.
+        """
+        resolved = self.resolver.resolve_symbol(symbol)
+        if not resolved:
+            return None
+        token = str(resolved["token"])
+
+        if period == ATR_PERIOD:
+            atr = get_volatility_service().get_atr(token)
+            if atr is not None:
+                return atr
+
+        bars = self._fetch(resolved["trading_symbol"], token, as_series=True)
+        if bars is None or len(bars) <= period:
+            return None
+        atr = kernels.atr(bars["high"], bars["low"], bars["close"], period=period)[-1]
+        return float(atr) if np.isfinite(atr) else None
+
     # --------------------------------------------------
     # 🔧 NORMALIZER (CRITICAL)
     # --------------------------------------------------
     def _normalize_ohlc(self, df, symbol=None):
-        import pandas as pd
-    
-        df = df.copy()
-    
+        """
+        Broker / store frame → DatetimeIndex ("date") + numeric OHLCV.
+        Builds ONE new frame; the input is never copied or mutated.
+        """
         # 🔍 DEBUG LOG (ONCE PER SYMBOL)
         if df is None or df.empty:
             logger.error(f"{symbol} → Empty DF received from broker")
@@ -103,16 +356,16 @@ class TradeFriendDataProvider:
         # 1️⃣ Resolve datetime column
         # -----------------------------
         if "date" in df.columns:
-            df["date"] = pd.to_datetime(df["date"])
+            dates = pd.to_datetime(df["date"])
     
         elif "timestamp" in df.columns:
-            df["date"] = pd.to_datetime(df["timestamp"])
+            dates = pd.to_datetime(df["timestamp"])
     
         elif "datetime" in df.columns:
-            df["date"] = pd.to_datetime(df["datetime"])
+            dates = pd.to_datetime(df["datetime"])
     
         elif isinstance(df.index, pd.DatetimeIndex):
-            df["date"] = df.index
+            dates = df.index
     
         else:
             logger.error(
@@ -120,21 +373,9 @@ class TradeFriendDataProvider:
             )
             return None   # ⛔ do NOT raise
     
-        df.set_index("date", inplace=True)
-    
         # -----------------------------
-        # 2️⃣ Normalize OHLCV
+        # 2️⃣ Validate OHLC
         # -----------------------------
-        rename_map = {
-            "open": "open",
-            "high": "high",
-            "low": "low",
-            "close": "close",
-            "volume": "volume",
-        }
-    
-        df = df.rename(columns={k: v for k, v in rename_map.items() if k in df.columns})
-    
         required = ["open", "high", "low", "close"]
         missing = [c for c in required if c not in df.columns]
     
@@ -145,148 +386,180 @@ class TradeFriendDataProvider:
             return None
     
         # -----------------------------
-        # 3️⃣ Coerce numeric
+        # 3️⃣ Coerce numeric (column arrays, no row work)
         # -----------------------------
-        for col in ["open", "high", "low", "close", "volume"]:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors="coerce")
+        data = {}
+        for col in df.columns:
+            if col == "date":
+                continue
+            values = df[col]
+            if col in ("open", "high", "low", "close", "volume"):
+                values = pd.to_numeric(values, errors="coerce")
+            data[col] = values.to_numpy()
     
-        df.dropna(subset=["open", "high", "low", "close"], inplace=True)
+        out = pd.DataFrame(data, index=pd.DatetimeIndex(dates, name="date"))
     
-        if df.empty:
+        valid = ~np.isnan(np.column_stack([data[c].astype(np.float64) for c in required])).any(axis=1)
+        if not valid.all():
+            out = out[valid]
+    
+        if out.empty:
             logger.error(f"{symbol} → DF empty after normalization")
             return None
     
-        return df
+        return out
     
 
-    def get_ltp_byLtp(self, symbol: str, allow_pre_market_fetch: bool = False):
-       logger.info(
-           f"📡 get_ltp CALLED | symbol={symbol} | allow_pre_market={allow_pre_market_fetch}"
-       )
-
-       now = time.time()
-       cached = self._ltp_cache.get(symbol)
-
-       # -----------------------------
-       # 🛑 Market closed handling
-       # -----------------------------
-    #    if not self.is_market_open() and not allow_pre_market_fetch:
-    #        if cached:
-    #            logger.debug(
-    #                f"📦 LTP cache hit (market closed) | {symbol} → {cached[0]}"
-    #            )
-    #            return cached[0]
-
-    #        logger.warning(f"⚠️ No cached LTP (market closed) | {symbol}")
-    #        return None
-
-       # -----------------------------
-       # ⏱ Cache valid?
-       # -----------------------------
-       if cached:
-           ltp, ts = cached
-           age = now - ts
-
-           if age < (REQUEST_DELAY_SEC * 60):
-               logger.debug(
-                   f"📦 LTP cache hit | {symbol} → {ltp} (age {int(age)}s)"
-               )
-               return ltp
-
-       # -----------------------------
-       # 📡 Fetch fresh LTP (allowed)
-       # -----------------------------
-       for attempt in range(1, MAX_RETRIES + 1):
-           try:
-               self._throttle()
-
-               resolved = self.resolver.resolve_symbol(symbol)
-               if not resolved:
-                   logger.warning(f"⚠️ Symbol resolution failed | {symbol}")
-                   return cached[0] if cached else None
-
-               ltp = getltp(resolved)
-
-               if ltp is None:
-                   logger.warning(f"⚠️ LTP unavailable | {symbol}")
-                   return cached[0] if cached else None
-
-               ltp = float(ltp)
-
-               self._ltp_cache[symbol] = (ltp, now)
-               return ltp
-
-           except RuntimeError:
-               logger.warning(f"🚫 Broker cooldown | {symbol}")
-               return cached[0] if cached else None
-
-           except Exception as e:
-               logger.warning(
-                   f"⚠️ LTP attempt {attempt}/{MAX_RETRIES} failed | "
-                   f"symbol={symbol} | error={e}"
-               )
-
-               if attempt < MAX_RETRIES:
-                   time.sleep(RETRY_DELAY)
-               else:
-                   logger.error(f"⛔ LTP failed after retries | {symbol}")
-                   return cached[0] if cached else None
-    
-    
-   
-    def get_ltp(self, symbol: str):
+    # --------------------------------------------------
+    # LTP (tick board → shared quote cache → broker)
+    # --------------------------------------------------
+    def get_ltp_byLtp(self, symbol: str, allow_pre_market_fetch: bool = False,
+                      consumer: str = "default"):
+        """
+        `consumer` picks the freshness policy of the shared quote cache
+        (monitor / trigger / dashboard / default).
+        """
+        logger.debug(
+            f"📡 get_ltp CALLED | symbol={symbol} | consumer={consumer} | "
+            f"allow_pre_market={allow_pre_market_fetch}"
+        )
+
+        # -----------------------------
+        # ⚡ Streamed price (no REST)
+        # -----------------------------
+        live = self._live_ltp(symbol)
+        if live is not None:
+            self.quote_cache.put(symbol, {"ltp": live})
+            return live
+
+        quote = self.quote_cache.get(symbol, self._load_ltp_quotes, consumer)
+        return float(quote["ltp"]) if quote else None
+
+    def get_ltp(self, symbol: str, consumer: str = "default"):
+        return self.get_ltp_byLtp(symbol, consumer=consumer)
+
+    def _load_ltp_quotes(self, symbols) -> dict:
+        """
+        Quote-cache loader for single-symbol callers (ltpData).
+        """
+        results = {}
+        for symbol in symbols:
+            ltp = self._fetch_ltp_rest(symbol)
+            if ltp is not None:
+                results[symbol] = {"ltp": ltp}
+        return results
+
+    def _fetch_ltp_rest(self, symbol: str):
         for attempt in range(1, MAX_RETRIES + 1):
             try:
                 self._throttle()
 
                 resolved = self.resolver.resolve_symbol(symbol)
                 if not resolved:
-                    raise ValueError("Symbol resolution failed")
+                    logger.warning(f"⚠️ Symbol resolution failed | {symbol}")
+                    return None
+
+                ltp = getltp(resolved)
 
-                response = getltp(resolved)
+                if ltp is None:
+                    logger.warning(f"⚠️ LTP unavailable | {symbol}")
+                    return None
 
-                if not response or not getattr(response, "ltpData", None):
-                    raise ValueError("Empty LTP response")
+                return float(ltp)
 
-                return float(response.ltpData.get("ltp"))
+            except RuntimeError:
+                logger.warning(f"🚫 Broker cooldown | {symbol}")
+                return None
 
             except Exception as e:
                 logger.warning(
-                    f"LTP attempt {attempt}/{MAX_RETRIES} failed for {symbol}: {e}"
+                    f"⚠️ LTP attempt {attempt}/{MAX_RETRIES} failed | "
+                    f"symbol={symbol} | error={e}"
                 )
 
                 if attempt < MAX_RETRIES:
-                    time.sleep(RETRY_DELAY)
+                    time.sleep(backoff_delay(attempt, base=RETRY_DELAY))
                 else:
-                    self._error_until = time.time() + ERROR_COOLDOWN_SEC
-                    logger.error(
-                        f"⛔ LTP blocked for {symbol} | cooldown {ERROR_COOLDOWN_SEC}s"
-                    )
+                    logger.error(f"⛔ LTP failed after retries | {symbol}")
                     return None
 
+    # --------------------------------------------------
+    # BULK QUOTES (one getMarketData per 50 tokens)
+    # --------------------------------------------------
+    def get_quotes_many(self, symbols, consumer: str = "default") -> dict:
+        """
+        Returns {symbol: {ltp, open, high, low, close, volume}}
+        for every symbol with a usable quote.
+        Symbols with a live streamed price only carry `ltp`.
+        """
+        results = {}
+        pending = []
+        for symbol in dict.fromkeys(s for s in (symbols or []) if s):
+            live = self._live_ltp(symbol)
+            if live is not None:
+                results[symbol] = {"ltp": live}
+                self.quote_cache.put(symbol, results[symbol])
+            else:
+                pending.append(symbol)
+
+        if pending:
+            results.update(
+                self.quote_cache.get_many(pending, self._load_bulk_quotes, consumer)
+            )
+        return results
 
-    def _throttle(self):
-        now = time.time()
-
-        logger.debug(
-            "⏱ throttle check | now=%s | last=%s | error_until=%s",
-            round(now, 2),
-            round(self._last_request_ts, 2),
-            round(self._error_until, 2)
-        )
-
-        # 🔴 Circuit breaker active
-        if now < self._error_until:
-            logger.warning("🚫 Broker cooldown active — blocking request")
-            raise RuntimeError("Broker cooldown active")
+    def get_ltp_many(self, symbols, consumer: str = "default") -> dict:
+        """
+        Returns {symbol: ltp}. Symbols missing from the result had
+        no usable price from the broker.
+        """
+        return {
+            symbol: float(q["ltp"])
+            for symbol, q in self.get_quotes_many(symbols, consumer).items()
+        }
 
-        # ⏳ Rate limit
-        elapsed = now - self._last_request_ts
-        if elapsed < REQUEST_DELAY_SEC:
-            sleep_time = REQUEST_DELAY_SEC - elapsed
-            logger.debug("⏳ Rate limit sleep | %ss", round(sleep_time, 2))
-            time.sleep(sleep_time)
+    def _load_bulk_quotes(self, symbols) -> dict:
+        """
+        Quote-cache loader for bulk callers (getMarketData).
+        """
+        resolved_map = {}
+        for symbol in symbols:
+            resolved = self.resolver.resolve_symbol(symbol)
+            if resolved:
+                resolved_map[symbol] = resolved
+            else:
+                logger.warning(f"⚠️ Symbol resolution failed | {symbol}")
+
+        if not resolved_map:
+            return {}
+
+        try:
+            quotes = self.broker.get_quotes_bulk(list(resolved_map.values()))
+        except Exception as e:
+            logger.warning(f"⚠️ Bulk quote failed | {len(resolved_map)} symbols | {e}")
+            return {}
+
+        results = {}
+        for symbol, resolved in resolved_map.items():
+            quote = quotes.get(resolved["symbol"])
+            if quote and quote.get("ltp"):
+                results[symbol] = quote
+        return results
+
+    def _live_ltp(self, symbol: str):
+        """
+        Price from the tick stream, or None (stream down / stale / unknown).
+        """
+        resolved = self.resolver.resolve_symbol(symbol)
+        if not resolved:
+            return None
+        return get_live_ltp(resolved["token"])
 
-        self._last_request_ts = time.time()
-        logger.debug("✅ Throttle passed")
\ No newline at end of file
+    def _throttle(self):
+        """
+        Fail fast while the LTP circuit is open (other endpoints unaffected).
+        Pacing itself lives in the shared rate limiter inside AngelClient.
+        """
+        if get_circuit_breaker("ltp").state == OPEN:
+            logger.warning("🚫 LTP circuit open — blocking request")
+            raise CircuitOpenError("LTP circuit open")
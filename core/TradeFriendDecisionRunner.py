@@ -10,7 +10,6 @@ from db.TradeFriendTradeRepo import TradeFriendTradeRepo
 from db.TradeFriendSettingsRepo import TradeFriendSettingsRepo
 from reports.MorningConfirmReport import MorningConfirmReport
 from reports.MorningConfirmPdfBuilder import MorningConfirmPdfBuilder
-from config.TradeFriendConfig import REQUEST_DELAY_SEC
 
 from utils.logger import get_logger
 logger = get_logger(__name__)
@@ -108,8 +107,6 @@ class TradeFriendDecisionRunner:
                     reason=str(e)
                 )
 
-            time.sleep(REQUEST_DELAY_SEC)
-
         # Generate PDF reports
         self._generate_reports()
 
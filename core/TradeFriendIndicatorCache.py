@@ -0,0 +1,209 @@
+# core/TradeFriendIndicatorCache.py
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from config.TradeFriendConfig import INDICATOR_CACHE_MAX_BYTES, INDICATOR_CACHE_MAX_ENTRIES
+from utils import indicator_kernels as kernels
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# ------------------------------------------------------------------------
+# Singleton Cache Holder
+# ------------------------------------------------------------------------
+_cache = None
+_cache_lock = threading.Lock()
+
+
+class TradeFriendIndicatorCache:
+    """
+    PURPOSE:
+    - ONE indicator memo per process, shared by every strategy
+    - Key: (series, indicator, params) where series is
+      (token, first bar ts, last bar ts, bar count, last bar OHLCV) → a
+      new or revised bar (even a high / low-only move), or a different
+      history window, is a different key, never a stale hit
+    - LRU eviction bounded by entry count AND total array bytes
+    - Cached arrays are read-only (safe to share between strategies)
+    """
+
+    def __init__(self, max_bytes: int = INDICATOR_CACHE_MAX_BYTES,
+                 max_entries: int = INDICATOR_CACHE_MAX_ENTRIES):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+
+        self._entries = OrderedDict()     # key -> (value, nbytes)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    # --------------------------------------------------
+    # CORE
+    # --------------------------------------------------
+    def get_or_compute(self, key, compute):
+        """
+        Cached value for key, else compute() once and store it.
+        Value: ndarray or tuple of ndarrays.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return entry[0]
+            self._stats["misses"] += 1
+
+        # Computed outside the lock; a concurrent duplicate is harmless
+        value = _freeze(compute())
+        nbytes = sum(a.nbytes for a in value) if isinstance(value, tuple) else value.nbytes
+
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = (value, nbytes)
+                self._bytes += nbytes
+                self._evict()
+        return value
+
+    def _evict(self):
+        while self._entries and (
+            len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+        ):
+            _, (_, nbytes) = self._entries.popitem(last=False)
+            self._bytes -= nbytes
+            self._stats["evictions"] += 1
+
+    def series(self, token, df) -> "TradeFriendCachedIndicators":
+        """
+        Indicator accessor for one OHLCV frame (or panel view).
+        """
+        return TradeFriendCachedIndicators(self, token, df)
+
+    # --------------------------------------------------
+    # MAINTENANCE
+    # --------------------------------------------------
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats, entries=len(self._entries), bytes=self._bytes)
+
+
+# ================================================================================
+# CLASS: TradeFriendCachedIndicators
+# ================================================================================
+class TradeFriendCachedIndicators:
+    """
+    PURPOSE:
+    - Per-series facade: ind.ema(50), ind.rsi(14), ind.bbands(20) ...
+    - Every call goes through the shared cache → each indicator is
+      computed once per symbol per bar, whichever strategy asks first
+    """
+
+    def __init__(self, cache: TradeFriendIndicatorCache, token, df):
+        self.cache = cache
+        self.df = df
+        self._columns = {}
+
+        n = len(df)
+        close = self.column("close")
+        index = getattr(df, "index", None)
+        if n and _is_datetime_index(index):
+            first, last = _stamp(index[0]), _stamp(index[-1])
+        else:
+            # No timestamps → the close series itself identifies the bars
+            first, last = None, hash(close.tobytes())
+        # Last bar's values included: a revised / live last bar is a new key
+        last_bar = tuple(
+            float(self.column(f)[-1]) if n and f in df else None
+            for f in ("open", "high", "low", "close", "volume")
+        )
+        self.key = (str(token), first, last, n, last_bar)
+
+    def column(self, name: str) -> np.ndarray:
+        values = self._columns.get(name)
+        if values is None:
+            values = self._columns[name] = np.asarray(self.df[name], dtype=np.float64)
+        return values
+
+    def source(self, name: str) -> np.ndarray:
+        """
+        Price column, or a derived series (signed_volume) from the cache.
+        """
+        if name == "signed_volume" and name not in self.df:
+            return self.signed_volume()
+        return self.column(name)
+
+    def _get(self, indicator: str, params: tuple, compute):
+        return self.cache.get_or_compute((self.key, indicator, params), compute)
+
+    # --------------------------------------------------
+    # INDICATORS
+    # --------------------------------------------------
+    def ema(self, period: int, source: str = "close") -> np.ndarray:
+        return self._get("ema", (source, period), lambda: kernels.ema(self.source(source), period))
+
+    def sma(self, period: int, source: str = "close") -> np.ndarray:
+        return self._get("sma", (source, period), lambda: kernels.sma(self.source(source), period))
+
+    def signed_volume(self) -> np.ndarray:
+        return self._get("signed_volume", (), lambda: kernels.signed_volume(
+            self.column("open"), self.column("close"), self.column("volume")
+        ))
+
+    def rsi(self, period: int = 14) -> np.ndarray:
+        return self._get("rsi", (period,), lambda: kernels.rsi(self.column("close"), period))
+
+    def bbands(self, period: int = 20, nbdevup: float = 2.0, nbdevdn: float = 2.0):
+        """
+        (upper, middle, lower)
+        """
+        params = (period, float(nbdevup), float(nbdevdn))
+        return self._get("bbands", params,
+                         lambda: kernels.bbands(self.column("close"), period, nbdevup, nbdevdn))
+
+    def atr(self, period: int = 14) -> np.ndarray:
+        return self._get("atr", (period,), lambda: kernels.atr(
+            self.column("high"), self.column("low"), self.column("close"), period
+        ))
+
+    def adx(self, period: int = 14) -> np.ndarray:
+        return self._get("adx", (period,), lambda: kernels.adx(
+            self.column("high"), self.column("low"), self.column("close"), period
+        ))
+
+
+# -------------------------------------------------
+# HELPERS
+# -------------------------------------------------
+def _freeze(value):
+    arrays = value if isinstance(value, tuple) else (value,)
+    for arr in arrays:
+        arr.flags.writeable = False
+    return value
+
+
+def _is_datetime_index(index) -> bool:
+    if isinstance(index, pd.DatetimeIndex):
+        return True
+    return isinstance(index, np.ndarray) and index.dtype.kind == "M"
+
+
+def _stamp(value) -> int:
+    return pd.Timestamp(value).value
+
+
+def get_indicator_cache() -> TradeFriendIndicatorCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = TradeFriendIndicatorCache()
+    return _cache
@@ -0,0 +1,293 @@
+# core/TradeFriendIndicatorPanel.py
+
+import numpy as np
+import pandas as pd
+
+from utils.indicator_kernels import ema, rsi, bbands, adx, atr, sma, signed_volume
+from utils.logger import get_logger
+from utils.ohlcv import OHLCVSeries
+
+logger = get_logger(__name__)
+
+PRICE_FIELDS = ("open", "high", "low", "close", "volume")
+
+# Indicator columns every universe scan needs (name -> (kernel, params))
+SCAN_INDICATORS = {
+    "ema_50": ("ema", {"period": 50}),
+    "rsi": ("rsi", {"period": 14}),
+    "bb": ("bbands", {"period": 20, "nbdevup": 2.0, "nbdevdn": 2.0}),
+    "adx": ("adx", {"period": 14}),
+    "vol_sma_20": ("sma", {"period": 20, "source": "volume"}),
+}
+
+
+# ================================================================================
+# CLASS: TradeFriendIndicatorPanel
+# ================================================================================
+class TradeFriendIndicatorPanel:
+    """
+    PURPOSE:
+    - Whole universe as aligned 2-D arrays (symbols x bars)
+    - Indicators computed for ALL symbols in one vectorized pass
+      (Python loops over bars, never over symbols)
+    - Per-symbol access through read-only views (no copies)
+
+    LAYOUT:
+    - Rows are left-aligned: bar 0 is each symbol's oldest bar
+    - Shorter histories are NaN-padded on the right; `lengths[row]`
+      is the symbol's real bar count and views stop there
+    """
+
+    def __init__(self, symbols, columns: dict, lengths, timestamps=None):
+        self.symbols = list(symbols)
+        self.rows = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.columns = columns                 # name -> (symbols x bars) ndarray
+        self.lengths = np.asarray(lengths, dtype=np.int64)
+        self.timestamps = timestamps or {}     # symbol -> index / datetime values
+
+    # ==================================================
+    # BUILD
+    # ==================================================
+    @classmethod
+    def from_frames(cls, frames: dict, bars: int = None) -> "TradeFriendIndicatorPanel":
+        """
+        {symbol: OHLCV DataFrame or OHLCVSeries} → panel (newest `bars`
+        per symbol).
+        """
+        frames = {s: df for s, df in frames.items() if df is not None and not df.empty}
+        symbols = list(frames)
+
+        lengths = [len(df) if bars is None else min(len(df), bars) for df in frames.values()]
+        width = max(lengths, default=0)
+
+        columns = {f: np.full((len(symbols), width), np.nan) for f in PRICE_FIELDS}
+        timestamps = {}
+
+        for row, (symbol, df) in enumerate(frames.items()):
+            n = lengths[row]
+            if isinstance(df, OHLCVSeries):
+                tail = df.tail(n)
+                for field in PRICE_FIELDS:
+                    if field in tail:
+                        columns[field][row, :n] = tail[field]
+                timestamps[symbol] = np.asarray(tail.index)
+                continue
+
+            tail = df.iloc[len(df) - n:]
+            for field in PRICE_FIELDS:
+                if field in tail.columns:
+                    columns[field][row, :n] = pd.to_numeric(tail[field], errors="coerce").to_numpy(np.float64)
+            timestamps[symbol] = _frame_timestamps(tail)
+
+        return cls(symbols, columns, lengths, timestamps)
+
+    @classmethod
+    def from_array_store(cls, store, tokens: dict, bars: int = None) -> "TradeFriendIndicatorPanel":
+        """
+        {symbol: token} read straight from a TradeFriendCandleArrayStore
+        (memory-mapped columns, no DataFrame in between).
+        """
+        series = {}
+        for symbol, token in tokens.items():
+            cols = store.get(token, bars=bars)
+            if cols is not None and len(cols["close"]):
+                series[symbol] = cols
+
+        symbols = list(series)
+        lengths = [len(cols["close"]) for cols in series.values()]
+        width = max(lengths, default=0)
+
+        columns = {f: np.full((len(symbols), width), np.nan) for f in PRICE_FIELDS}
+        timestamps = {}
+        for row, (symbol, cols) in enumerate(series.items()):
+            n = lengths[row]
+            for field in PRICE_FIELDS:
+                columns[field][row, :n] = cols[field]
+            timestamps[symbol] = pd.to_datetime(np.asarray(cols["ts"]), unit="s")
+
+        return cls(symbols, columns, lengths, timestamps)
+
+    # ==================================================
+    # COMPUTE
+    # ==================================================
+    def compute(self, indicators: dict = None, freeze: bool = True) -> "TradeFriendIndicatorPanel":
+        """
+        Add indicator columns for every symbol at once.
+        indicators: {name: (kernel, params)} in dependency order;
+        default SCAN_INDICATORS.
+        - params["source"] names the input column (default close); it
+          may be a column computed earlier in the same call
+        - bbands adds <name>_upper / <name>_middle / <name>_lower
+        """
+        close = self.columns["close"]
+
+        for name, (kernel, params) in (SCAN_INDICATORS if indicators is None else indicators).items():
+            source = self.columns[params.get("source", "close")]
+            if kernel == "ema":
+                self.columns[name] = ema(source, params["period"])
+            elif kernel == "rsi":
+                self.columns[name] = rsi(source, params["period"])
+            elif kernel == "sma":
+                self.columns[name] = sma(source, params["period"])
+            elif kernel == "bbands":
+                upper, middle, lower = bbands(
+                    source, params["period"], params.get("nbdevup", 2.0), params.get("nbdevdn", 2.0)
+                )
+                self.columns[f"{name}_upper"] = upper
+                self.columns[f"{name}_middle"] = middle
+                self.columns[f"{name}_lower"] = lower
+            elif kernel == "signed_volume":
+                self.columns[name] = signed_volume(
+                    self.columns["open"], close, self.columns["volume"]
+                )
+            elif kernel == "atr":
+                self.columns[name] = atr(
+                    self.columns["high"], self.columns["low"], close, params["period"]
+                )
+            elif kernel == "adx":
+                self.columns[name] = adx(
+                    self.columns["high"], self.columns["low"], close, params["period"]
+                )
+            else:
+                raise ValueError(f"Unknown indicator kernel: {kernel}")
+
+        if freeze:
+            self._freeze()
+        return self
+
+    def compute_incremental(self, state_service, tokens: dict,
+                            indicators: dict = None) -> "TradeFriendIndicatorPanel":
+        """
+        compute(), but indicators with a persisted recurrence state are
+        advanced by the new bars only (TradeFriendIndicatorStateService).
+        Those columns hold the last INDICATOR_STATE_TAIL_BARS values of
+        each row; earlier bars are NaN.
+        tokens: {symbol: token}
+        """
+        indicators = indicators or SCAN_INDICATORS
+        stateful = {n: spec for n, spec in indicators.items() if n in state_service.indicators}
+        self.compute({n: spec for n, spec in indicators.items() if n not in stateful}, freeze=False)
+
+        shape = self.columns["close"].shape
+        filled = {}
+        for row, symbol in enumerate(self.symbols):
+            token = tokens.get(symbol)
+            if token is None:
+                continue
+            n = int(self.lengths[row])
+            tails = state_service.advance(
+                token,
+                self.timestamps.get(symbol, ())[:n],
+                {f: self.columns[f][row, :n] for f in PRICE_FIELDS},
+            )
+            for col, values in tails.items():
+                if col not in filled:
+                    filled[col] = np.full(shape, np.nan)
+                k = min(len(values), n)
+                filled[col][row, n - k:n] = values[len(values) - k:]
+
+        state_service.flush()
+        self.columns.update(filled)
+        self._freeze()
+        return self
+
+    def alias(self, aliases: dict) -> "TradeFriendIndicatorPanel":
+        """
+        {alias column: existing column} — same array, no copy.
+        """
+        for alias, target in aliases.items():
+            self.columns[alias] = self.columns[target]
+        return self
+
+    def _freeze(self):
+        # Views handed to scanners must not be able to write back
+        for arr in self.columns.values():
+            arr.flags.writeable = False
+
+    # ==================================================
+    # ACCESS
+    # ==================================================
+    def __contains__(self, symbol) -> bool:
+        return symbol in self.rows
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def view(self, symbol: str) -> "TradeFriendPanelView | None":
+        row = self.rows.get(symbol)
+        if row is None:
+            return None
+        return TradeFriendPanelView(self, row)
+
+
+# ================================================================================
+# CLASS: TradeFriendPanelView
+# ================================================================================
+class TradeFriendPanelView:
+    """
+    PURPOSE:
+    - One symbol's slice of the panel, DataFrame-like for scanners:
+      view["close"], view["rsi"][-1], len(view), view.empty
+    - Every column is a NumPy view into the panel (no copy)
+    """
+
+    __slots__ = ("panel", "row", "symbol", "length")
+
+    def __init__(self, panel: TradeFriendIndicatorPanel, row: int):
+        self.panel = panel
+        self.row = row
+        self.symbol = panel.symbols[row]
+        self.length = int(panel.lengths[row])
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.panel.columns[name][self.row, :self.length]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.panel.columns
+
+    def __len__(self) -> int:
+        return self.length
+
+    @property
+    def columns(self):
+        return list(self.panel.columns)
+
+    @property
+    def empty(self) -> bool:
+        return self.length == 0
+
+    def last(self, name: str) -> float:
+        return float(self[name][-1])
+
+    @property
+    def index(self):
+        return self.panel.timestamps.get(self.symbol)
+
+    def series(self) -> OHLCVSeries:
+        """
+        Bars + every panel column as an OHLCVSeries (views, no copy).
+        """
+        return OHLCVSeries(
+            index=self.index,
+            extra={name: self[name] for name in self.panel.columns if name not in PRICE_FIELDS},
+            **{f: self[f] for f in PRICE_FIELDS},
+        )
+
+    def frame(self) -> pd.DataFrame:
+        """
+        DataFrame copy for consumers that still need pandas.
+        """
+        df = pd.DataFrame({name: self[name] for name in self.panel.columns})
+        if self.index is not None:
+            df.index = self.index
+        return df
+
+
+# -------------------------------------------------
+# HELPERS
+# -------------------------------------------------
+def _frame_timestamps(df: pd.DataFrame):
+    for col in ("datetime", "date", "timestamp"):
+        if col in df.columns:
+            return pd.to_datetime(df[col], errors="coerce").to_numpy()
+    return df.index.to_numpy()
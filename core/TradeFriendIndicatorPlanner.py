@@ -0,0 +1,161 @@
+# core/TradeFriendIndicatorPlanner.py
+
+from core.TradeFriendIndicatorPanel import PRICE_FIELDS, TradeFriendIndicatorPanel
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# kernel -> extra output suffixes (single-output kernels write <name>)
+MULTI_OUTPUT = {"bbands": ("upper", "middle", "lower")}
+
+
+def need_name(kernel: str, **params) -> str:
+    """
+    Canonical column name for an indicator:
+    ema_20, rsi_14, sma_volume_20, bb_30_2_2, adx_14, signed_volume
+    """
+    source = params.get("source", "close")
+    prefix = "" if source == "close" else f"{source}_"
+    if kernel == "bbands":
+        return (
+            f"bb_{prefix}{params['period']}_"
+            f"{params.get('nbdevup', 2.0):g}_{params.get('nbdevdn', 2.0):g}"
+        )
+    if "period" in params:
+        return f"{kernel}_{prefix}{params['period']}"
+    return kernel
+
+
+def need(kernel: str, **params) -> tuple:
+    """
+    ('ema_20', ('ema', {'period': 20})) — one entry of a strategy's NEEDS.
+    """
+    return need_name(kernel, **params), (kernel, params)
+
+
+# ================================================================================
+# CLASS: TradeFriendIndicatorPlanner
+# ================================================================================
+class TradeFriendIndicatorPlanner:
+    """
+    PURPOSE:
+    - Strategies DECLARE the indicators they read:
+        NEEDS = {name: (kernel, params)}   (params["source"] may name
+        another need → dependency edge)
+    - The planner merges every registered strategy's needs into ONE
+      dependency-ordered plan (DAG, duplicates computed once) and runs
+      it over the whole universe panel in a single vectorized pass
+    - evaluate() runs every strategy against the same shared bars
+      → adding a strategy adds its evaluation, not another indicator pass
+
+    STRATEGY CONTRACT:
+    - .name, .NEEDS, .evaluate(bars, symbol, token=None)
+      (bars: OHLCVSeries carrying the planned columns)
+    - optional .PREFILTER (universe stats predicates, see
+      TradeFriendUniverseStatsService)
+    """
+
+    def __init__(self, strategies=()):
+        self.strategies = []
+        self._plan = None
+        for strategy in strategies:
+            self.register(strategy)
+
+    def register(self, strategy):
+        self.strategies.append(strategy)
+        self._plan = None
+        return strategy
+
+    # ==================================================
+    # PLAN (union of needs, topologically ordered)
+    # ==================================================
+    def plan(self):
+        """
+        Returns (ordered {name: (kernel, params)}, {alias column: column}).
+        """
+        if self._plan is not None:
+            return self._plan
+
+        needs = {}
+        for strategy in self.strategies:
+            for name, spec in strategy.NEEDS.items():
+                if needs.setdefault(name, spec) != spec:
+                    raise ValueError(
+                        f"Indicator '{name}' declared with different specs: {needs[name]} / {spec}"
+                    )
+
+        ordered, aliases = {}, {}
+        resolved = {}        # need name -> computed column name
+        by_spec = {}         # canonical spec -> computed column name
+
+        def visit(name, chain):
+            if name in PRICE_FIELDS:
+                return name
+            if name in resolved:
+                return resolved[name]
+            if name in chain:
+                raise ValueError(f"Indicator dependency cycle: {' → '.join(chain + (name,))}")
+            if name not in needs:
+                raise ValueError(f"Indicator '{name}' is used as a source but never declared")
+
+            kernel, params = needs[name]
+            if "source" in params:
+                params = dict(params, source=visit(params["source"], chain + (name,)))
+
+            key = (kernel, tuple(sorted(params.items())))
+            target = by_spec.get(key)
+            if target is None:
+                by_spec[key] = target = name
+                ordered[name] = (kernel, params)
+            else:
+                for suffix in MULTI_OUTPUT.get(kernel, ()):
+                    aliases[f"{name}_{suffix}"] = f"{target}_{suffix}"
+                if kernel not in MULTI_OUTPUT:
+                    aliases[name] = target
+
+            resolved[name] = target
+            return target
+
+        for name in needs:
+            visit(name, ())
+
+        self._plan = (ordered, aliases)
+        logger.debug(
+            f"🧭 Indicator plan | strategies={len(self.strategies)} | "
+            f"needs={len(needs)} | computed={len(ordered)}"
+        )
+        return self._plan
+
+    def prefilters(self) -> list:
+        """
+        One PREFILTER per registered strategy (empty → needs everything).
+        """
+        return [tuple(getattr(strategy, "PREFILTER", ())) for strategy in self.strategies]
+
+    # ==================================================
+    # EXECUTE
+    # ==================================================
+    def compute(self, panel: TradeFriendIndicatorPanel) -> TradeFriendIndicatorPanel:
+        """
+        Every registered strategy's indicators for every symbol, once.
+        """
+        ordered, aliases = self.plan()
+        return panel.compute(ordered).alias(aliases)
+
+    def evaluate(self, panel: TradeFriendIndicatorPanel, symbol: str, token=None) -> dict:
+        """
+        {strategy name: result} on ONE shared series per symbol.
+        """
+        view = panel.view(symbol)
+        if view is None:
+            return {}
+
+        bars = view.series()
+        results = {}
+        for strategy in self.strategies:
+            try:
+                results[strategy.name] = strategy.evaluate(bars, symbol, token=token)
+            except Exception as e:
+                logger.exception(f"Strategy {strategy.name} failed | {symbol} | {e}")
+                results[strategy.name] = None
+        return results
@@ -0,0 +1,307 @@
+# core/TradeFriendIndicatorStateService.py
+
+import json
+import threading
+from collections import deque
+from datetime import datetime, time as dtime
+
+import numpy as np
+import pandas as pd
+
+from config.settings import DEFAULT_INTERVAL
+from config.TradeFriendConfig import INDICATOR_STATE_TAIL_BARS
+from core.TradeFriendIndicatorPanel import PRICE_FIELDS, SCAN_INDICATORS
+from db.TradeFriendIndicatorStateRepo import TradeFriendIndicatorStateRepo
+from utils.indicator_state import make_state, state_from_dict, supports
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Scan columns + ATR (stops / trailing) — all O(1) per bar
+STATE_INDICATORS = dict(SCAN_INDICATORS, atr=("atr", {"period": 14}))
+
+SESSION_CLOSE = dtime(15, 30)
+
+
+# ================================================================================
+# CLASS: TradeFriendIndicatorStateService
+# ================================================================================
+class TradeFriendIndicatorStateService:
+    """
+    PURPOSE:
+    - Keeps EMA / RSI / ATR / SMA / Bollinger recurrence state per token
+    - Each run feeds ONLY the closed bars after the stored last bar
+      (O(1) per new bar instead of a full-history recompute)
+    - Values equal a full kernel recompute over the same bars, starting
+      at the state's anchor bar
+    - A revised last bar, a gap or a changed parameter set reseeds that
+      indicator from the series handed in
+
+    FLOW:
+    - load()     → all persisted states of the interval (one query)
+    - advance()  → per token, returns recent values incl. a live bar
+    - flush()    → persist every changed token (one transaction)
+    - peek()     → values if a live / partial bar closed now (no write)
+    """
+
+    def __init__(self, indicators: dict = None, interval: str = DEFAULT_INTERVAL,
+                 repo: TradeFriendIndicatorStateRepo = None):
+        self.indicators = {
+            name: spec for name, spec in (indicators or STATE_INDICATORS).items()
+            if supports(*spec)
+        }
+        self.specs = {
+            name: json.dumps([kernel, params], sort_keys=True)
+            for name, (kernel, params) in self.indicators.items()
+        }
+        self.interval = interval
+        self.repo = repo or TradeFriendIndicatorStateRepo()
+
+        self._entries = {}     # token -> {name: entry with live state object}
+        self._dirty = set()
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    # ==================================================
+    # LOAD / FLUSH
+    # ==================================================
+    def load(self):
+        stored = self.repo.get_states(self.interval)
+        with self._lock:
+            for token, entries in stored.items():
+                self._entries.setdefault(token, {
+                    name: self._from_row(row) for name, row in entries.items()
+                })
+            self._loaded = True
+        logger.info(f"📐 Indicator states loaded | tokens={len(stored)}")
+
+    def _token_entries(self, token: str) -> dict:
+        entries = self._entries.get(token)
+        if entries is None and not self._loaded:
+            stored = self.repo.get_states(self.interval, token).get(token, {})
+            entries = {name: self._from_row(row) for name, row in stored.items()}
+            self._entries[token] = entries
+        return entries if entries is not None else self._entries.setdefault(token, {})
+
+    def flush(self) -> int:
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+            by_token = {
+                token: {name: self._to_row(e) for name, e in self._entries[token].items()}
+                for token in dirty
+            }
+        self.repo.save_states(self.interval, by_token)
+        return len(by_token)
+
+    # ==================================================
+    # ADVANCE
+    # ==================================================
+    def advance(self, token: str, timestamps, columns: dict, closed: int = None) -> dict:
+        """
+        timestamps : bar times (ascending)
+        columns    : {open, high, low, close, volume} arrays, same length
+        closed     : bars that are final (default: all but a live daily bar)
+
+        Returns {output column: np.ndarray of the last TAIL values}, the
+        final entries aligned with the last bars handed in.
+        """
+        token = str(token)
+        stamps = pd.DatetimeIndex(timestamps)
+        if stamps.tz is not None:
+            stamps = stamps.tz_localize(None)
+        n = len(stamps)
+        if n == 0:
+            return {}
+
+        if closed is None:
+            closed = self._closed_count(stamps)
+        with self._lock:
+            entries = self._token_entries(token)
+            starts = {
+                name: self._resume_at(entries.get(name), name, stamps.values, columns, closed)
+                for name in self.indicators
+            }
+            first = min(0 if start is None else start for start in starts.values())
+            bars = _bars(columns, first, n)
+
+            changed = False
+            results = {}
+
+            for name, (kernel, params) in self.indicators.items():
+                entry = entries.get(name)
+                start = starts[name]
+
+                if start is None:
+                    entry = entries[name] = {
+                        "spec": self.specs[name],
+                        "state": make_state(name, kernel, params),
+                        "anchor_ts": _format_ts(stamps[0]),
+                        "last_ts": None,
+                        "last_close": None,
+                        "last_high": None,
+                        "last_low": None,
+                        "bars": 0,
+                        "tail": {},
+                    }
+                    start = 0
+
+                if start < closed:
+                    state = entry["state"]
+                    keep_from = closed - INDICATOR_STATE_TAIL_BARS
+                    for i in range(start, closed):
+                        outputs = state.update(bars[i - first])
+                        if i >= keep_from:
+                            self._push(entry["tail"], outputs)
+                    entry["last_ts"] = _format_ts(stamps[closed - 1])
+                    entry.update(_bar_key(columns, closed - 1))
+                    entry["bars"] += closed - start
+                    changed = True
+
+                tail = entry["tail"]
+                if closed < n:
+                    # Live bar(s): applied to a copy, never persisted
+                    state = entry["state"].copy()
+                    tail = {col: deque(values, maxlen=INDICATOR_STATE_TAIL_BARS)
+                            for col, values in tail.items()}
+                    for i in range(closed, n):
+                        self._push(tail, state.update(bars[i - first]))
+
+                for col, values in tail.items():
+                    results[col] = np.array(values, dtype=np.float64)
+
+            if changed:
+                self._dirty.add(token)
+
+        return results
+
+    def advance_frame(self, token: str, df: pd.DataFrame, closed: int = None) -> dict:
+        """
+        Normalised provider frame (DatetimeIndex, OHLCV columns).
+        """
+        columns = {f: df[f].to_numpy(np.float64) for f in PRICE_FIELDS if f in df.columns}
+        return self.advance(token, df.index, columns, closed)
+
+    def _resume_at(self, entry, name, stamps, columns, closed):
+        """
+        Index of the first bar the stored state has not seen, or None
+        when it must be rebuilt from bar 0.
+        """
+        if entry is None or entry["spec"] != self.specs[name] or entry["last_ts"] is None:
+            return None
+
+        last = np.datetime64(entry["last_ts"].replace(" ", "T"), "ns")
+        pos = int(np.searchsorted(stamps, last))
+        if pos >= closed or stamps[pos] != last:
+            return None        # gap, or stored bar outside the closed series
+        if any(entry.get(key) != value for key, value in _bar_key(columns, pos).items()):
+            return None        # last bar was revised since (close, high or low)
+        return pos + 1
+
+    def _push(self, tail: dict, outputs: dict):
+        for col, value in outputs.items():
+            values = tail.get(col)
+            if values is None:
+                values = tail[col] = deque(maxlen=INDICATOR_STATE_TAIL_BARS)
+            values.append(value)
+
+    # ==================================================
+    # READ
+    # ==================================================
+    def latest(self, token: str) -> dict:
+        """
+        {output column: value} after the last committed bar.
+        """
+        with self._lock:
+            entries = self._token_entries(str(token))
+            return {
+                col: values[-1]
+                for name, e in entries.items() if name in self.indicators
+                for col, values in e["tail"].items() if values
+            }
+
+    def peek(self, token: str, bar: dict) -> dict:
+        """
+        {output column: value} if `bar` (live candle: open/high/low/close/
+        volume) closed now. Nothing is stored — tick-driven checks call
+        this on every update.
+        """
+        with self._lock:
+            entries = self._token_entries(str(token))
+            states = [
+                e["state"].copy() for name, e in entries.items() if name in self.indicators
+            ]
+
+        values = {}
+        for state in states:
+            values.update(state.update(bar))
+        return values
+
+    # ==================================================
+    # HELPERS
+    # ==================================================
+    def _closed_count(self, stamps: pd.DatetimeIndex) -> int:
+        """
+        Daily bars: today's bar is final only after the session close.
+        Other intervals: every bar handed in is treated as closed.
+        """
+        if self.interval not in ("ONE_DAY", "1day"):
+            return len(stamps)
+
+        now = datetime.now()
+        if now.time() >= SESSION_CLOSE or stamps[-1] < pd.Timestamp(now.date()):
+            return len(stamps)
+        # Ascending bars → only the last one can be today's live bar
+        return len(stamps) - 1
+
+    def _from_row(self, row: dict) -> dict:
+        return {
+            "spec": row["spec"],
+            "state": state_from_dict(row["state"]),
+            "anchor_ts": row["anchor_ts"],
+            "last_ts": row["last_ts"],
+            "last_close": row["last_close"],
+            "last_high": row.get("last_high"),
+            "last_low": row.get("last_low"),
+            "bars": row["bars"],
+            "tail": {
+                col: deque(values, maxlen=INDICATOR_STATE_TAIL_BARS)
+                for col, values in row["tail"].items()
+            },
+        }
+
+    def _to_row(self, entry: dict) -> dict:
+        return dict(
+            entry,
+            state=entry["state"].to_dict(),
+            tail={col: list(values) for col, values in entry["tail"].items()},
+        )
+
+
+# -------------------------------------------------
+# HELPERS
+# -------------------------------------------------
+def _bars(columns: dict, start: int, stop: int) -> list:
+    """
+    Bars start..stop-1 as {field: float} dicts (built once per token).
+    """
+    fields = list(columns)
+    rows = zip(*(np.asarray(columns[f][start:stop], dtype=np.float64).tolist() for f in fields))
+    return [dict(zip(fields, row)) for row in rows]
+
+
+def _bar_key(columns: dict, i: int) -> dict:
+    """
+    Values of bar i a revision is detected by (a live bar can move its
+    high / low without its close ending up different).
+    """
+    return {
+        f"last_{field}": float(columns[field][i]) if field in columns else None
+        for field in ("close", "high", "low")
+    }
+
+
+def _format_ts(value) -> str:
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is not None:
+        ts = ts.tz_localize(None)
+    return ts.strftime("%Y-%m-%d %H:%M:%S")
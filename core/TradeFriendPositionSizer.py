@@ -5,6 +5,9 @@ from db.TradeFriendSettingsRepo import TradeFriendSettingsRepo
 
 logger = get_logger(__name__)
 
+# Slab floors (settings column qty_gt_<price>), highest first
+PRICE_SLABS = (2000, 1500, 1000, 700, 500, 200, 100)
+
 
 class TradeFriendPositionSizer:
     """
@@ -91,27 +94,34 @@ class TradeFriendPositionSizer:
         Highest matching slab wins
         """
 
-        slabs = [
-            (2000, settings.get("qty_gt_2000", 0)),
-            (1500, settings.get("qty_gt_1500", 0)),
-            (1000, settings.get("qty_gt_1000", 0)),
-            (700,  settings.get("qty_gt_700", 0)),
-            (500,  settings.get("qty_gt_500", 0)),
-            (200,  settings.get("qty_gt_200", 0)),
-            (100,  settings.get("qty_gt_100", 0)),
-        ]
-
-        for min_price, qty in slabs:
-            try:
-                qty = int(qty or 0)
-            except Exception:
-                qty = 0
-
+        for min_price, qty in self._slabs(settings):
             if price >= min_price and qty > 0:
                 return qty
 
         return 0
 
+    @staticmethod
+    def _slabs(settings: dict) -> list:
+        slabs = []
+        for min_price in PRICE_SLABS:
+            try:
+                qty = int(settings.get(f"qty_gt_{min_price}", 0) or 0)
+            except Exception:
+                qty = 0
+            slabs.append((min_price, qty))
+        return slabs
+
+    def min_sized_price(self):
+        """
+        Lowest entry price any slab gives a quantity (below it
+        calculate() always returns qty 0), or None when every slab
+        is disabled.
+        """
+        raw_settings = self.settings_repo.fetch()
+        settings = dict(raw_settings) if raw_settings else {}
+        prices = [p for p, qty in self._slabs(settings) if qty > 0]
+        return min(prices) if prices else None
+
     # -------------------------------------------------
     # ZERO-QTY SAFE RETURN
     # -------------------------------------------------
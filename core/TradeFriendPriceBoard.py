@@ -0,0 +1,81 @@
+# core/TradeFriendPriceBoard.py
+
+import time
+import threading
+
+# ------------------------------------------------------------------------
+# Singleton Board Holder
+# ------------------------------------------------------------------------
+_board = None
+_board_lock = threading.Lock()
+
+
+class TradeFriendPriceBoard:
+    """
+    PURPOSE:
+    - Latest streamed price per token (process-wide)
+    - Writers: tick sources (one WS / replay thread)
+    - Readers: DataProvider, monitors, dashboard (any thread)
+
+    LOCK-FREE READS:
+    - Each entry is an immutable tuple (ltp, ts, volume)
+    - A dict slot assignment is atomic, so readers never see
+      a half-written quote and never wait on the writer
+    """
+
+    def __init__(self):
+        self._quotes = {}
+        self.last_tick_ts = 0.0
+
+    # --------------------------------------------------
+    # WRITE (tick thread)
+    # --------------------------------------------------
+    def update(self, token: str, ltp: float, ts: float = None, volume: float = None):
+        now = time.time()
+        self._quotes[str(token)] = (float(ltp), ts or now, volume)
+        self.last_tick_ts = now
+
+    def clear(self, tokens=None):
+        if tokens is None:
+            self._quotes = {}
+            return
+        for token in tokens:
+            self._quotes.pop(str(token), None)
+
+    # --------------------------------------------------
+    # READ (any thread)
+    # --------------------------------------------------
+    def get(self, token: str, max_age: float = None):
+        """
+        Returns ltp or None. `max_age` (seconds) rejects older quotes.
+        """
+        entry = self._quotes.get(str(token))
+        if entry is None:
+            return None
+
+        ltp, ts, _ = entry
+        if max_age is not None and (time.time() - ts) > max_age:
+            return None
+        return ltp
+
+    def get_quote(self, token: str):
+        entry = self._quotes.get(str(token))
+        if entry is None:
+            return None
+        ltp, ts, volume = entry
+        return {"ltp": ltp, "ts": ts, "volume": volume}
+
+    def snapshot(self) -> dict:
+        return dict(self._quotes)
+
+    def __len__(self):
+        return len(self._quotes)
+
+
+def get_price_board() -> TradeFriendPriceBoard:
+    global _board
+    if _board is None:
+        with _board_lock:
+            if _board is None:
+                _board = TradeFriendPriceBoard()
+    return _board
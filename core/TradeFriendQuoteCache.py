@@ -0,0 +1,197 @@
+# core/TradeFriendQuoteCache.py
+
+import time
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+from utils.logger import get_logger
+from config.TradeFriendConfig import (
+    QUOTE_MAX_AGE_SEC, QUOTE_STALE_GRACE_SEC, QUOTE_WAIT_TIMEOUT_SEC
+)
+
+logger = get_logger(__name__)
+
+# ------------------------------------------------------------------------
+# Singleton Cache Holder
+# ------------------------------------------------------------------------
+_cache = None
+_cache_lock = threading.Lock()
+
+
+class TradeFriendQuoteCache:
+    """
+    PURPOSE:
+    - ONE quote cache per process (dashboard, trigger engine, monitor)
+    - Per-consumer freshness: monitor 5s, dashboard 60s (config)
+    - Stale-while-revalidate: within the consumer's grace window a stale
+      quote is returned at once and refreshed in the background
+    - Coalescing: concurrent requests for the same symbol share ONE
+      broker call (the rest wait on its result)
+
+    LOADER CONTRACT:
+    - loader(list_of_symbols) -> {symbol: quote_dict}
+    - quote_dict carries at least "ltp"
+    """
+
+    def __init__(self):
+        self._entries = {}         # symbol -> (quote, ts)  (immutable tuple)
+        self._inflight = {}        # symbol -> Future
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="quote-refresh")
+
+        self._stats = {"hits": 0, "stale": 0, "misses": 0, "coalesced": 0, "loads": 0}
+
+    # --------------------------------------------------
+    # POLICY
+    # --------------------------------------------------
+    @staticmethod
+    def _policy(consumer: str):
+        max_age = QUOTE_MAX_AGE_SEC.get(consumer, QUOTE_MAX_AGE_SEC["default"])
+        grace = QUOTE_STALE_GRACE_SEC.get(consumer, QUOTE_STALE_GRACE_SEC["default"])
+        return max_age, grace
+
+    # --------------------------------------------------
+    # WRITE
+    # --------------------------------------------------
+    def put(self, symbol: str, quote: dict, ts: float = None):
+        self._entries[symbol] = (quote, ts or time.time())
+
+    def invalidate(self, symbol: str = None):
+        if symbol is None:
+            self._entries = {}
+        else:
+            self._entries.pop(symbol, None)
+
+    # --------------------------------------------------
+    # READ
+    # --------------------------------------------------
+    def peek(self, symbol: str):
+        """
+        Cached quote regardless of age (None if never seen).
+        """
+        entry = self._entries.get(symbol)
+        return entry[0] if entry else None
+
+    def get_many(self, symbols, loader, consumer: str = "default") -> dict:
+        """
+        Returns {symbol: quote} for every symbol with a usable quote.
+        """
+        max_age, grace = self._policy(consumer)
+        now = time.time()
+
+        results = {}
+        stale = []
+        missing = []
+
+        for symbol in dict.fromkeys(s for s in symbols if s):
+            entry = self._entries.get(symbol)
+            if entry is not None:
+                age = now - entry[1]
+                if age <= max_age:
+                    results[symbol] = entry[0]
+                    self._stats["hits"] += 1
+                    continue
+                if age <= max_age + grace:
+                    results[symbol] = entry[0]
+                    stale.append(symbol)
+                    self._stats["stale"] += 1
+                    continue
+            missing.append(symbol)
+
+        if stale:
+            self._refresh_async(stale, loader)
+
+        if missing:
+            self._stats["misses"] += len(missing)
+            results.update(self._load_blocking(missing, loader, max_age + grace))
+
+        return results
+
+    def get(self, symbol: str, loader, consumer: str = "default"):
+        return self.get_many([symbol], loader, consumer).get(symbol)
+
+    def stats(self) -> dict:
+        return dict(self._stats, size=len(self._entries), inflight=len(self._inflight))
+
+    # --------------------------------------------------
+    # LOADING (coalesced)
+    # --------------------------------------------------
+    def _claim(self, symbols):
+        """
+        Split symbols into those this caller must load and those
+        another thread is already loading (returned as futures).
+        """
+        mine, waiting = [], {}
+        with self._lock:
+            for symbol in symbols:
+                future = self._inflight.get(symbol)
+                if future is not None:
+                    waiting[symbol] = future
+                else:
+                    self._inflight[symbol] = Future()
+                    mine.append(symbol)
+        return mine, waiting
+
+    def _load(self, symbols, loader) -> dict:
+        try:
+            self._stats["loads"] += 1
+            loaded = loader(symbols) or {}
+        except Exception as e:
+            logger.warning(f"⚠️ Quote load failed | {len(symbols)} symbols | {e}")
+            loaded = {}
+
+        now = time.time()
+        for symbol, quote in loaded.items():
+            self._entries[symbol] = (quote, now)
+
+        with self._lock:
+            for symbol in symbols:
+                future = self._inflight.pop(symbol, None)
+                if future is not None:
+                    future.set_result(loaded.get(symbol))
+
+        return loaded
+
+    def _load_blocking(self, symbols, loader, max_age: float) -> dict:
+        mine, waiting = self._claim(symbols)
+        results = {}
+
+        if mine:
+            loaded = self._load(mine, loader)
+            for symbol in mine:
+                if symbol in loaded:
+                    results[symbol] = loaded[symbol]
+
+        for symbol, future in waiting.items():
+            self._stats["coalesced"] += 1
+            try:
+                quote = future.result(timeout=QUOTE_WAIT_TIMEOUT_SEC)
+            except FutureTimeout:
+                quote = None
+            if quote is not None:
+                results[symbol] = quote
+
+        # Broker had nothing → a quote another load just cached still
+        # counts, but never one older than the consumer accepts
+        now = time.time()
+        for symbol in symbols:
+            if symbol not in results:
+                entry = self._entries.get(symbol)
+                if entry is not None and now - entry[1] <= max_age:
+                    results[symbol] = entry[0]
+
+        return results
+
+    def _refresh_async(self, symbols, loader):
+        mine, _ = self._claim(symbols)
+        if mine:
+            self._executor.submit(self._load, mine, loader)
+
+
+def get_quote_cache() -> TradeFriendQuoteCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = TradeFriendQuoteCache()
+    return _cache
@@ -0,0 +1,407 @@
+# core/TradeFriendScanPipeline.py
+
+import multiprocessing
+import queue
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from config.TradeFriendConfig import (
+    SCAN_FETCH_WORKERS,
+    SCAN_CPU_WORKERS,
+    SCAN_BATCH_SIZE,
+    SCAN_BATCH_WAIT_SEC,
+    SCAN_QUEUE_SIZE,
+    SCAN_STATS_LOG_SEC
+)
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+_DONE = object()    # end-of-stream marker between stages
+
+
+class Carried:
+    """
+    fetch() payload for a row whose inputs did not change: `result`
+    goes straight to the writer (no indicators, no evaluation).
+    """
+
+    __slots__ = ("result",)
+
+    def __init__(self, result):
+        self.result = result
+
+
+# ================================================================================
+# CLASS: TradeFriendStageStats
+# ================================================================================
+class TradeFriendStageStats:
+    """
+    PURPOSE:
+    - Counters for ONE pipeline stage: items, failures, busy seconds
+    - Depth of the stage's output queue, sampled on every item
+    - busy% = busy seconds / (wall seconds * workers)
+      → ~100% on the bound stage, low on stages waiting for it
+    """
+
+    def __init__(self, name: str, workers: int, out_queue: queue.Queue = None):
+        self.name = name
+        self.workers = workers
+        self.queue = out_queue
+
+        self.items = 0
+        self.failed = 0
+        self.busy = 0.0
+        self.depth_max = 0
+        self._depth_total = 0
+        self._samples = 0
+
+        self.started = time.time()
+        self.finished = None
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float, ok: bool = True):
+        with self._lock:
+            self.items += 1
+            self.failed += 0 if ok else 1
+            self.busy += seconds
+            self._sample()
+
+    def sample(self):
+        with self._lock:
+            self._sample()
+
+    def _sample(self):
+        if self.queue is None:
+            return
+        depth = self.queue.qsize()
+        self.depth_max = max(self.depth_max, depth)
+        self._depth_total += depth
+        self._samples += 1
+
+    def done(self):
+        if self.finished is None:
+            self.finished = time.time()
+
+    def summary(self) -> dict:
+        with self._lock:
+            wall = max((self.finished or time.time()) - self.started, 1e-9)
+            return {
+                "stage": self.name,
+                "workers": self.workers,
+                "items": self.items,
+                "failed": self.failed,
+                "rate": self.items / wall,
+                "busy_pct": 100.0 * self.busy / (wall * max(self.workers, 1)),
+                "queue": self.queue.qsize() if self.queue is not None else None,
+                "queue_avg": self._depth_total / self._samples if self._samples else 0.0,
+                "queue_max": self.depth_max,
+            }
+
+    def __str__(self) -> str:
+        s = self.summary()
+        text = (
+            f"{s['stage']:<10} | items={s['items']} failed={s['failed']} | "
+            f"{s['rate']:.1f}/s | busy={s['busy_pct']:.0f}% x{s['workers']}"
+        )
+        if self.queue is not None:
+            text += (
+                f" | out queue={s['queue']}/{self.queue.maxsize} "
+                f"(avg={s['queue_avg']:.1f} max={s['queue_max']})"
+            )
+        return text
+
+
+# ================================================================================
+# CLASS: TradeFriendScanPipeline
+# ================================================================================
+class TradeFriendScanPipeline:
+    """
+    PURPOSE:
+    - Universe scan as stages joined by BOUNDED queues:
+        fetch      : I/O threads sized to the broker candle limit
+                     fetch(row) → payload, None (rejected by the caller)
+                     or Carried(result) (unchanged → straight to write)
+        indicators : rows grouped into batches → prepare(batch) builds one
+                     vectorized indicator panel per batch and returns
+                     [(row, evaluate args)]
+        evaluate   : evaluate(*args) on a PROCESS pool (strategy / plan /
+                     scoring off the GIL; args and results must pickle)
+        write      : ONE writer thread → write(row, result); no sqlite
+                     contention between workers
+    - A full queue blocks the stage feeding it: fetch never runs more
+      than SCAN_QUEUE_SIZE rows ahead of the indicators, and at most
+      SCAN_QUEUE_SIZE evaluations wait on the writer
+    - Stats per stage (throughput, busy%, queue depth) are logged every
+      SCAN_STATS_LOG_SEC and at the end → where the scan is bound
+
+    ERRORS:
+    - A stage exception drops that row only: logged, then
+      on_error(row, stage, error)
+    - A broken process pool (worker died) fails each row it can no
+      longer take; if the indicators thread itself fails, the rows it
+      holds and every row still coming from fetch are failed too
+      → every row gets an outcome and no fetch thread blocks forever
+    """
+
+    def __init__(self, fetch, prepare, evaluate, write, on_error=None,
+                 fetch_workers: int = SCAN_FETCH_WORKERS,
+                 cpu_workers: int = SCAN_CPU_WORKERS,
+                 batch_size: int = SCAN_BATCH_SIZE,
+                 queue_size: int = SCAN_QUEUE_SIZE):
+        self.fetch = fetch
+        self.prepare = prepare
+        self.evaluate = evaluate
+        self.write = write
+        self.on_error = on_error
+
+        self.fetch_workers = max(1, fetch_workers)
+        self.cpu_workers = max(0, cpu_workers)
+        self.batch_size = max(1, batch_size)
+        self.queue_size = queue_size
+
+        self.stats = {}
+
+    # ==================================================
+    # RUN
+    # ==================================================
+    def run(self, rows) -> dict:
+        """
+        Pushes every row through the stages; returns {stage: summary}.
+        """
+        source = queue.Queue()
+        for row in rows:
+            source.put(row)
+
+        fetched = queue.Queue(maxsize=self.queue_size)
+        results = queue.Queue(maxsize=self.queue_size)
+
+        self.stats = {
+            "fetch": TradeFriendStageStats("fetch", self.fetch_workers, fetched),
+            "indicators": TradeFriendStageStats("indicators", 1, results),
+            "evaluate": TradeFriendStageStats("evaluate", max(self.cpu_workers, 1)),
+            "write": TradeFriendStageStats("write", 1),
+        }
+
+        pool = (
+            ProcessPoolExecutor(
+                max_workers=self.cpu_workers,
+                # spawn: never fork a process that has live I/O threads
+                mp_context=multiprocessing.get_context("spawn")
+            )
+            if self.cpu_workers else None
+        )
+
+        threads = [
+            threading.Thread(target=self._fetch_stage, args=(source, fetched),
+                             name=f"scan-fetch-{i}", daemon=True)
+            for i in range(self.fetch_workers)
+        ]
+        threads.append(threading.Thread(target=self._compute_stage, args=(fetched, results, pool),
+                                        name="scan-indicators", daemon=True))
+        writer = threading.Thread(target=self._write_stage, args=(results,),
+                                  name="scan-writer", daemon=True)
+        threads.append(writer)
+
+        logger.info(
+            f"🏭 Scan pipeline | rows={source.qsize()} | fetch={self.fetch_workers} | "
+            f"cpu={self.cpu_workers or 'inline'} | batch={self.batch_size} | queue={self.queue_size}"
+        )
+
+        try:
+            for t in threads:
+                t.start()
+            while writer.is_alive():
+                writer.join(timeout=SCAN_STATS_LOG_SEC)
+                if writer.is_alive():
+                    self._log_stats("⏳")
+        finally:
+            if pool is not None:
+                pool.shutdown(wait=True)
+
+        self._log_stats("🏁")
+        return {name: stage.summary() for name, stage in self.stats.items()}
+
+    def _log_stats(self, marker: str):
+        for stage in self.stats.values():
+            stage.sample()
+            logger.info(f"{marker} Scan stage | {stage}")
+
+    def _fail(self, row, stage: str, error: Exception):
+        logger.exception(f"🔥 Scan {stage} failed | {_label(row)} | {error}", exc_info=error)
+        if self.on_error is not None:
+            self.on_error(row, stage, error)
+
+    # ==================================================
+    # STAGE 1: FETCH (I/O threads)
+    # ==================================================
+    def _fetch_stage(self, source: queue.Queue, fetched: queue.Queue):
+        stats = self.stats["fetch"]
+        try:
+            while True:
+                try:
+                    row = source.get_nowait()
+                except queue.Empty:
+                    return
+
+                start = time.perf_counter()
+                try:
+                    payload = self.fetch(row)
+                    ok = True
+                except Exception as e:
+                    payload, ok = None, False
+                    self._fail(row, "fetch", e)
+                stats.record(time.perf_counter() - start, ok)
+
+                if payload is not None:
+                    fetched.put((row, payload))    # blocks while indicators lag
+        finally:
+            fetched.put(_DONE)
+
+    # ==================================================
+    # STAGE 2: INDICATORS (batched) → EVALUATE (process pool)
+    # ==================================================
+    def _compute_stage(self, fetched: queue.Queue, results: queue.Queue, pool):
+        batch = []
+        producers = self.fetch_workers
+        try:
+            while producers:
+                try:
+                    item = fetched.get(timeout=SCAN_BATCH_WAIT_SEC)
+                except queue.Empty:
+                    # Fetch is stalling → don't let a partial batch idle
+                    if batch:
+                        self._dispatch(batch, results, pool)
+                        batch = []
+                    continue
+
+                if item is _DONE:
+                    producers -= 1
+                    continue
+
+                row, payload = item
+                if isinstance(payload, Carried):
+                    results.put((row, _ready(payload.result)))
+                    continue
+
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    self._dispatch(batch, results, pool)
+                    batch = []
+
+            self.stats["fetch"].done()
+            if batch:
+                self._dispatch(batch, results, pool)
+                batch = []
+        except Exception as e:
+            logger.exception(f"🔥 Scan indicators stage crashed | {e}")
+            for row, _ in batch:
+                self._fail(row, "indicators", e)
+            self._drain(fetched, producers, e)
+        finally:
+            self.stats["fetch"].done()
+            self.stats["indicators"].done()
+            results.put(_DONE)
+
+    def _drain(self, fetched: queue.Queue, producers: int, error: Exception):
+        # Keeps fetch threads from blocking on a full queue; what they
+        # still deliver is failed (→ journal / retry pass)
+        while producers:
+            item = fetched.get()
+            if item is _DONE:
+                producers -= 1
+            else:
+                self._fail(item[0], "indicators", error)
+
+    def _dispatch(self, batch: list, results: queue.Queue, pool):
+        stats = self.stats["indicators"]
+        start = time.perf_counter()
+        try:
+            tasks = self.prepare(batch)
+        except Exception as e:
+            for row, _ in batch:
+                self._fail(row, "indicators", e)
+            stats.record(time.perf_counter() - start, ok=False)
+            return
+
+        per_row = (time.perf_counter() - start) / max(len(tasks), 1)
+        for row, args in tasks:
+            if pool is not None:
+                try:
+                    future = pool.submit(_timed, self.evaluate, args)
+                except Exception as e:
+                    # BrokenProcessPool after a worker died, or pool shut down
+                    stats.record(per_row)
+                    self.stats["evaluate"].record(0.0, ok=False)
+                    self._fail(row, "evaluate", e)
+                    continue
+            else:
+                future = _run_inline(self.evaluate, args)
+            stats.record(per_row)
+            results.put((row, future))             # blocks while the writer lags
+
+    # ==================================================
+    # STAGE 3: WRITE (single thread)
+    # ==================================================
+    def _write_stage(self, results: queue.Queue):
+        evaluated = self.stats["evaluate"]
+        written = self.stats["write"]
+        try:
+            while True:
+                item = results.get()
+                if item is _DONE:
+                    return
+
+                row, future = item
+                try:
+                    result, seconds = future.result()
+                    if seconds is not None:         # None → carried, not evaluated
+                        evaluated.record(seconds)
+                except Exception as e:
+                    evaluated.record(0.0, ok=False)
+                    self._fail(row, "evaluate", e)
+                    continue
+
+                start = time.perf_counter()
+                try:
+                    self.write(row, result)
+                    ok = True
+                except Exception as e:
+                    ok = False
+                    self._fail(row, "write", e)
+                written.record(time.perf_counter() - start, ok)
+        finally:
+            evaluated.done()
+            written.done()
+
+
+# -------------------------------------------------
+# HELPERS (module level → picklable for the pool)
+# -------------------------------------------------
+def _timed(evaluate, args):
+    start = time.perf_counter()
+    result = evaluate(*args)
+    return result, time.perf_counter() - start
+
+
+def _ready(result) -> Future:
+    future = Future()
+    future.set_result((result, None))
+    return future
+
+
+def _run_inline(evaluate, args) -> Future:
+    future = Future()
+    try:
+        future.set_result(_timed(evaluate, args))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+
+def _label(row) -> str:
+    try:
+        return row["symbol"]
+    except (KeyError, TypeError, IndexError):
+        return str(row)
@@ -8,6 +8,9 @@ from datetime import datetime, time as dtime
 from core.TradeFriendDecisionRunner import TradeFriendDecisionRunner
 from core.TradeFriendMorningConfirmRunner import TradeFriendMorningConfirmRunner
 from core.TradeFriendSwingMonitor import TradeFriendSwingTradeMonitor
+from core.TradeFriendTickService import get_tick_service
+from core.TradeFriendTickReactor import TradeFriendTickReactor
+from config.TradeFriendConfig import TICK_REACT_ENABLED
 from db.TradeFriendTradeRepo import TradeFriendTradeRepo
 
 logger = logging.getLogger(__name__)
@@ -33,6 +36,8 @@ class TradeFriendScheduler:
 
         self._running = False
         self._thread = None
+        self.tick_service = None
+        self.reactor = None
 
         # 🔒 Phase memory
         self._last_scan_date = None
@@ -53,10 +58,25 @@ class TradeFriendScheduler:
         )
         self._thread.start()
 
+        # ⚡ Live prices for monitors (REST stays as fallback)
+        self.tick_service = get_tick_service()
+        if self.tick_service:
+            self.tick_service.start()
+
+            # ⚡ Ticks drive entry / exit checks (sub-second); the
+            # five-minute sweep below stays as the fallback
+            if TICK_REACT_ENABLED:
+                self.reactor = TradeFriendTickReactor(self.tick_service)
+                self.reactor.start()
+
         logger.info("🕒 TradeFriend Scheduler started")
 
     def stop(self):
         self._running = False
+        if self.reactor:
+            self.reactor.stop()
+        if self.tick_service:
+            self.tick_service.stop()
 
     # ==================================================
     # TIME HELPERS
@@ -115,6 +135,14 @@ class TradeFriendScheduler:
                     time.sleep(60)
                     continue
 
+                # ----------------------------------------------
+                # ⚡ TICK SUBSCRIPTIONS (follow trade changes)
+                # ----------------------------------------------
+                if self.tick_service:
+                    self.tick_service.sync_subscriptions()
+                if self.reactor:
+                    self.reactor.enabled = self.is_trigger_engine_time()
+
                 # ----------------------------------------------
                 # 1️⃣ DAILY SCAN (ONCE)
                 # ----------------------------------------------
@@ -148,12 +176,16 @@ class TradeFriendScheduler:
                     logger.info("🧠 Started Running Trigger engine monitor (once)")
                     if self._last_trigger_minute != minute_key:
 
-                        # ---- ENTRY ENGINE ----
-                        self.manager.tf_trigger_engine()
+                        if self.reactor:
+                            # Full sweep, serialized with the tick cycles
+                            self.reactor.run_cycle()
+                        else:
+                            # ---- ENTRY ENGINE ----
+                            self.manager.tf_trigger_engine()
 
-                        # ---- EXIT / MONITOR ----
-                        monitor = TradeFriendSwingTradeMonitor()
-                        monitor.run()
+                            # ---- EXIT / MONITOR ----
+                            monitor = TradeFriendSwingTradeMonitor()
+                            monitor.run()
 
                         self._last_trigger_minute = minute_key
 
@@ -2,14 +2,14 @@
 
 from utils.logger import get_logger
 from core.TradeFriendDataProvider import TradeFriendDataProvider
+from core.TradeFriendVolatilityService import get_volatility_service
 from db.TradeFriendTradeRepo import TradeFriendTradeRepo
 from Servieces.TradeFriendExitOrderService import TradeFriendExitOrderService
 from config.TradeFriendConfig import (
     ENABLE_PARTIAL_BOOKING,
     PARTIAL_BOOK_RR,
     SL_BUFFER_PCT,
-    HARD_EXIT_R_MULTIPLE,
-    TRAIL_ATR_MULTIPLE
+    HARD_EXIT_R_MULTIPLE
 )
 
 logger = get_logger(__name__)
@@ -27,18 +27,39 @@ class TradeFriendSwingTradeMonitor:
         self.provider = TradeFriendDataProvider()
         self.trade_repo = TradeFriendTradeRepo()
         self.exit_oms = TradeFriendExitOrderService()
+        self.volatility = get_volatility_service()
 
     # ==================================================
     # PUBLIC ENTRY
     # ==================================================
-    def run(self):
+    def run(self, symbols=None):
+        """
+        symbols: only trades on these symbols (tick-driven cycle);
+        None → every OPEN / PARTIAL trade (scheduler sweep).
+        """
         open_trades = self.trade_repo.fetch_open_trades()
+        if symbols is not None:
+            open_trades = [t for t in open_trades if t["symbol"] in symbols]
         if not open_trades:
             return
 
+        # One batched quote call for every open trade
+        ltp_map = self.provider.get_ltp_many(
+            [t["symbol"] for t in open_trades],
+            consumer="monitor"
+        )
+
+        # Trailing SL levels for every hold-mode trade in one vectorized pass
+        trail_levels = self.volatility.trailing_stops(
+            [t for t in open_trades if int(t["hold_mode"] or 0) == 1],
+            ltp_map
+        )
+
         for trade in open_trades:
             try:
-                self._process_trade(trade)
+                self._process_trade(
+                    trade, ltp_map.get(trade["symbol"]), trail_levels.get(trade["id"])
+                )
             except Exception as e:
                 logger.exception(
                     f"SwingTradeMonitor failed for {trade['symbol']}: {e}"
@@ -47,7 +68,7 @@ class TradeFriendSwingTradeMonitor:
     # ==================================================
     # PROCESS SINGLE TRADE
     # ==================================================
-    def _process_trade(self, trade: dict):
+    def _process_trade(self, trade: dict, ltp: float = None, trail_sl: float = None):
         symbol = trade["symbol"]
         entry = float(trade["entry"])
         sl = float(trade["sl"])
@@ -61,7 +82,9 @@ class TradeFriendSwingTradeMonitor:
            logger.warning(f"{symbol} → No remaining qty, skipping")
            return
 
-        ltp = self.provider.get_ltp_byLtp(symbol)
+        batched = ltp is not None
+        if ltp is None:
+            ltp = self.provider.get_ltp_byLtp(symbol, consumer="monitor")
         if ltp is None:
             logger.warning(f"{symbol} → LTP not available")
             return
@@ -111,11 +134,11 @@ class TradeFriendSwingTradeMonitor:
         # 4️⃣ TRAILING SL (AFTER PARTIAL)
         # ==================================================
         if hold_mode == 1:
-            atr = self.provider.get_atr(symbol, period=14)
-            if atr:
-                new_trailing_sl = ltp - (atr * TRAIL_ATR_MULTIPLE)
-                if new_trailing_sl > trailing_sl:
-                    self.trade_repo.update_sl(trade["id"], new_trailing_sl)
+            if trail_sl is None and not batched:
+                # LTP fetched singly (missing from the batch) → single-trade pass
+                trail_sl = self.volatility.trailing_stops([trade], {symbol: ltp}).get(trade["id"])
+            if trail_sl is not None:
+                self.trade_repo.update_sl(trade["id"], trail_sl)
 
         # ==================================================
         # 5️⃣ FINAL TARGET
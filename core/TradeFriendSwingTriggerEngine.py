@@ -37,28 +37,41 @@ class TradeFriendSwingTriggerEngine:
     # =====================================================
     # PUBLIC ENTRY
     # =====================================================
-    def run(self):
-        logger.info("📡 Swing Trigger Engine started")
+    def run(self, symbols=None):
+        """
+        symbols: only READY trades on these symbols (tick-driven cycle);
+        None → every READY trade (scheduler sweep).
+        """
+        log = logger.info if symbols is None else logger.debug
+        log("📡 Swing Trigger Engine started")
 
         ready_trades = self.trade_repo.fetch_ready_trades()
+        if symbols is not None:
+            ready_trades = [t for t in ready_trades if t["symbol"] in symbols]
         if not ready_trades:
-            logger.info("No READY trades to monitor")
+            log("No READY trades to monitor")
             return
 
+        # One batched quote call for every READY trade
+        ltp_map = self.provider.get_ltp_many(
+            [t["symbol"] for t in ready_trades],
+            consumer="trigger"
+        )
+
         for trade in ready_trades:
             try:
-                self._process_trade(dict(trade))
+                self._process_trade(dict(trade), ltp_map.get(trade["symbol"]))
             except Exception as e:
                 logger.exception(
                     f"Trigger failed | {trade.get('symbol')} | {e}"
                 )
 
-        logger.info("✅ Swing Trigger Engine completed")
+        log("✅ Swing Trigger Engine completed")
 
     # =====================================================
     # PROCESS SINGLE TRADE
     # =====================================================
-    def _process_trade(self, trade: dict):
+    def _process_trade(self, trade: dict, ltp: float = None):
         trade_id = trade["id"]
         symbol = trade["symbol"]
 
@@ -74,7 +87,8 @@ class TradeFriendSwingTriggerEngine:
         # -------------------------------
         # FETCH LTP
         # -------------------------------
-        ltp = self.provider.get_ltp(symbol)
+        if ltp is None:
+            ltp = self.provider.get_ltp(symbol, consumer="trigger")
         if not ltp or ltp <= 0:
             logger.warning(f"{symbol} → Invalid LTP")
             return
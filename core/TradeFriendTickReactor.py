@@ -0,0 +1,117 @@
+# core/TradeFriendTickReactor.py
+
+import time
+import threading
+
+from config.TradeFriendConfig import TICK_REACT_MIN_GAP_SEC
+from core.TradeFriendSwingMonitor import TradeFriendSwingTradeMonitor
+from core.TradeFriendSwingTriggerEngine import TradeFriendSwingTriggerEngine
+from db.TradeFriendSettingsRepo import TradeFriendSettingsRepo
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+# ================================================================================
+# CLASS: TradeFriendTickReactor
+# ================================================================================
+class TradeFriendTickReactor:
+    """
+    PURPOSE:
+    - Tick-driven entry / exit detection: a tick on a subscribed symbol
+      wakes ONE worker thread, which runs the trigger engine (READY)
+      and the swing monitor (OPEN / PARTIAL) for the symbols that ticked
+    - The tick callback only marks the symbol dirty → the socket thread
+      never waits on evaluation or order placement
+    - Bursts coalesce: at most one cycle per TICK_REACT_MIN_GAP_SEC
+    - run_cycle() is shared with the scheduler's periodic sweep and
+      serialized → a trade is never evaluated by both at once
+    - Trigger engine + monitor are built once; a cycle only re-reads
+      the available swing capital
+
+    The scheduler owns the time window: cycles run only while
+    `enabled` is True.
+    """
+
+    def __init__(self, tick_service):
+        self.tick_service = tick_service
+        self.settings_repo = TradeFriendSettingsRepo()
+        self.engine = TradeFriendSwingTriggerEngine(capital=0)
+        self.monitor = TradeFriendSwingTradeMonitor()
+
+        self.enabled = False
+        self._dirty = set()
+        self._dirty_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._cycle_lock = threading.Lock()
+
+        self._running = False
+        self._thread = None
+
+    # --------------------------------------------------
+    # LIFECYCLE
+    # --------------------------------------------------
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self.tick_service.add_listener(self.on_tick)
+        self._thread = threading.Thread(target=self._loop, name="tick-reactor", daemon=True)
+        self._thread.start()
+        logger.info("⚡ Tick reactor started")
+
+    def stop(self):
+        self._running = False
+        self._wake.set()
+
+    # --------------------------------------------------
+    # TICK LISTENER (socket thread)
+    # --------------------------------------------------
+    def on_tick(self, token):
+        if not self.enabled:
+            return
+        symbol = self.tick_service.symbol_for(token)
+        if symbol is None:
+            return
+        with self._dirty_lock:
+            self._dirty.add(symbol)
+        self._wake.set()
+
+    # --------------------------------------------------
+    # WORKER
+    # --------------------------------------------------
+    def _loop(self):
+        while self._running:
+            self._wake.wait()
+            self._wake.clear()
+            if not self._running:
+                return
+
+            with self._dirty_lock:
+                symbols, self._dirty = self._dirty, set()
+            if not symbols or not self.enabled:
+                continue
+
+            started = time.time()
+            self.run_cycle(symbols)
+
+            # Ticks arriving meanwhile stay dirty → next cycle
+            gap = TICK_REACT_MIN_GAP_SEC - (time.time() - started)
+            if gap > 0:
+                time.sleep(gap)
+
+    def run_cycle(self, symbols=None):
+        """
+        Entry + exit checks for `symbols` (None → every trade).
+        """
+        with self._cycle_lock:
+            try:
+                settings = self.settings_repo.fetch()
+                self.engine.capital = settings["available_swing_capital"]
+                self.engine.run(symbols)
+            except Exception:
+                logger.exception("Tick cycle: trigger engine failed")
+            try:
+                self.monitor.run(symbols)
+            except Exception:
+                logger.exception("Tick cycle: swing monitor failed")
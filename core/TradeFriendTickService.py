@@ -0,0 +1,408 @@
+# core/TradeFriendTickService.py
+
+import csv
+import time
+import threading
+
+from core.TradeFriendPriceBoard import get_price_board
+from core.TradeFriendCandleAggregator import get_candle_aggregator
+from db.TradeFriendTradeRepo import TradeFriendTradeRepo
+from db.dhan_db_helper import DhanDBHelper
+from utils.symbol_resolver import SymbolResolver
+from utils.logger import get_logger
+from config.TradeFriendConfig import (
+    TICK_STREAM_ENABLED, TICK_MAX_AGE_SEC, TICK_RESYNC_SEC, TICK_RECONNECT_SEC
+)
+
+logger = get_logger(__name__)
+
+# SmartWebSocketV2 subscription modes / exchange types
+WS_MODE_LTP = 1
+WS_EXCHANGE_NSE_CM = 1
+WS_CORRELATION_ID = "tradefriend"
+
+# ------------------------------------------------------------------------
+# Singleton Service Holder
+# ------------------------------------------------------------------------
+_service = None
+_service_lock = threading.Lock()
+
+
+# ================================================================================
+# CLASS: TradeFriendAngelTickSource
+# ================================================================================
+class TradeFriendAngelTickSource:
+    """
+    PURPOSE:
+    - Thin wrapper over SmartWebSocketV2 (LTP mode)
+    - Pushes every tick into the callback as (token, ltp, ts, volume)
+    - Runs the socket on its own daemon thread
+    """
+
+    def __init__(self, on_tick):
+        self.on_tick = on_tick
+        self.ws = None
+        self.connected = False
+        self._thread = None
+        self._tokens = set()
+
+    def start(self, tokens):
+        # Lazy import: SmartApi is optional for replay / paper setups
+        from SmartApi.smartWebSocketV2 import SmartWebSocketV2
+        from brokers.angel_client import init_client
+        from config.settings import api_key
+
+        client = init_client()
+        if not client.auth_token or not client.feed_token:
+            raise RuntimeError("Angel session not ready for streaming")
+
+        self._tokens = set(tokens)
+        self.ws = SmartWebSocketV2(
+            client.auth_token,
+            api_key,
+            client.client_code,
+            client.feed_token,
+        )
+        self.ws.on_open = self._on_open
+        self.ws.on_data = self._on_data
+        self.ws.on_error = self._on_error
+        self.ws.on_close = self._on_close
+
+        self._thread = threading.Thread(target=self.ws.connect, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self.ws:
+            try:
+                self.ws.close_connection()
+            except Exception as e:
+                logger.warning(f"⚠️ WebSocket close failed | {e}")
+        self.ws = None
+        self.connected = False
+
+    def is_alive(self) -> bool:
+        return bool(self._thread and self._thread.is_alive())
+
+    def subscribe(self, tokens):
+        tokens = set(tokens) - self._tokens
+        if not tokens:
+            return
+        self._tokens |= tokens
+        if self.connected:
+            self.ws.subscribe(WS_CORRELATION_ID, WS_MODE_LTP, _token_list(tokens))
+
+    def unsubscribe(self, tokens):
+        tokens = set(tokens) & self._tokens
+        if not tokens:
+            return
+        self._tokens -= tokens
+        if self.connected:
+            self.ws.unsubscribe(WS_CORRELATION_ID, WS_MODE_LTP, _token_list(tokens))
+
+    # --------------------------------------------------
+    # SOCKET CALLBACKS
+    # --------------------------------------------------
+    def _on_open(self, wsapp):
+        self.connected = True
+        logger.info(f"📡 Tick stream connected | tokens={len(self._tokens)}")
+        if self._tokens:
+            self.ws.subscribe(WS_CORRELATION_ID, WS_MODE_LTP, _token_list(self._tokens))
+
+    def _on_data(self, wsapp, message):
+        try:
+            token = message.get("token")
+            ltp = message.get("last_traded_price")
+            if token is None or ltp is None:
+                return
+            # Angel streams prices in paise, timestamps in ms
+            ts = message.get("exchange_timestamp")
+            volume = message.get("volume_trade_for_the_day")
+            self.on_tick(
+                str(token),
+                float(ltp) / 100.0,
+                ts / 1000.0 if ts else None,
+                float(volume) if volume is not None else None,
+            )
+        except Exception as e:
+            logger.warning(f"⚠️ Bad tick dropped | {e}")
+
+    def _on_error(self, wsapp, error):
+        logger.warning(f"⚠️ Tick stream error | {error}")
+
+    def _on_close(self, wsapp):
+        self.connected = False
+        logger.warning("🔌 Tick stream closed")
+
+
+# ================================================================================
+# CLASS: TradeFriendReplayTickSource
+# ================================================================================
+class TradeFriendReplayTickSource:
+    """
+    PURPOSE:
+    - Stand-in for the WebSocket (tests / offline / after hours)
+    - Replays (token, ltp[, ts[, volume]]) ticks from a list or a CSV file
+    - CSV columns: token, ltp[, ts, volume] (volume = cumulative day volume)
+    - `speed` = 0 pushes everything immediately, otherwise waits
+      `interval / speed` seconds between ticks
+    """
+
+    def __init__(self, on_tick, ticks=None, csv_path: str = None,
+                 interval: float = 0.0, speed: float = 1.0, loop: bool = False):
+        self.on_tick = on_tick
+        self.ticks = list(ticks or [])
+        if csv_path:
+            self.ticks.extend(self._load_csv(csv_path))
+
+        self.interval = interval
+        self.speed = speed
+        self.loop = loop
+
+        self.connected = False
+        self._thread = None
+        self._stop = threading.Event()
+        self._tokens = set()
+
+    @staticmethod
+    def _load_csv(path: str):
+        with open(path, newline="") as f:
+            for row in csv.DictReader(f):
+                ts = row.get("ts")
+                volume = row.get("volume")
+                yield (
+                    row["token"],
+                    float(row["ltp"]),
+                    float(ts) if ts else None,
+                    float(volume) if volume else None,
+                )
+
+    def start(self, tokens):
+        self._tokens = set(tokens)
+        self._stop.clear()
+        self.connected = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self.connected = False
+
+    def is_alive(self) -> bool:
+        return bool(self._thread and self._thread.is_alive())
+
+    def subscribe(self, tokens):
+        self._tokens |= set(tokens)
+
+    def unsubscribe(self, tokens):
+        self._tokens -= set(tokens)
+
+    def _run(self):
+        while not self._stop.is_set():
+            for tick in self.ticks:
+                if self._stop.is_set():
+                    return
+                token, ltp = str(tick[0]), tick[1]
+                ts = tick[2] if len(tick) > 2 else None
+                volume = tick[3] if len(tick) > 3 else None
+                # Replay everything when nothing was subscribed explicitly
+                if not self._tokens or token in self._tokens:
+                    self.on_tick(token, ltp, ts, volume)
+                if self.interval and self.speed:
+                    time.sleep(self.interval / self.speed)
+            if not self.loop:
+                break
+        self.connected = False
+
+
+# ================================================================================
+# CLASS: TradeFriendTickService
+# ================================================================================
+class TradeFriendTickService:
+    """
+    PURPOSE:
+    - ONE background tick stream per process
+    - Subscribes OPEN / PARTIAL / READY trades + holdings
+    - Writes every tick into the shared price board
+      and the intraday candle aggregator
+    - Re-syncs subscriptions as trades change (diff only)
+    - Reconnects the source if the socket thread dies
+    """
+
+    def __init__(self, source_factory=None):
+        self.board = get_price_board()
+        self.aggregator = get_candle_aggregator()
+        self.resolver = SymbolResolver()
+        self.trade_repo = TradeFriendTradeRepo()
+
+        self._source_factory = source_factory or TradeFriendAngelTickSource
+        self.source = None
+
+        self._lock = threading.Lock()
+        self._subscribed = {}          # token -> symbol
+        self._listeners = []           # fn(token) after every tick
+        self._last_sync = 0.0
+        self._last_connect = 0.0
+
+    # --------------------------------------------------
+    # LIFECYCLE
+    # --------------------------------------------------
+    def start(self, tokens=None):
+        with self._lock:
+            if self.source and self.source.is_alive():
+                return True
+
+            if tokens is None:
+                self._subscribed = self._wanted_tokens()
+                tokens = list(self._subscribed)
+
+            self._last_connect = time.time()
+            try:
+                self.source = self._source_factory(self._on_tick)
+                self.source.start(tokens)
+            except Exception as e:
+                self.source = None
+                logger.warning(f"⚠️ Tick service not started | {e}")
+                return False
+
+        logger.info(f"🟢 Tick service started | tokens={len(tokens)}")
+        return True
+
+    def stop(self):
+        with self._lock:
+            if self.source:
+                self.source.stop()
+            self.source = None
+        logger.info("🔴 Tick service stopped")
+
+    def is_live(self) -> bool:
+        """
+        True when a source is connected and ticking recently.
+        """
+        source = self.source
+        if not source or not source.connected:
+            return False
+        return (time.time() - self.board.last_tick_ts) <= TICK_MAX_AGE_SEC
+
+    # --------------------------------------------------
+    # SUBSCRIPTIONS
+    # --------------------------------------------------
+    def _wanted_tokens(self) -> dict:
+        symbols = set()
+
+        for row in self.trade_repo.fetch_open_trades():
+            symbols.add(row["symbol"])
+        for row in self.trade_repo.fetch_ready_trades():
+            symbols.add(row["symbol"])
+
+        try:
+            for row in DhanDBHelper().get_all():
+                if row.get("symbol"):
+                    symbols.add(row["symbol"])
+        except Exception as e:
+            logger.warning(f"⚠️ Holdings not read for ticks | {e}")
+
+        wanted = {}
+        for symbol in symbols:
+            resolved = self.resolver.resolve_symbol(symbol)
+            if resolved:
+                wanted[str(resolved["token"])] = symbol
+        return wanted
+
+    def sync_subscriptions(self, force: bool = False):
+        """
+        Cheap to call every scheduler tick: re-reads trades at most
+        every TICK_RESYNC_SEC and only sends the subscription diff.
+        Also restarts a dead source (throttled by TICK_RECONNECT_SEC).
+        """
+        now = time.time()
+        self.aggregator.flush(now)
+
+        if self.source is None or not self.source.is_alive():
+            if now - self._last_connect >= TICK_RECONNECT_SEC:
+                self.start()
+            return
+
+        if not force and now - self._last_sync < TICK_RESYNC_SEC:
+            return
+        self._last_sync = now
+
+        wanted = self._wanted_tokens()
+        with self._lock:
+            added = set(wanted) - set(self._subscribed)
+            removed = set(self._subscribed) - set(wanted)
+
+            if added:
+                self.source.subscribe(added)
+            if removed:
+                self.source.unsubscribe(removed)
+                self.board.clear(removed)
+
+            self._subscribed = wanted
+
+        if added or removed:
+            logger.info(
+                f"🔁 Tick subscriptions | +{len(added)} -{len(removed)} | "
+                f"total={len(wanted)}"
+            )
+
+    def symbol_for(self, token):
+        return self._subscribed.get(str(token))
+
+    # --------------------------------------------------
+    # READ
+    # --------------------------------------------------
+    def get_ltp(self, token, max_age: float = TICK_MAX_AGE_SEC):
+        if not self.is_live():
+            return None
+        return self.board.get(token, max_age=max_age)
+
+    # --------------------------------------------------
+    # TICK SINK
+    # --------------------------------------------------
+    def add_listener(self, listener):
+        """
+        listener(token) runs on the socket thread after every tick →
+        must only mark work, never evaluate / call the broker.
+        """
+        self._listeners.append(listener)
+
+    def _on_tick(self, token: str, ltp: float, ts: float = None, volume: float = None):
+        self.board.update(token, ltp, ts, volume)
+        self.aggregator.on_tick(token, ltp, ts, volume)
+        for listener in self._listeners:
+            try:
+                listener(token)
+            except Exception as e:
+                logger.warning(f"⚠️ Tick listener failed | {token} | {e}")
+
+
+# -------------------------------------------------
+# HELPERS
+# -------------------------------------------------
+def _token_list(tokens):
+    return [{"exchangeType": WS_EXCHANGE_NSE_CM, "tokens": [str(t) for t in tokens]}]
+
+
+def get_tick_service(source_factory=None) -> TradeFriendTickService | None:
+    """
+    Shared tick service (None when streaming is disabled).
+    `source_factory` only applies on first creation (replay in tests).
+    """
+    global _service
+    if not TICK_STREAM_ENABLED:
+        return None
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = TradeFriendTickService(source_factory=source_factory)
+    return _service
+
+
+def get_live_ltp(token, max_age: float = TICK_MAX_AGE_SEC):
+    """
+    Board price for `token` if the stream is live, else None.
+    Never creates the service (readers must not open sockets).
+    """
+    if _service is None:
+        return None
+    return _service.get_ltp(token, max_age=max_age)
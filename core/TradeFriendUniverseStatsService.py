@@ -0,0 +1,179 @@
+# core/TradeFriendUniverseStatsService.py
+
+import numpy as np
+import pandas as pd
+
+from config.settings import DEFAULT_INTERVAL
+from config.TradeFriendConfig import (
+    ATR_PERIOD,
+    PREFILTER_ENABLED,
+    UNIVERSE_STATS_BARS,
+    UNIVERSE_REVALIDATE_DAYS
+)
+from core.TradeFriendIndicatorPanel import TradeFriendIndicatorPanel
+from db.TradeFriendCandleArrayStore import TradeFriendCandleArrayStore
+from db.TradeFriendUniverseStatsRepo import (
+    TradeFriendUniverseStatsRepo, STAT_COLUMNS, UPPER_BOUND_COLUMNS, OPERATORS
+)
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+WEEKS_52_BARS = 252
+
+
+def where(column: str, op: str, value) -> tuple:
+    """
+    ('bars', '>=', 60) — one predicate of a strategy's PREFILTER.
+    value may be a callable, resolved when the filter runs (None → no limit).
+    Upper-bound stats (UPPER_BOUND_COLUMNS) only take '>' / '>='.
+    """
+    if column not in STAT_COLUMNS:
+        raise ValueError(f"Unknown universe stat '{column}' (known: {', '.join(STAT_COLUMNS)})")
+    if op not in OPERATORS:
+        raise ValueError(f"Unsupported pre-filter operator '{op}'")
+    if column in UPPER_BOUND_COLUMNS and op not in (">", ">="):
+        raise ValueError(f"'{column}' is an upper bound — only '>' / '>=' are safe")
+    return column, op, value
+
+
+# ================================================================================
+# CLASS: TradeFriendUniverseStatsService
+# ================================================================================
+class TradeFriendUniverseStatsService:
+    """
+    PURPOSE:
+    - refresh(): universe stats table rebuilt from the published candle
+      snapshot in one vectorized panel pass — skipped while the snapshot
+      generation is unchanged, so it runs once per publish (nightly)
+    - prefilter(): drops the symbols every strategy's PREFILTER rejects,
+      using ONE SQL query, before any history fetch / indicator work
+
+    STRATEGY CONTRACT:
+    - PREFILTER = (where(column, op, value), ...)  — all must hold;
+      empty / missing → the strategy needs the whole universe
+    """
+
+    def __init__(self, interval: str = DEFAULT_INTERVAL,
+                 store: TradeFriendCandleArrayStore = None,
+                 repo: TradeFriendUniverseStatsRepo = None):
+        self.store = store or TradeFriendCandleArrayStore(interval)
+        self.repo = repo or TradeFriendUniverseStatsRepo()
+
+    # ==================================================
+    # REFRESH (one panel pass per candle snapshot)
+    # ==================================================
+    def refresh(self, force: bool = False) -> int:
+        generation = self.store.generation()
+        if generation is None:
+            return 0
+        if not force and self.repo.refreshed_from() == generation:
+            return self.repo.count()
+
+        tokens = self.store.tokens()
+        panel = TradeFriendIndicatorPanel.from_array_store(
+            self.store, {token: token for token in tokens}, bars=UNIVERSE_STATS_BARS
+        ).compute({"atr": ("atr", {"period": ATR_PERIOD})})
+
+        stats = _universe_stats(panel)
+        written = self.repo.replace_all(stats, source=generation)
+
+        logger.info(f"📚 Universe stats refreshed | tokens={written} | snapshot={generation}")
+        return written
+
+    # ==================================================
+    # PRE-FILTER
+    # ==================================================
+    def prefilter(self, rows, prefilters, label: str = "scan", token_of=None) -> list:
+        """
+        rows       : universe rows (token under row["token"], or token_of(row))
+        prefilters : one PREFILTER per strategy the scan runs
+        Returns the rows at least one strategy still wants. Any failure
+        falls back to the full universe — the filter only saves work.
+        """
+        rows = list(rows)
+        if not PREFILTER_ENABLED or not rows:
+            return rows
+
+        token_of = token_of or (lambda row: row["token"])
+        try:
+            self.refresh()
+            excluded = self.repo.excluded_tokens(prefilters, UNIVERSE_REVALIDATE_DAYS)
+        except Exception as e:
+            logger.exception(f"Universe pre-filter failed, scanning everything: {e}")
+            return rows
+
+        kept = [row for row in rows if str(token_of(row)) not in excluded]
+        logger.info(
+            f"🧹 Universe pre-filter | {label} | universe={len(rows)} | "
+            f"kept={len(kept)} | excluded={len(rows) - len(kept)}"
+        )
+        return kept
+
+
+# -------------------------------------------------
+# STATS (vectorized over the panel)
+# -------------------------------------------------
+def _universe_stats(panel: TradeFriendIndicatorPanel) -> list:
+    n = len(panel.symbols)
+    if not n:
+        return []
+
+    rows = np.arange(n)
+    lengths = np.asarray(panel.lengths, dtype=np.int64)
+    last = lengths - 1
+    cols = panel.columns
+
+    close = cols["close"][rows, last]
+    high = cols["high"][rows, last]
+    turnover = cols["close"] * cols["volume"]
+
+    avg_20 = _trailing_mean(turnover, last, 20)
+    avg_50 = _trailing_mean(turnover, last, 50)
+    high_52w = _trailing(cols["high"], last, WEEKS_52_BARS, np.fmax)
+    low_52w = _trailing(cols["low"], last, WEEKS_52_BARS, np.fmin)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        atr_pct = cols["atr"][rows, last] / close * 100
+        high_dist = (high_52w - close) / high_52w * 100
+        low_dist = (close - low_52w) / low_52w * 100
+
+    return [
+        {
+            "token": token,
+            "last_close": _value(close[i]),
+            "last_high": _value(high[i]),
+            "avg_turnover_20": _value(avg_20[i]),
+            "avg_turnover_50": _value(avg_50[i]),
+            "atr_pct": _value(atr_pct[i]),
+            "high_52w": _value(high_52w[i]),
+            "low_52w": _value(low_52w[i]),
+            "high_52w_dist_pct": _value(high_dist[i]),
+            "low_52w_dist_pct": _value(low_dist[i]),
+            "last_bar_date": pd.Timestamp(panel.timestamps[token][-1]).strftime("%Y-%m-%d"),
+            "bars": int(lengths[i]),
+        }
+        for i, token in enumerate(panel.symbols)
+    ]
+
+
+def _window(values: np.ndarray, last: np.ndarray, window: int):
+    # (rows, window) block of each row's trailing bars; short history → NaN
+    idx = last[:, None] - np.arange(window)[None, :]
+    taken = values[np.arange(len(last))[:, None], np.maximum(idx, 0)]
+    return np.where(idx >= 0, taken, np.nan)
+
+
+def _trailing_mean(values: np.ndarray, last: np.ndarray, window: int) -> np.ndarray:
+    # Full window required: a partial average would judge a new listing
+    block = _window(values, last, window)
+    return np.where(last + 1 >= window, np.nansum(block, axis=1) / window, np.nan)
+
+
+def _trailing(values: np.ndarray, last: np.ndarray, window: int, reduce) -> np.ndarray:
+    # fmax / fmin skip NaN; whatever history exists (up to 52 weeks)
+    return reduce.reduce(_window(values, last, window), axis=1)
+
+
+def _value(x):
+    return float(x) if np.isfinite(x) else None
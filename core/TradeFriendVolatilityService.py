@@ -0,0 +1,240 @@
+# core/TradeFriendVolatilityService.py
+
+import threading
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from config.settings import DEFAULT_INTERVAL
+from config.TradeFriendConfig import ATR_HISTORY_BARS, ATR_PERIOD, TRAIL_ATR_MULTIPLE
+from core.TradeFriendIndicatorPanel import TradeFriendIndicatorPanel
+from core.TradeFriendIndicatorStateService import SESSION_CLOSE
+from core.TradeFriendPriceBoard import get_price_board
+from db.TradeFriendCandleArrayStore import TradeFriendCandleArrayStore
+from utils.symbol_resolver import SymbolResolver
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# ------------------------------------------------------------------------
+# Singleton Service Holder
+# ------------------------------------------------------------------------
+_service = None
+_service_lock = threading.Lock()
+
+
+# ================================================================================
+# CLASS: TradeFriendVolatilityService
+# ================================================================================
+class TradeFriendVolatilityService:
+    """
+    PURPOSE:
+    - Wilder ATR(14) and ATR% for the WHOLE universe, computed once a
+      day from the candle snapshot (one vectorized panel pass)
+    - Held in memory as per-token arrays; intraday the live bar's range
+      is tracked from the price board / monitor LTPs, so the ATR moves
+      with today's true range without any history fetch
+    - trailing_stops() → trailing-SL levels for every open trade in one
+      vectorized call (no broker calls in the monitor loop)
+
+    LIVE ATR:
+    - (ATR_closed * (p - 1) + TR_today) / p, TR_today from today's
+      high / low so far and the last closed close (Wilder's next step)
+    """
+
+    def __init__(self, period: int = ATR_PERIOD, interval: str = DEFAULT_INTERVAL,
+                 store: TradeFriendCandleArrayStore = None, board=None, resolver=None):
+        self.period = period
+        self.store = store or TradeFriendCandleArrayStore(interval)
+        self.board = board or get_price_board()
+        self.resolver = resolver
+
+        self._lock = threading.Lock()
+        self._day = None
+        self._generation = None           # candle snapshot the arrays came from
+        self._rows = {}                   # token -> row
+        self._atr = np.empty(0)           # ATR at the last closed bar
+        self._prev_close = np.empty(0)    # last closed close
+        self._day_high = np.empty(0)      # today's range so far (NaN = no print yet)
+        self._day_low = np.empty(0)
+        self._tokens = {}                 # symbol -> token (resolver cache)
+
+    # ==================================================
+    # DAILY REFRESH (one panel pass)
+    # ==================================================
+    def refresh(self, force: bool = False) -> int:
+        # Once a day, and again whenever a new snapshot is published;
+        # no snapshot / empty panel → retried on the next call
+        today = datetime.now().date()
+        generation = self.store.generation()
+        if not force and self._day == today and self._generation == generation:
+            return len(self._rows)
+
+        tokens = self.store.tokens()
+        panel = TradeFriendIndicatorPanel.from_array_store(
+            self.store, {token: token for token in tokens}, bars=ATR_HISTORY_BARS
+        ).compute({"atr": ("atr", {"period": self.period})})
+
+        n = len(panel.symbols)
+        rows = np.arange(n)
+        lengths = panel.lengths
+        closed = lengths - np.array(
+            [self._has_live_bar(panel.timestamps[token], today) for token in panel.symbols],
+            dtype=np.int64
+        )
+        usable = closed > 0
+        last = np.maximum(closed - 1, 0)
+        live = np.maximum(lengths - 1, 0)
+
+        atr = np.where(usable, panel.columns["atr"][rows, last], np.nan) if n else np.empty(0)
+        prev_close = np.where(usable, panel.columns["close"][rows, last], np.nan) if n else np.empty(0)
+        has_live = closed < lengths
+        day_high = np.where(has_live, panel.columns["high"][rows, live], np.nan) if n else np.empty(0)
+        day_low = np.where(has_live, panel.columns["low"][rows, live], np.nan) if n else np.empty(0)
+
+        with self._lock:
+            self._rows = panel.rows
+            self._atr = atr
+            self._prev_close = prev_close
+            self._day_high = day_high
+            self._day_low = day_low
+            self._day = today if n else None
+            self._generation = generation
+
+        logger.info(
+            f"📏 Volatility refreshed | tokens={n} | "
+            f"with ATR={int(np.count_nonzero(np.isfinite(atr)))}"
+        )
+        return n
+
+    def _has_live_bar(self, stamps, today) -> bool:
+        # Today's daily bar is still forming until the session close
+        if not len(stamps) or datetime.now().time() >= SESSION_CLOSE:
+            return False
+        return pd.Timestamp(stamps[-1]).date() == today
+
+    # ==================================================
+    # INTRADAY (price board / LTPs)
+    # ==================================================
+    def observe(self, prices: dict):
+        """
+        {token: ltp} prints extend today's high / low.
+        """
+        with self._lock:
+            rows, values = self._select(prices)
+            if len(rows):
+                np.fmax.at(self._day_high, rows, values)
+                np.fmin.at(self._day_low, rows, values)
+
+    def _observe_board(self):
+        if self._day is None:
+            return
+        start = datetime.combine(self._day, datetime.min.time()).timestamp()
+        self.observe({
+            token: ltp for token, (ltp, ts, _) in self.board.snapshot().items() if ts >= start
+        })
+
+    def _select(self, prices: dict):
+        pairs = [(self._rows[str(t)], p) for t, p in prices.items()
+                 if p is not None and str(t) in self._rows]
+        if not pairs:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        rows, values = zip(*pairs)
+        return np.asarray(rows, dtype=np.int64), np.asarray(values, dtype=np.float64)
+
+    def _live_atr(self, rows: np.ndarray) -> np.ndarray:
+        atr = self._atr[rows]
+        prev_close = self._prev_close[rows]
+        high, low = self._day_high[rows], self._day_low[rows]
+
+        tr = np.fmax.reduce([high - low, np.abs(high - prev_close), np.abs(low - prev_close)])
+        # No print today → the closed-bar ATR stands
+        return np.where(np.isnan(tr), atr, (atr * (self.period - 1) + tr) / self.period)
+
+    # ==================================================
+    # READ
+    # ==================================================
+    def _ensure_fresh(self):
+        self.refresh()
+        self._observe_board()
+
+    def get(self, token: str) -> dict | None:
+        """
+        {atr, atr_pct, prev_close} for one token (live ATR), or None.
+        """
+        self._ensure_fresh()
+        with self._lock:
+            row = self._rows.get(str(token))
+            if row is None:
+                return None
+            atr = float(self._live_atr(np.array([row]))[0])
+            prev_close = float(self._prev_close[row])
+
+        if not np.isfinite(atr):
+            return None
+        return {
+            "atr": atr,
+            "atr_pct": atr / prev_close * 100 if prev_close else None,
+            "prev_close": prev_close,
+        }
+
+    def get_atr(self, token: str):
+        values = self.get(token)
+        return values["atr"] if values else None
+
+    # ==================================================
+    # BATCH TRAILING STOPS
+    # ==================================================
+    def trailing_stops(self, trades, ltp_map: dict, multiple: float = TRAIL_ATR_MULTIPLE) -> dict:
+        """
+        trades  : open trade rows (id, symbol, sl, trailing_sl)
+        ltp_map : {symbol: ltp}
+        Returns {trade id: new trailing SL} for trades whose
+        ltp - ATR * multiple now sits above their current trailing SL.
+        """
+        self._ensure_fresh()
+
+        picked = []
+        for trade in trades:
+            token = self._token_for(trade["symbol"])
+            ltp = ltp_map.get(trade["symbol"])
+            if token is None or ltp is None:
+                continue
+            picked.append((trade["id"], token, float(ltp), float(trade["trailing_sl"] or trade["sl"])))
+
+        if not picked:
+            return {}
+
+        ids, tokens, ltps, current = zip(*picked)
+        self.observe(dict(zip(tokens, ltps)))
+
+        with self._lock:
+            known = np.array([t in self._rows for t in tokens])
+            rows = np.array([self._rows.get(t, 0) for t in tokens], dtype=np.int64)
+            atr = np.where(known, self._live_atr(rows), np.nan) if len(self._rows) else np.full(len(rows), np.nan)
+
+        levels = np.asarray(ltps) - atr * multiple
+        raise_sl = np.isfinite(levels) & (levels > np.asarray(current))
+
+        return {ids[i]: float(levels[i]) for i in np.flatnonzero(raise_sl)}
+
+    def _token_for(self, symbol: str):
+        token = self._tokens.get(symbol)
+        if token is None:
+            if self.resolver is None:
+                self.resolver = SymbolResolver()
+            resolved = self.resolver.resolve_symbol(symbol)
+            if not resolved:
+                return None
+            token = self._tokens[symbol] = str(resolved["token"])
+        return token
+
+
+def get_volatility_service() -> TradeFriendVolatilityService:
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = TradeFriendVolatilityService()
+    return _service
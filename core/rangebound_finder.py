@@ -3,7 +3,8 @@
 import os
 from typing import Tuple, List
 from utils.logger import get_logger
-from brokers.angel_client import AngelClient
+from core.TradeFriendDataProvider import TradeFriendDataProvider
+from config.settings import RangeBoundLOOKBACK_DAYS
 from utils.symbol_resolver import SymbolResolver
 from db.dhan_db_helper import DhanDBHelper
 from core.rangebound_service import RangeboundService
@@ -31,9 +32,9 @@ def run_rangebound_finder(input_folder: str, output_folder: str) -> Tuple[bool,
     db = DhanDBHelper()
     service = RangeboundService()
     resolver = SymbolResolver()
-    broker = AngelClient()
+    provider = TradeFriendDataProvider()
     
-    if getattr(broker, "smart_api", None) is None:
+    if getattr(provider.broker, "smart_api", None) is None:
         logger.error("Broker login failed.")
         return False, []
 
@@ -53,7 +54,9 @@ def run_rangebound_finder(input_folder: str, output_folder: str) -> Tuple[bool,
             logger.info(f"Processing {trading_symbol} and token {token}...")
 
           
-            df = broker.get_RangeBoundhistorical_data(trading_symbol, token)
+            df = provider.get_daily_data(
+                trading_symbol, token, days=RangeBoundLOOKBACK_DAYS
+            )
             if df is None or df.empty:
                 rejections.append(f"{trading_symbol} → No historical data")
                 continue
@@ -78,6 +81,8 @@ def run_rangebound_finder(input_folder: str, output_folder: str) -> Tuple[bool,
         except Exception as e:
             rejections.append(f"{name} → Error {e}")
 
+    provider.publish_candle_arrays()
+
     if rejections:
         logger.warning(f"Some symbols were rejected: {len(rejections)}")
         for r in rejections:
@@ -1,49 +1,55 @@
 # signal_service.py
 
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 from utils.logger import get_logger
+from utils.rolling_kernels import recent_max, recent_min, rolling_mean
 
 logger = get_logger(__name__)
 
 class RangeboundService:
 
+    # ------------------------------------------------------------
+    # ➤ Bar dates + numeric columns as arrays (input never mutated)
+    # ------------------------------------------------------------
+    def _bar_dates(self, df) -> np.ndarray:
+        for col in ("date", "timestamp", "time"):
+            if col in df.columns:
+                return pd.to_datetime(df[col], errors="coerce").to_numpy()
+        # fallback to index if no date column exists
+        return pd.to_datetime(df.index, errors="coerce").to_numpy()
+
+    def _column(self, df, col: str) -> np.ndarray:
+        return pd.to_numeric(df[col], errors="coerce").to_numpy(np.float64)
+
     # ------------------------------------------------------------
     # ➤ Identify yearly range (LL–HH) and % width
     # ------------------------------------------------------------
     def identify_range(self, df: pd.DataFrame, symbol: str):
         try:
-            # 1) Clean numeric columns
-            for col in ["close", "open", "high", "low", "volume"]:
-                if col in df.columns:
-                    df[col] = pd.to_numeric(df[col], errors="coerce")
-    
             if df.empty or "close" not in df.columns:
                 return None
     
-            # 2) Normalize date column
-            if "date" in df.columns:
-                df["date"] = pd.to_datetime(df["date"], errors="coerce")
-            elif "timestamp" in df.columns:
-                df["date"] = pd.to_datetime(df["timestamp"], errors="coerce")
-            elif "time" in df.columns:
-                df["date"] = pd.to_datetime(df["time"], errors="coerce")
-            else:
-                # fallback to index if no date column exists
-                df["date"] = pd.to_datetime(df.index, errors="coerce")
-    
-            df = df.dropna(subset=["date"])
+            # 1) Dates (bars ascending); undated bars are ignored
+            dates = self._bar_dates(df)
+            low = self._column(df, "low")
+            high = self._column(df, "high")
+
+            dated = ~np.isnat(dates)
+            if not dated.all():
+                dates, low, high = dates[dated], low[dated], high[dated]
     
-            # 3) Filter last 1 year
-            one_year_ago = datetime.now() - timedelta(days=365)
-            df = df[df["date"] >= one_year_ago]
+            # 2) Bars inside the last year = a suffix of the series
+            one_year_ago = np.datetime64(datetime.now() - timedelta(days=365))
+            year_bars = len(dates) - int(np.searchsorted(dates, one_year_ago, side="left"))
     
-            if df.empty:
+            if year_bars == 0:
                 return None
     
-            # 4) Compute range metrics
-            ll = df["low"].min()
-            hh = df["high"].max()
+            # 3) Range extremes over that window (rolling kernels, NaN-safe)
+            (ll,) = recent_min(low, (year_bars,))
+            (hh,) = recent_max(high, (year_bars,))
     
             if ll == 0 or hh == 0:
                 return None
@@ -70,8 +76,8 @@ class RangeboundService:
             tol_low = ll * (1 + tolerance_pct / 100)
             tol_high = hh * (1 - tolerance_pct / 100)
 
-            low_touches = df[df["low"] <= tol_low].shape[0]
-            high_touches = df[df["high"] >= tol_high].shape[0]
+            low_touches = int(np.count_nonzero(self._column(df, "low") <= tol_low))
+            high_touches = int(np.count_nonzero(self._column(df, "high") >= tol_high))
 
             return {
                 "low_touches": low_touches,
@@ -103,12 +109,12 @@ class RangeboundService:
     # ------------------------------------------------------------
     def get_momentum(self, df: pd.DataFrame):
         try:
-            delta = df["close"].diff()
-            gain = delta.clip(lower=0).rolling(14).mean()
-            loss = -delta.clip(upper=0).rolling(14).mean()
-            rs = gain / loss
-            rsi = 100 - (100 / (1 + rs))
-            return round(float(rsi.iloc[-1]), 2)
+            delta = np.diff(self._column(df, "close"), prepend=np.nan)
+            gain = rolling_mean(np.clip(delta, 0, None), 14)[-1]
+            loss = -rolling_mean(np.clip(delta, None, 0), 14)[-1]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                rsi = 100 - (100 / (1 + gain / loss))
+            return round(float(rsi), 2)
         except:
             return None
 
@@ -159,7 +165,7 @@ class RangeboundService:
 
         record = {
             "symbol": symbol,
-            "date": df["date"].iloc[-1],
+            "date": pd.Timestamp(self._bar_dates(df)[-1]),
             "year_low": ll,
             "year_high": hh,
             "low_touches": touches["low_touches"],
@@ -1,10 +1,13 @@
 import os, datetime
 from typing import Tuple, List
 from utils.indicators import IndicatorEngine
+from core.TradeFriendIndicatorPanel import TradeFriendIndicatorPanel
+from core.TradeFriendUniverseStatsService import TradeFriendUniverseStatsService
+from strategy.TradeFriendFinderStrategies import finder_planner
 from utils.file_handler import save_pdf, save_text, load_symbols_from_csv
 from utils.logger import get_logger, sanitize_for_log
 from db.missing_token_db import MissingTokenDB
-from brokers.angel_client import AngelClient
+from core.TradeFriendDataProvider import TradeFriendDataProvider
 from utils.sendemail import send_email_with_attachments
 from utils.symbol_resolver import SymbolResolver
 
@@ -28,6 +31,70 @@ def _derive_trade_date_from_input_folder(input_folder: str) -> str:
         pass
     return datetime.datetime.now().strftime("%Y-%m-%d")
 
+def _evaluate_strategies(provider, mapped, rejections):
+    """
+    mapped: [(name, trading_symbol, token)]
+    - Daily candles per symbol, then every finder strategy's indicators
+      for the whole universe in ONE planned pass
+    - Per symbol: EMA crossover first, Bollinger momentum on rejection
+    Returns (ema_signals, bb_signals, engine for the report formatters).
+    """
+    frames, tokens = {}, {}
+    for name, trading_symbol, token in mapped:
+        try:
+            df = provider.get_daily_series(trading_symbol, token)
+            if df is None or df.empty:
+                rejections.append(f"{trading_symbol} → No historical data")
+                continue
+
+            required_cols = {"close", "high", "low", "open", "volume"}
+            missing = required_cols - set(df.columns)
+            if missing:
+                rejections.append(f"{trading_symbol} → Missing columns {missing}")
+                continue
+
+            frames[trading_symbol] = df
+            tokens[trading_symbol] = token
+
+        except Exception as e:
+            logger.exception(f"Error processing {name}: {e}")
+            rejections.append(f"{name} → Error {e}")
+
+    ema_signals, bb_signals = [], []
+    if not frames:
+        return ema_signals, bb_signals, None
+
+    planner = finder_planner()
+    panel = planner.compute(TradeFriendIndicatorPanel.from_frames(frames))
+
+    for trading_symbol, token in tokens.items():
+        results = planner.evaluate(panel, trading_symbol, token=token)
+        signal = results.get("ema_crossover")
+        bb_signal = results.get("bollinger_momentum")
+
+        if signal is None or bb_signal is None:
+            rejections.append(f"{trading_symbol} → Error evaluating strategies")
+            continue
+
+        # ----- EMA Crossover First -----
+        if not signal.get("reason"):
+            ema_signals.append(signal)
+            logger.info(sanitize_for_log(
+                f"EMA Signal: {trading_symbol} BUY at {signal.get('entry')}"
+            ))
+        # EMA failed → Bollinger Band
+        elif bb_signal.get("signal") != "No Bollinger Signal":
+            bb_signals.append(bb_signal)
+            logger.info(sanitize_for_log(
+                f"BB Signal: {trading_symbol} → {bb_signal.get('signal')} at {bb_signal.get('close')}"
+            ))
+        else:
+            rejections.append(f"{trading_symbol} → EMA & BB conditions not met")
+
+    # Report formatters don't read the frame; any engine instance will do
+    engine = IndicatorEngine(frames[trading_symbol], trading_symbol, token=token)
+    return ema_signals, bb_signals, engine
+
 def run_trade_finder(input_folder: str, output_base_folder: str) -> Tuple[bool, List[str]]:
     if not os.path.exists(input_folder) or not os.path.isdir(input_folder):
         logger.error(f"Input folder not found: {input_folder}")
@@ -43,13 +110,13 @@ def run_trade_finder(input_folder: str, output_base_folder: str) -> Tuple[bool,
         logger.error(f"Error loading symbols: {e}")
         return False, []
 
-    broker = AngelClient()
-    if getattr(broker, "smart_api", None) is None:
+    provider = TradeFriendDataProvider()
+    if getattr(provider.broker, "smart_api", None) is None:
         logger.error("Broker login failed.")
         return False, []
 
     resolver = SymbolResolver()
-    ema_signals, bb_signals, rejections = [], [], []
+    mapped, rejections = [], []
 
     for name in names:
         try:
@@ -62,41 +129,16 @@ def run_trade_finder(input_folder: str, output_base_folder: str) -> Tuple[bool,
                 rejections.append(f"{trading_symbol} → No token")
                 continue
 
-            df = broker.get_historical_data(trading_symbol, token)
-            if df is None or df.empty:
-                rejections.append(f"{trading_symbol} → No historical data")
-                continue
-
-            required_cols = {"close", "high", "low", "open", "volume"}
-            missing = required_cols - set(df.columns)
-            if missing:
-                rejections.append(f"{trading_symbol} → Missing columns {missing}")
-                continue
-
-            engine = IndicatorEngine(df, trading_symbol)
-
-            # ----- EMA Crossover First -----
-            signal = engine.check_ema_crossover()
-            if signal.get("reason"):
-                # EMA failed → Try Bollinger Band
-                bb_signal = engine.bollinger_momentum()
-                if bb_signal.get("signal") != "No Bollinger Signal":
-                    bb_signals.append(bb_signal)
-                    logger.info(sanitize_for_log(
-                        f"BB Signal: {trading_symbol} → {bb_signal.get('signal')} at {bb_signal.get('close')}"
-                    ))
-                else:
-                    rejections.append(f"{trading_symbol} → EMA & BB conditions not met")
-            else:
-                ema_signals.append(signal)
-                logger.info(sanitize_for_log(
-                    f"EMA Signal: {trading_symbol} BUY at {signal.get('entry')}"
-                ))
+            mapped.append((name, trading_symbol, token))
 
         except Exception as e:
             logger.exception(f"Error processing {name}: {e}")
             rejections.append(f"{name} → Error {e}")
 
+    ema_signals, bb_signals, engine = _evaluate_strategies(provider, mapped, rejections)
+
+    provider.publish_candle_arrays()
+
     trade_date = _derive_trade_date_from_input_folder(input_folder)
     dated_output = os.path.join(output_base_folder, trade_date)
     os.makedirs(dated_output, exist_ok=True)
@@ -200,13 +242,13 @@ def run_existing_trade_finder(output_base_folder: str) -> Tuple[bool, List[str]]
     active_count = len(symbols)
     logger.info(f"Active symbols count: {active_count}")
 
-    broker = AngelClient()
-    if getattr(broker, "smart_api", None) is None:
+    provider = TradeFriendDataProvider()
+    if getattr(provider.broker, "smart_api", None) is None:
         logger.error("Broker login failed.")
         return False, []
 
     resolver = SymbolResolver()
-    ema_signals, bb_signals, rejections = [], [], []
+    mapped, rejections = [], []
 
     for symbol in symbols:
         name = None  # ✅ prevent UnboundLocalError
@@ -222,40 +264,24 @@ def run_existing_trade_finder(output_base_folder: str) -> Tuple[bool, List[str]]
                 rejections.append(f"{trading_symbol} → No token")
                 continue
 
-            df = broker.get_historical_data(trading_symbol, token)
-            if df is None or df.empty:
-                rejections.append(f"{trading_symbol} → No historical data")
-                continue
-
-            required_cols = {"close", "high", "low", "open", "volume"}
-            missing = required_cols - set(df.columns)
-            if missing:
-                rejections.append(f"{trading_symbol} → Missing columns {missing}")
-                continue
-
-            engine = IndicatorEngine(df, trading_symbol)
-
-            # ----- EMA Crossover First -----
-            signal = engine.check_ema_crossover()
-            if signal.get("reason"):
-                bb_signal = engine.bollinger_momentum()
-                if bb_signal.get("signal") != "No Bollinger Signal":
-                    bb_signals.append(bb_signal)
-                    logger.info(sanitize_for_log(
-                        f"BB Signal: {trading_symbol} → {bb_signal.get('signal')} at {bb_signal.get('close')}"
-                    ))
-                else:
-                    rejections.append(f"{trading_symbol} → EMA & BB conditions not met")
-            else:
-                ema_signals.append(signal)
-                logger.info(sanitize_for_log(
-                    f"EMA Signal: {trading_symbol} BUY at {signal.get('entry')}"
-                ))
+            mapped.append((name, trading_symbol, token))
 
         except Exception as e:
             logger.exception(f"Error processing {name}: {e}")
             rejections.append(f"{name} → Error {e}")
 
+    # Whole-universe run: skip what no finder strategy can use (one SQL query)
+    universe_stats = TradeFriendUniverseStatsService()
+    mapped = universe_stats.prefilter(
+        mapped, finder_planner().prefilters(), label="trade finder",
+        token_of=lambda item: item[2]
+    )
+
+    ema_signals, bb_signals, engine = _evaluate_strategies(provider, mapped, rejections)
+
+    if provider.publish_candle_arrays():
+        universe_stats.refresh()
+
     trade_date = datetime.datetime.today().strftime("%Y%m%d")  # Use current date
     dated_output = os.path.join(output_base_folder, trade_date)
     os.makedirs(dated_output, exist_ok=True)
@@ -313,6 +313,21 @@ class TradeManager:
             logger.warning("getltp() is not available. Monitoring skipped.")
             return
 
+        # Resolve once, then ONE batched quote call for all instruments
+        resolved_map = {}
+        for instrument in instruments:
+            symbol = instrument.get("symbol")
+            if symbol:
+                resolved = self.resolver.resolve_symbol(symbol)
+                if resolved:
+                    resolved_map[symbol] = resolved
+
+        try:
+            bulk_ltp = AngelClient().get_ltp_bulk(list(resolved_map.values()))
+        except Exception as e:
+            logger.warning(f"Bulk LTP fetch failed: {e}")
+            bulk_ltp = {}
+
         for instrument in instruments:
             try:
                 symbol = instrument.get("symbol")
@@ -320,15 +335,18 @@ class TradeManager:
                 if not symbol:
                     continue
 
-                resolved = self.resolver.resolve_symbol(symbol)
+                resolved = resolved_map.get(symbol)
                 if not resolved:
                     continue
 
-                ltp = None
-                try:
-                    ltp = getltp(resolved)
-                except Exception:
-                    pass
+                ltp = bulk_ltp.get(resolved["symbol"])
+
+                # Missed by the batch → single-symbol call (baseline path)
+                if ltp is None:
+                    try:
+                        ltp = getltp(resolved)
+                    except Exception:
+                        pass
 
                 if ltp is None:
                     ltp = instrument.get("ltp") or avg_price
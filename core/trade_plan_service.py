@@ -48,6 +48,11 @@ class TradePlanService:
             if mode == "name":
                 logger.info("Resolving symbol by name: %s", name_or_symbol)
                 mapping = self.resolver.resolve_symbol_tradefinder(name_or_symbol)
+                if not mapping.get("token"):
+                    # Not a resolved trading symbol → company name via the search index
+                    match = self.resolver.get_symbol_tradefinder(name_or_symbol)
+                    if match:
+                        mapping = self.resolver.resolve_symbol_tradefinder(f'{match["trading_symbol"]}-EQ')
                 if not mapping:
                     logger.error(" No mapping found for %s", name_or_symbol)
                     raise ValueError(f"{name_or_symbol} → No mapping found")
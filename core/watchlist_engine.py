@@ -1,22 +1,32 @@
 # core/WatchlistEngine.py
 
 from datetime import datetime, timedelta
-import time
+import hashlib
 import json
 import os
-import threading
-from concurrent.futures import ThreadPoolExecutor, as_completed
-
-import talib
+import time
 
 from config.TradeFriendConfig import (
     MIN_SCAN_CONFIDENCE,
-    REQUEST_DELAY_SEC,
-    ERROR_COOLDOWN_SEC,
-    SWING_PLAN_EXPIRY_DAYS
+    SWING_PLAN_EXPIRY_DAYS,
+    PERSIST_BATCH_SIZE,
+    INDICATOR_STATE_ENABLED,
+    SCAN_CHECKPOINT_EVERY,
+    SCAN_MAX_ATTEMPTS,
+    SCAN_RETRY_REASONS,
+    SCAN_RETRY_DELAY_SEC,
+    SCAN_JOURNAL_KEEP_DAYS,
+    SCAN_STRATEGY_VERSION,
+    SCAN_BATCH_SIZE,
+    SCAN_CPU_WORKERS
 )
 
 from core.TradeFriendDataProvider import TradeFriendDataProvider
+from core.TradeFriendIndicatorPanel import TradeFriendIndicatorPanel
+from core.TradeFriendIndicatorStateService import TradeFriendIndicatorStateService
+from core.TradeFriendScanPipeline import TradeFriendScanPipeline, Carried
+from core.TradeFriendUniverseStatsService import TradeFriendUniverseStatsService
+from brokers.tradefriend_circuit_breaker import circuit_states
 from core.TradeFriendInitialScanReportService import (
     TradeFriendDailyScanReportService
 )
@@ -29,6 +39,10 @@ from db.tradefindinstrument_db import TradeFindDB
 from db.TradeFriendWatchlistRepo import TradeFriendWatchlistRepo
 from db.TradeFriendSwingPlanRepo import TradeFriendSwingPlanRepo
 from db.TradeFriendTradeRepo import TradeFriendTradeRepo
+from db.TradeFriendSettingsRepo import TradeFriendSettingsRepo
+from db.TradeFriendScanJournalRepo import (
+    TradeFriendScanJournalRepo, VALID, REJECTED, SKIPPED, FAILED
+)
 
 from reports.TradeFriendInitialScanCsvExporter import (
     TradeFriendInitialScanCsvExporter
@@ -44,6 +58,74 @@ logger = get_logger(__name__)
 STATE_FILE = "control/tradefriend_run_state.json"
 
 
+# ==================================================
+# PIPELINE STAGE 3: EVALUATE (PROCESS POOL)
+# ==================================================
+_confidence_scorer = TradeFriendConfidenceScorer()
+
+
+def _evaluate_symbol(bars, symbol) -> dict:
+    """
+    Strategy scan → entry plan → confidence for one symbol.
+    Runs in a worker process: pure, no DB writes; bars carry the
+    panel's precomputed indicator columns.
+    Returns {"reason"} on rejection, else {signal, plan, confidence, rr}.
+    """
+    logger.debug(f"🧠 [{symbol}] Running strategy scanner")
+
+    signal = TradeFriendScanner(bars, symbol).scan()
+    if not signal:
+        return {"reason": "No setup"}
+
+    logger.info(
+        f"✅ [{symbol}] SETUP FOUND | strategy={signal.get('strategy')} | bias={signal.get('bias')}"
+    )
+
+    plan = TradeFriendSwingEntryPlanner(
+        df=bars,
+        symbol=symbol,
+        strategy=signal["strategy"]
+    ).build_plan()
+
+    if not plan:
+        logger.error(f"❌ [{symbol}] REJECT → Plan build failed")
+        return {"reason": "Plan build failed"}
+
+    logger.debug(
+        f"📝 [{symbol}] Plan built | entry={plan.get('entry')} | sl={plan.get('sl')} | target={plan.get('target') or plan.get('target1')}"
+    )
+
+    vol_avg = bars["vol_sma_20"][-1]
+
+    try:
+        target = float(plan.get("target") or plan.get("target1") or 0)
+        entry = float(plan["entry"])
+        sl = float(plan["sl"])
+        rr = abs((target - entry) / (entry - sl))
+    except Exception as e:
+        logger.exception(f"⚠ [{symbol}] RR calculation failed: {e}")
+        rr = 0
+
+    scan_context = {
+        "htf_trend": signal.get("bias"),
+        "location": signal.get("strategy"),
+        "rsi": float(bars["rsi"][-1]),
+        "volume_ratio": (
+            float(bars["volume"][-1] / vol_avg)
+            if vol_avg and vol_avg > 0 else 0
+        ),
+        "rr": rr
+    }
+
+    confidence = _confidence_scorer.score(scan_context)
+
+    logger.info(
+        f"📊 [{symbol}] CONFIDENCE={confidence} | RR={rr:.2f}"
+    )
+
+    return {"signal": signal, "plan": plan, "confidence": confidence, "rr": rr}
+
+
 class WatchlistEngine:
     """
     RESPONSIBILITY:
@@ -61,11 +143,26 @@ class WatchlistEngine:
         self.watchlist_repo = TradeFriendWatchlistRepo()
         self.swing_plan_repo = TradeFriendSwingPlanRepo()
         self.trade_repo = TradeFriendTradeRepo()
+        self.journal = TradeFriendScanJournalRepo()
+        self.universe_stats = TradeFriendUniverseStatsService()
+
+        # Persisted EMA / RSI / Bollinger / volume state → only new bars are fed
+        self.indicator_state = (
+            TradeFriendIndicatorStateService() if INDICATOR_STATE_ENABLED else None
+        )
 
-        self.confidence_scorer = TradeFriendConfidenceScorer()
+        # Scan-scoped write batch (see _begin_writes / _flush_writes)
+        self._run_id = None
+        self._active_plans = {}
+        self._pending_watchlist = []
+        self._pending_plans = {}
+        self._outcomes = {}
+        self._journaled = {}
 
-        # Hard API throttle (broker-safe)
-        self.api_semaphore = threading.Semaphore(2)
+        # Change detection (see _fingerprint / _carry_forward)
+        self._previous = {}
+        self._fingerprints = {}
+        self._settings_hash = None
 
     # ==================================================
     # STATE MANAGEMENT
@@ -105,227 +202,398 @@ class WatchlistEngine:
         self._save_state(state)
 
     # ==================================================
-    # SYMBOL SCAN (THREAD SAFE)
+    # PIPELINE STAGE 1: FETCH (I/O BOUND)
     # ==================================================
 
-    def _scan_symbol_safe(
-        self,
-        row,
-        traded_symbols,
-        scan_date,
-        valid,
-        rejected,
-        skipped
-    ):
+    def _fetch_candidate(self, row, rejected, traded_symbols):
+        """
+        Daily OHLCVSeries + READY LTP check, or None (rejection recorded),
+        or Carried(previous outcome) when the inputs did not change.
+        Broker pacing is owned by the shared rate limiter.
+        Carry-forward needs a series the broker confirmed current (never
+        stale store data served through an outage); a carried VALID row
+        still passes the READY LTP check like an evaluated one.
+        """
         symbol = row["symbol"]
-    
-        logger.info(f"🚀 [{symbol}] _scan_symbol_safe → START")
-    
-        try:
-            # ==================================================
-            # DATA FETCH
-            # ==================================================
-            logger.debug(f"📡 [{symbol}] Fetching daily data")
-    
-            with self.api_semaphore:
-                time.sleep(REQUEST_DELAY_SEC)
-                df = self.provider.get_daily_data(
-                    trading_symbol=row["trading_symbol"],
-                    token=row["token"]
-                )
-    
-            if df is None or df.empty:
-                reason = "No data"
-                logger.warning(f"⛔ [{symbol}] REJECT → {reason}")
-                rejected.append({"symbol": symbol, "reason": reason})
-                return
-    
-            logger.debug(f"📈 [{symbol}] Data OK | rows={len(df)}")
-    
-            # ==================================================
-            # READY LTP VALIDATION
-            # ==================================================
-            logger.debug(f"🔎 [{symbol}] Validating READY LTP")
-    
-            ltp = self._validate_symbol_ltp_ready(row, rejected)
-            if ltp is None:
-                logger.warning(f"⛔ [{symbol}] REJECT → LTP validation failed")
-                return
-    
-            logger.debug(f"💰 [{symbol}] LTP OK → {ltp}")
-    
-            # ==================================================
-            # ENGINE INDICATORS
-            # ==================================================
-            logger.debug(f"🧮 [{symbol}] Preparing scan indicators")
-            df = self._prepare_scan_indicators(df, symbol)
-    
-            # ==================================================
-            # STRATEGY SCAN
-            # ==================================================
-            logger.debug(f"🧠 [{symbol}] Running strategy scanner")
-    
-            signal = TradeFriendScanner(df, symbol).scan()
-            if not signal:
-                reason = "No setup"
-                logger.info(f"🚫 [{symbol}] REJECT → {reason}")
-                rejected.append({"symbol": symbol, "reason": reason})
-                return
-    
-            logger.info(
-                f"✅ [{symbol}] SETUP FOUND | strategy={signal.get('strategy')} | bias={signal.get('bias')}"
-            )
-    
-            # ==================================================
-            # ENTRY PLAN
-            # ==================================================
-            logger.debug(f"📐 [{symbol}] Building entry plan")
-    
-            plan = TradeFriendSwingEntryPlanner(
-                df=df,
-                symbol=symbol,
-                strategy=signal["strategy"]
-            ).build_plan()
-    
-            if not plan:
-                reason = "Plan build failed"
-                logger.error(f"❌ [{symbol}] REJECT → {reason}")
-                rejected.append({"symbol": symbol, "reason": reason})
-                return
-    
-            logger.debug(
-                f"📝 [{symbol}] Plan built | entry={plan.get('entry')} | sl={plan.get('sl')} | target={plan.get('target') or plan.get('target1')}"
+
+        bars = self.provider.get_daily_series(
+            trading_symbol=row["trading_symbol"],
+            token=row["token"]
+        )
+        if bars is None or bars.empty:
+            reason = "No data"
+            logger.warning(f"⛔ [{symbol}] REJECT → {reason}")
+            rejected.append({"symbol": symbol, "reason": reason})
+            return None
+
+        logger.debug(f"📈 [{symbol}] Data OK | rows={len(bars)}")
+
+        fingerprint = self._fingerprint(bars)
+        carried = None
+        if self.provider.is_series_current(row["token"]):
+            carried = self._carry_forward(symbol, fingerprint, traded_symbols)
+
+        if carried is not None and carried.result["carried"]["status"] == REJECTED:
+            self._fingerprints[symbol] = fingerprint
+            return carried
+
+        ltp = self._validate_symbol_ltp_ready(row, rejected)
+        if ltp is None:
+            logger.warning(f"⛔ [{symbol}] REJECT → LTP validation failed")
+            return None
+
+        logger.debug(f"💰 [{symbol}] LTP OK → {ltp}")
+        self._fingerprints[symbol] = fingerprint
+        return carried if carried is not None else bars
+
+    # ==================================================
+    # CHANGE DETECTION (carry forward unchanged symbols)
+    # ==================================================
+
+    def _scan_settings_hash(self) -> str:
+        settings = TradeFriendSettingsRepo().fetch()
+        settings = dict(settings) if settings else {}
+        payload = json.dumps(
+            {k: settings.get(k) for k in TradeFriendSwingEntryPlanner.SETTINGS_KEYS},
+            sort_keys=True, default=str
+        )
+        return hashlib.sha1(payload.encode()).hexdigest()[:12]
+
+    def _fingerprint(self, bars) -> str:
+        """
+        Everything the evaluation depends on: last bar, planning
+        settings, strategy version.
+        """
+        return f"{bars.label(-1)}|{self._settings_hash}|v{SCAN_STRATEGY_VERSION}"
+
+    def _carry_forward(self, symbol, fingerprint, traded_symbols):
+        previous = self._previous.get(symbol)
+        if previous is None or previous["fingerprint"] != fingerprint:
+            return None
+
+        # SKIPPED depends on positions / plans, not on the inputs
+        if previous["status"] not in (VALID, REJECTED):
+            return None
+
+        # Position opened or plan consumed since → the outcome would differ
+        if previous["status"] == VALID and (
+            symbol in traded_symbols or symbol not in self._active_plans
+        ):
+            return None
+
+        return Carried({"carried": previous})
+
+    # ==================================================
+    # PIPELINE STAGE 2: INDICATORS (ONE PANEL PER BATCH)
+    # ==================================================
+
+    def _prepare_batch(self, batch):
+        """
+        [(row, bars)] → indicators for the whole batch in one vectorized
+        pass → [(row, (series, symbol))] for the evaluate stage.
+        """
+        panel = TradeFriendIndicatorPanel.from_frames({row["symbol"]: bars for row, bars in batch})
+        if self.indicator_state is not None:
+            panel.compute_incremental(
+                self.indicator_state,
+                tokens={row["symbol"]: row["token"] for row, _ in batch}
             )
-    
-            # ==================================================
-            # CONFIDENCE SCORING
-            # ==================================================
-            logger.debug(f"📊 [{symbol}] Calculating confidence")
-    
-            vol_avg = df["volume"].rolling(20).mean().iloc[-1]
-    
-            try:
-                target = float(plan.get("target") or plan.get("target1") or 0)
-                entry = float(plan["entry"])
-                sl = float(plan["sl"])
-                rr = abs((target - entry) / (entry - sl))
-            except Exception as e:
-                logger.exception(f"⚠ [{symbol}] RR calculation failed: {e}")
-                rr = 0
-    
-            scan_context = {
-                "htf_trend": signal.get("bias"),
-                "location": signal.get("strategy"),
-                "rsi": float(df["rsi"].iloc[-1]),
-                "volume_ratio": (
-                    df["volume"].iloc[-1] / vol_avg
-                    if vol_avg and vol_avg > 0 else 0
-                ),
-                "rr": rr
-            }
-    
-            confidence = self.confidence_scorer.score(scan_context)
-    
+        else:
+            panel.compute()
+
+        return [
+            (row, (panel.view(row["symbol"]).series(), row["symbol"]))
+            for row, _ in batch
+            if row["symbol"] in panel
+        ]
+
+    # ==================================================
+    # PIPELINE STAGE 4: WRITE (SINGLE WRITER)
+    # ==================================================
+
+    def _persist_candidate(self, row, result, traded_symbols, scan_date, valid, rejected, skipped):
+        symbol = row["symbol"]
+
+        if "carried" in result:
+            self._persist_carried(symbol, result["carried"], scan_date, valid, rejected)
+            return
+
+        if "reason" in result:
+            reason = result["reason"]
+            logger.info(f"🚫 [{symbol}] REJECT → {reason}")
+            rejected.append({"symbol": symbol, "reason": reason})
+            return
+
+        signal, plan, confidence = result["signal"], result["plan"], result["confidence"]
+
+        # ==================================================
+        # DUPLICATE TRADE GUARD
+        # ==================================================
+        if symbol in traded_symbols:
+            reason = "Already traded (active position exists)"
+            logger.warning(f"⏭ [{symbol}] SKIPPED → {reason}")
+            skipped.append({"symbol": symbol, "reason": reason})
+            return
+
+        # ==================================================
+        # WATCHLIST UPSERT
+        # ==================================================
+        logger.debug(f"👁️ [{symbol}] Queueing watchlist entry")
+
+        self._pending_watchlist.append({
+            "symbol": symbol,
+            "strategy": signal["strategy"],
+            "bias": signal.get("bias"),
+            "score": confidence
+        })
+
+        # ==================================================
+        # PLAN METADATA
+        # ==================================================
+        plan.update({
+            "direction": signal.get("direction", "BUY"),
+            "order_type": signal.get("order_type", "MARKET"),
+            "trade_type": "SWING",
+            "carry_forward": 1,
+            "product_type": "CNC",
+            "confidence": confidence,
+            "status": "PLANNED",
+            "created_at": scan_date,
+            "scan_run": self._run_id,
+            "expires_at": (
+                datetime.now()
+                + timedelta(days=SWING_PLAN_EXPIRY_DAYS)
+            ).strftime("%Y-%m-%d")
+        })
+
+        logger.debug(f"📦 [{symbol}] Plan metadata finalized")
+
+        # ==================================================
+        # PLAN UPSERT DECISION
+        # ==================================================
+        existing = self._active_plans.get(symbol)
+
+        if existing:
+            old_entry = float(existing["entry"])
+            new_entry = float(plan["entry"])
+
             logger.info(
-                f"📊 [{symbol}] CONFIDENCE={confidence} | RR={rr:.2f}"
+                f"🔁 [{symbol}] Existing plan found | old_entry={old_entry} | new_entry={new_entry}"
             )
-    
-            # ==================================================
-            # DUPLICATE TRADE GUARD
-            # ==================================================
-            if symbol in traded_symbols:
-                reason = "Already traded (active position exists)"
+
+            if existing.get("scan_run") == self._run_id and new_entry == old_entry:
+                # Written by this run before a crash cut off its journal
+                # checkpoint (resumed run) → already persisted, not worse
+                logger.info(f"♻️ [{symbol}] Plan already written by this run")
+
+            elif plan["direction"] == "BUY" and new_entry >= old_entry:
+                reason = "Worse entry than existing plan"
                 logger.warning(f"⏭ [{symbol}] SKIPPED → {reason}")
                 skipped.append({"symbol": symbol, "reason": reason})
                 return
-    
-            # ==================================================
-            # WATCHLIST UPSERT
-            # ==================================================
-            logger.debug(f"👁️ [{symbol}] Upserting watchlist entry")
-    
-            self.watchlist_repo.upsert({
-                "symbol": symbol,
-                "strategy": signal["strategy"],
-                "bias": signal.get("bias"),
-                "score": confidence
-            })
-    
-            # ==================================================
-            # PLAN METADATA
-            # ==================================================
-            plan.update({
-                "direction": signal.get("direction", "BUY"),
-                "order_type": signal.get("order_type", "MARKET"),
-                "trade_type": "SWING",
-                "carry_forward": 1,
-                "product_type": "CNC",
-                "confidence": confidence,
-                "status": "PLANNED",
-                "created_at": scan_date,
-                "expires_at": (
-                    datetime.now()
-                    + timedelta(days=SWING_PLAN_EXPIRY_DAYS)
-                ).strftime("%Y-%m-%d")
-            })
-    
-            logger.debug(f"📦 [{symbol}] Plan metadata finalized")
-    
-            # ==================================================
-            # PLAN UPSERT DECISION
-            # ==================================================
-            existing = self.swing_plan_repo.get_active_plan(symbol)
-    
-            if existing:
-                old_entry = float(existing["entry"])
-                new_entry = float(plan["entry"])
-    
-                logger.info(
-                    f"🔁 [{symbol}] Existing plan found | old_entry={old_entry} | new_entry={new_entry}"
-                )
-    
-                if plan["direction"] == "BUY" and new_entry >= old_entry:
-                    reason = "Worse entry than existing plan"
-                    logger.warning(f"⏭ [{symbol}] SKIPPED → {reason}")
-                    skipped.append({"symbol": symbol, "reason": reason})
-                    return
-    
-                logger.info(f"✏️ [{symbol}] Updating existing plan (better entry)")
-                self.swing_plan_repo.update_plan(
-                    plan_id=existing["id"],
-                    new_plan=plan
-                )
-    
+
             else:
-                logger.info(f"🆕 [{symbol}] Saving NEW swing plan")
-                self.swing_plan_repo.save_plan(plan)
-    
-            # ==================================================
-            # FINAL ACCEPT
-            # ==================================================
-            logger.info(f"🎯 [{symbol}] ACCEPTED → Added to VALID list")
-    
-            valid.append({
-                "symbol": symbol,
-                "strategy": signal["strategy"],
-                "bias": signal.get("bias"),
-                "direction": plan["direction"],
-                "entry": plan["entry"],
-                "sl": plan["sl"],
-                "target": plan.get("target") or plan.get("target1"),
-                "confidence": confidence,
-                "scan_date": scan_date
-            })
-    
-            time.sleep(REQUEST_DELAY_SEC)
-    
-        except Exception as e:
-            logger.exception(f"🔥 [{symbol}] SCAN FAILED: {e}")
-            time.sleep(ERROR_COOLDOWN_SEC)
-    
+                logger.info(f"✏️ [{symbol}] Updating existing plan (better entry)")
+                if existing["id"] is None:
+                    # Plan first seen earlier in this batch → still an insert
+                    self._pending_plans[symbol] = (None, plan)
+                else:
+                    self._pending_plans[symbol] = (existing["id"], plan)
+
+        else:
+            logger.info(f"🆕 [{symbol}] Saving NEW swing plan")
+            self._pending_plans[symbol] = (None, plan)
+
+        # Later rows of this scan must see the plan as if already written
+        self._active_plans[symbol] = {
+            "id": existing["id"] if existing else None,
+            "entry": plan["entry"],
+            "scan_run": self._run_id
+        }
+
+        # ==================================================
+        # FINAL ACCEPT
+        # ==================================================
+        logger.info(f"🎯 [{symbol}] ACCEPTED → Added to VALID list")
+
+        valid.append({
+            "symbol": symbol,
+            "strategy": signal["strategy"],
+            "bias": signal.get("bias"),
+            "direction": plan["direction"],
+            "entry": plan["entry"],
+            "sl": plan["sl"],
+            "target": plan.get("target") or plan.get("target1"),
+            "confidence": confidence,
+            "scan_date": scan_date
+        })
+
+    def _persist_carried(self, symbol, previous, scan_date, valid, rejected):
+        logger.info(f"♻️ [{symbol}] Inputs unchanged → {previous['status']} carried forward")
+
+        if previous["status"] == REJECTED:
+            rejected.append({"symbol": symbol, "reason": previous["reason"]})
+            return
+
+        entry = dict(previous["result"], scan_date=scan_date)
+
+        # Watchlist row refreshed exactly as a re-evaluation would; the
+        # active plan is already in place
+        self._pending_watchlist.append({
+            "symbol": symbol,
+            "strategy": entry["strategy"],
+            "bias": entry.get("bias"),
+            "score": entry["confidence"]
+        })
+        valid.append(entry)
+
+    def _write_result(self, row, result, traded_symbols, scan_date):
+        outcomes = self._outcomes
+        self._persist_candidate(
+            row, result, traded_symbols, scan_date,
+            outcomes["valid"], outcomes["rejected"], outcomes["skipped"]
+        )
+
+        if (len(self._pending_watchlist) >= PERSIST_BATCH_SIZE
+                or self._unjournaled() >= SCAN_CHECKPOINT_EVERY):
+            self._flush_writes()
+
+    # ==================================================
+    # BATCHED PERSISTENCE (few transactions per scan)
+    # ==================================================
+
+    def _begin_writes(self, run_id: str, force: bool = False):
+        """
+        Active plans (and last fingerprints) preloaded ONCE per pass; the
+        writer decides against this map and queues rows instead of
+        committing per symbol. force → nothing is carried forward.
+        """
+        self._run_id = run_id
+        self._previous = {} if force else self.journal.get_fingerprints()
+        self._fingerprints = {}
+        self._settings_hash = self._scan_settings_hash()
+        self._active_plans = self.swing_plan_repo.get_active_plan_map()
+        self._pending_watchlist = []
+        self._pending_plans = {}
+        self._outcomes = {"valid": [], "rejected": [], "skipped": [], "failed": []}
+        self._journaled = dict.fromkeys(self._outcomes, 0)
+
+    def _flush_writes(self):
+        """
+        Queued rows → one executemany transaction per table, in the
+        order the per-symbol path wrote them (watchlist before plans).
+        """
+        watchlist, self._pending_watchlist = self._pending_watchlist, []
+        plans, self._pending_plans = self._pending_plans, {}
+
+        inserts = [plan for plan_id, plan in plans.values() if plan_id is None]
+        updates = [(plan_id, plan) for plan_id, plan in plans.values() if plan_id is not None]
+
+        self.watchlist_repo.upsert_many(watchlist)
+        self.swing_plan_repo.save_plans(inserts)
+        self.swing_plan_repo.update_plans(updates)
+
+        if inserts:
+            # New rows now have ids → later updates in this scan target them
+            self._active_plans = self.swing_plan_repo.get_active_plan_map()
+
+        # Journal AFTER the plan writes: a crash in between re-scans the
+        # symbols, it never marks unwritten plans as done
+        journaled = self._checkpoint()
+
+        logger.info(
+            f"💾 Scan writes flushed | watchlist={len(watchlist)} | "
+            f"new plans={len(inserts)} | updated plans={len(updates)} | "
+            f"journaled={journaled}"
+        )
+
+    # ==================================================
+    # SCAN JOURNAL (checkpoint / resume / retry)
+    # ==================================================
+
+    def _unjournaled(self) -> int:
+        return sum(len(items) - self._journaled[key] for key, items in self._outcomes.items())
+
+    def _checkpoint(self) -> int:
+        """
+        Outcomes since the last checkpoint → journal (one transaction).
+        """
+        records = []
+        for key, status in (("valid", VALID), ("rejected", REJECTED),
+                            ("skipped", SKIPPED), ("failed", FAILED)):
+            items = self._outcomes.get(key, [])
+            end = len(items)
+            for item in items[self._journaled[key]:end]:
+                fingerprint = self._fingerprints.get(item["symbol"])
+                if status == VALID:
+                    records.append((item["symbol"], status, None, item, fingerprint))
+                else:
+                    records.append((item["symbol"], status, item["reason"], None, fingerprint))
+            self._journaled[key] = end
+
+        return self.journal.record(self._run_id, records)
+
+    def _on_stage_error(self, row, stage, error, failed):
+        # Broker trouble is handled by the per-endpoint circuit breaker;
+        # the symbol is journaled FAILED and goes to the retry pass
+        failed.append({"symbol": row["symbol"], "reason": f"{stage} failed: {error}"})
+
+    def _open_run(self, scan_date: str):
+        """
+        Resume the day's unfinished run, or start one on a fresh
+        universe snapshot. Returns run id or None (no symbols).
+        """
+        run_id = self.journal.get_open_run(scan_date)
+        if run_id is not None:
+            logger.warning(
+                f"♻️ Resuming scan run {run_id} | {self.journal.progress(run_id)}"
+            )
+            return run_id
+
+        symbols = self.instrument_db.get_active()
+        if not symbols:
+            logger.warning("No active symbols found")
+            return None
+
+        # Symbols scan() rejects on history, or whose plan the sizer could
+        # never give a quantity, never enter the snapshot (one SQL query)
+        symbols = self.universe_stats.prefilter(
+            symbols, [TradeFriendScanner.PREFILTER], label="daily scan"
+        )
+        if not symbols:
+            logger.warning("No symbols left after the universe pre-filter")
+            return None
+
+        self.journal.delete_older_than(SCAN_JOURNAL_KEEP_DAYS)
+        run_id = self.journal.start_run(scan_date, symbols)
+        logger.info(f"🔍 Scanning {len(symbols)} symbols | run={run_id}")
+        return run_id
+
+    def _scan_rows(self, run_id, rows, traded_symbols, scan_date, force=False, **pipeline_options):
+        """
+        One pipeline pass over `rows`; outcomes checkpointed as it goes.
+        """
+        # fetch → indicators (one panel per batch) → evaluate (process
+        # pool) → single writer, joined by bounded queues
+        self._begin_writes(run_id, force=force)
+        outcomes = self._outcomes
+        try:
+            TradeFriendScanPipeline(
+                fetch=lambda row: self._fetch_candidate(row, outcomes["rejected"], traded_symbols),
+                prepare=self._prepare_batch,
+                evaluate=_evaluate_symbol,
+                write=lambda row, result: self._write_result(
+                    row, result, traded_symbols, scan_date
+                ),
+                on_error=lambda row, stage, error: self._on_stage_error(
+                    row, stage, error, outcomes["failed"]
+                ),
+                **pipeline_options
+            ).run(rows)
         finally:
-            logger.info(f"🏁 [{symbol}] _scan_symbol_safe → END")
-    
+            # Whatever was accepted before a failure still lands
+            self._flush_writes()
+
     # ==================================================
     # MAIN RUN
     # ==================================================
@@ -338,42 +606,91 @@ class WatchlistEngine:
         logger.info("📊 Daily Watchlist Scan started")
 
         scan_date = datetime.now().strftime("%Y-%m-%d")
-        valid, rejected, skipped = [], [], []
 
         traded_symbols = set(self.trade_repo.get_all_symbols())
 
         self.watchlist_repo.delete_untriggered_older_than(days=7)
         self.swing_plan_repo.delete_orphan_plans()
 
-        symbols = self.instrument_db.get_active()
-        if not symbols:
-            logger.warning("No active symbols found")
+        run_id = self._open_run(scan_date)
+        if run_id is None:
             return
 
-        logger.info(f"🔍 Scanning {len(symbols)} symbols")
-
-        with ThreadPoolExecutor(max_workers=8) as executor:
-            futures = [
-                executor.submit(
-                    self._scan_symbol_safe,
-                    row,
-                    traded_symbols,
-                    scan_date,
-                    valid,
-                    rejected,
-                    skipped
-                )
-                for row in symbols
-            ]
-
-            for f in as_completed(futures):
-                f.result()
+        if self.indicator_state is not None:
+            self.indicator_state.load()
+
+        # Unfinished symbols only (all of them on a fresh run)
+        self._scan_rows(run_id, self.journal.pending(run_id), traded_symbols, scan_date)
+
+        # Bounded retry pass: failed / transiently rejected symbols
+        for attempt in range(2, SCAN_MAX_ATTEMPTS + 1):
+            retry = self.journal.retryable(run_id, SCAN_RETRY_REASONS, SCAN_MAX_ATTEMPTS)
+            if not retry:
+                break
+            logger.warning(
+                f"🔁 Retry pass {attempt}/{SCAN_MAX_ATTEMPTS} | symbols={len(retry)}"
+            )
+            time.sleep(SCAN_RETRY_DELAY_SEC)
+            self._scan_rows(run_id, retry, traded_symbols, scan_date)
+
+        self.journal.finish_run(run_id)
+
+        # Report covers the whole run, across restarts and retry passes
+        valid, rejected, skipped = self.journal.outcomes(run_id)
+
+        # Share today's candles with UI / finders via the mapped snapshot,
+        # then rebuild the universe stats the next pre-filter reads
+        if self.provider.publish_candle_arrays():
+            self.universe_stats.refresh()
 
         self._generate_reports(scan_date, valid, rejected, skipped)
         self._mark_done_today()
 
+        for endpoint, state in circuit_states().items():
+            if state["trips"] or state["rejected"]:
+                logger.warning(f"⚡ Broker circuit | {endpoint} | {state}")
+
         logger.info("✅ Daily Watchlist Scan completed")
 
+    # ==================================================
+    # ON-DEMAND RESCAN (subset)
+    # ==================================================
+
+    def rescan(self, symbols, force: bool = False) -> dict:
+        """
+        Rescan a few symbols now (dashboard, after a settings change):
+        same pipeline, plans and journal as the daily scan, no reports.
+        Unchanged symbols are carried forward unless force=True.
+        Returns {"valid", "rejected", "skipped"}.
+        """
+        wanted = set(symbols)
+        rows = [r for r in self.instrument_db.get_active() if r["symbol"] in wanted]
+        if not rows:
+            logger.warning(f"Rescan: none of {sorted(wanted)} is an active symbol")
+            return {"valid": [], "rejected": [], "skipped": []}
+
+        scan_date = datetime.now().strftime("%Y-%m-%d")
+        traded_symbols = set(self.trade_repo.get_all_symbols())
+
+        run_id = self.journal.start_run(scan_date, rows, kind="RESCAN")
+        logger.info(f"🎯 Rescan | symbols={len(rows)} | force={force} | run={run_id}")
+
+        if self.indicator_state is not None:
+            self.indicator_state.load()
+
+        # A handful of symbols: evaluate in-process, no pool start-up
+        self._scan_rows(
+            run_id, rows, traded_symbols, scan_date, force=force,
+            cpu_workers=SCAN_CPU_WORKERS if len(rows) >= SCAN_BATCH_SIZE else 0
+        )
+        self.journal.finish_run(run_id)
+
+        valid, rejected, skipped = self.journal.outcomes(run_id)
+        logger.info(
+            f"✅ Rescan done | VALID={len(valid)} | REJECTED={len(rejected)} | SKIPPED={len(skipped)}"
+        )
+        return {"valid": valid, "rejected": rejected, "skipped": skipped}
+
     # ==================================================
     # REPORTS
     # ==================================================
@@ -419,7 +736,16 @@ class WatchlistEngine:
 
             ltp = self.provider.get_ltp_byLtp(symbol,allow_pre_market_fetch=True)
 
-            if ltp is None or not isinstance(ltp, (int, float)) or ltp <= 0:
+            # None = no answer (circuit open / broker error) → transient,
+            # retried; a bad price is a permanent rejection
+            if ltp is None:
+                rejected.append({
+                    "symbol": symbol,
+                    "reason": "LTP unavailable"
+                })
+                return None
+
+            if not isinstance(ltp, (int, float)) or ltp <= 0:
                 rejected.append({
                     "symbol": symbol,
                     "reason": "Invalid LTP at READY stage"
@@ -435,19 +761,3 @@ class WatchlistEngine:
                 "reason": "LTP validation error"
             })
             return None
-        
-    # ==================================================
-    # SCAN-TIME INDICATORS (ENGINE OWNERSHIP)
-    # ==================================================
-
-    def _prepare_scan_indicators(self, df, symbol):
-        """
-        Indicators required outside TradeFriendScanner
-        """
-        close = df["close"].astype(float)
-
-        if "rsi" not in df.columns:
-            df["rsi"] = talib.RSI(close, timeperiod=14)
-            logger.debug(f"{symbol} → RSI computed for scan context")
-
-        return df
@@ -0,0 +1,250 @@
+import os
+import json
+import glob
+import threading
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from db.TradeFriendCandleRepo import TradeFriendCandleRepo
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# -------------------------------------------------
+# STORE CONFIG
+# -------------------------------------------------
+ARRAY_FOLDER = os.path.join("dbdata", "candle_arrays")
+
+PRICE_FIELDS = ("open", "high", "low", "close", "volume")
+FIELD_DTYPES = {
+    "open": np.float64,
+    "high": np.float64,
+    "low": np.float64,
+    "close": np.float64,
+    "volume": np.float64,
+    "ts": np.int64,          # epoch seconds (naive IST wall time)
+}
+
+
+class TradeFriendCandleArrayStore:
+    """
+    PURPOSE:
+    - Columnar, memory-mapped snapshot of the candle store
+    - One contiguous array per field + per-token offset index
+    - Slicing a symbol returns numpy VIEWS (no parse, no copy)
+    - Shared page cache between UI, scheduler and scripts
+    """
+
+    def __init__(self, interval: str = "ONE_DAY"):
+        self.interval = interval
+        self.folder = os.path.join(ARRAY_FOLDER, interval)
+        self.index_file = os.path.join(self.folder, "index.json")
+
+        self._lock = threading.Lock()
+        self._index_mtime = None
+        self._index = {}
+        self._arrays = {}
+        self._generation = None
+
+    # ==================================================
+    # BUILD (writer)
+    # ==================================================
+    @classmethod
+    def build(cls, interval: str = "ONE_DAY", candle_repo: TradeFriendCandleRepo = None) -> int:
+        """
+        Compile every stored series for `interval` into a new generation
+        of column files, then swap index.json atomically.
+        Returns number of series written.
+        """
+        repo = candle_repo or TradeFriendCandleRepo()
+        folder = os.path.join(ARRAY_FOLDER, interval)
+        os.makedirs(folder, exist_ok=True)
+
+        columns = {f: [] for f in FIELD_DTYPES}
+        tokens = {}
+
+        current = None
+        start = 0
+        n = 0
+
+        for token, ts, o, h, l, c, v in repo.iter_series(interval):
+            if token != current:
+                if current is not None:
+                    tokens[current]["length"] = n - start
+                current = token
+                start = n
+                tokens[token] = {"offset": n, "first_ts": ts}
+
+            tokens[token]["last_ts"] = ts
+
+            columns["ts"].append(_to_epoch(ts))
+            columns["open"].append(o)
+            columns["high"].append(h)
+            columns["low"].append(l)
+            columns["close"].append(c)
+            columns["volume"].append(v or 0.0)
+            n += 1
+
+        if current is not None:
+            tokens[current]["length"] = n - start
+
+        generation = datetime.now().strftime("%Y%m%d%H%M%S%f")
+
+        for field, dtype in FIELD_DTYPES.items():
+            arr = np.asarray(columns[field], dtype=dtype)
+            arr.tofile(os.path.join(folder, f"{field}.{generation}.bin"))
+
+        index = {
+            "generation": generation,
+            "interval": interval,
+            "rows": n,
+            "built_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "tokens": tokens,
+        }
+
+        tmp = os.path.join(folder, "index.json.tmp")
+        with open(tmp, "w") as f:
+            json.dump(index, f)
+        os.replace(tmp, os.path.join(folder, "index.json"))
+
+        cls._cleanup_generations(folder, keep=generation)
+
+        logger.info(
+            f"🧱 Candle arrays built | interval={interval} | "
+            f"series={len(tokens)} | bars={n}"
+        )
+        return len(tokens)
+
+    @staticmethod
+    def _cleanup_generations(folder: str, keep: str):
+        # Old generations may still be mapped by another process (Windows
+        # refuses the delete) — they are retried on the next build.
+        for path in glob.glob(os.path.join(folder, "*.bin")):
+            if f".{keep}." in os.path.basename(path):
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    # ==================================================
+    # OPEN / RELOAD (reader)
+    # ==================================================
+    def _ensure_loaded(self) -> bool:
+        try:
+            mtime = os.path.getmtime(self.index_file)
+        except OSError:
+            return False
+
+        if mtime == self._index_mtime:
+            return True
+
+        with self._lock:
+            if mtime == self._index_mtime:
+                return True
+
+            with open(self.index_file, "r") as f:
+                index = json.load(f)
+
+            generation = index["generation"]
+            arrays = {}
+            for field, dtype in FIELD_DTYPES.items():
+                path = os.path.join(self.folder, f"{field}.{generation}.bin")
+                if index["rows"] == 0:
+                    arrays[field] = np.empty(0, dtype=dtype)
+                else:
+                    arrays[field] = np.memmap(path, dtype=dtype, mode="r")
+
+            self._arrays = arrays
+            self._index = index["tokens"]
+            self._generation = generation
+            self._index_mtime = mtime
+
+        logger.debug(f"📂 Candle arrays mapped | {self.interval} | series={len(self._index)}")
+        return True
+
+    # ==================================================
+    # READ
+    # ==================================================
+    def has(self, token: str) -> bool:
+        return self._ensure_loaded() and str(token) in self._index
+
+    def tokens(self) -> list:
+        """
+        Every token in the published snapshot.
+        """
+        if not self._ensure_loaded():
+            return []
+        return list(self._index)
+
+    def generation(self):
+        """
+        Id of the published snapshot (changes on every build), or None.
+        """
+        if not self._ensure_loaded():
+            return None
+        return self._generation
+
+    def series_info(self, token: str) -> dict | None:
+        if not self._ensure_loaded():
+            return None
+        info = self._index.get(str(token))
+        if not info:
+            return None
+        return {
+            "length": info["length"],
+            "first_ts": datetime.strptime(info["first_ts"], "%Y-%m-%d %H:%M:%S"),
+            "last_ts": datetime.strptime(info["last_ts"], "%Y-%m-%d %H:%M:%S"),
+        }
+
+    def get(self, token: str, since: datetime = None, bars: int = None) -> dict | None:
+        """
+        Returns {field: ndarray view} for one token, or None.
+        Views are read-only slices of the shared mapping.
+        """
+        if not self._ensure_loaded():
+            return None
+
+        info = self._index.get(str(token))
+        if not info:
+            return None
+
+        start = info["offset"]
+        end = start + info["length"]
+        arrays = self._arrays
+
+        if since is not None:
+            start += int(np.searchsorted(arrays["ts"][start:end], _to_epoch(since), side="left"))
+        if bars is not None:
+            start = max(start, end - bars)
+
+        return {field: arrays[field][start:end] for field in FIELD_DTYPES}
+
+    def to_frame(self, token: str, since: datetime = None, bars: int = None) -> pd.DataFrame | None:
+        """
+        pandas view for consumers that still need a DataFrame
+        (broker shape: datetime, open, high, low, close, volume)
+        """
+        cols = self.get(token, since=since, bars=bars)
+        if cols is None:
+            return None
+
+        df = pd.DataFrame({
+            "datetime": pd.to_datetime(np.asarray(cols["ts"]), unit="s"),
+            **{f: np.asarray(cols[f]) for f in PRICE_FIELDS}
+        })
+        return df
+
+
+# -------------------------------------------------
+# TIMESTAMP HELPERS
+# -------------------------------------------------
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _to_epoch(value) -> int:
+    if isinstance(value, str):
+        value = datetime.strptime(value, "%Y-%m-%d %H:%M:%S")
+    return int((value - _EPOCH).total_seconds())
@@ -0,0 +1,251 @@
+import sqlite3
+import os
+import threading
+from datetime import datetime
+
+import pandas as pd
+
+# -------------------------------------------------
+# DB CONFIG (separate database — candles are bulky)
+# -------------------------------------------------
+DB_FOLDER = "dbdata"
+DB_FILE = os.path.join(DB_FOLDER, "tradefriend_candles.db")
+
+os.makedirs(DB_FOLDER, exist_ok=True)
+
+CANDLE_COLUMNS = ["datetime", "open", "high", "low", "close", "volume"]
+
+
+class TradeFriendCandleRepo:
+    """
+    PURPOSE:
+    - Local OHLCV candle store keyed by (token, interval)
+    - Broker is asked ONLY for candles after the last stored bar
+    - Coverage meta tells the provider how far back history is complete
+    """
+
+    def __init__(self):
+        self.conn = sqlite3.connect(DB_FILE, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+
+        # 🔒 Concurrency safety (scanner threads share this repo)
+        self.conn.execute("PRAGMA journal_mode=WAL;")
+        self.conn.execute("PRAGMA synchronous=NORMAL;")
+        self.conn.execute("PRAGMA busy_timeout = 5000;")
+        self._lock = threading.Lock()
+
+        self._create_table()
+
+    # -------------------------------------------------
+    # SCHEMA
+    # -------------------------------------------------
+    def _create_table(self):
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS tradefriend_candles (
+                token TEXT NOT NULL,
+                interval TEXT NOT NULL,
+                ts TEXT NOT NULL,
+                open REAL,
+                high REAL,
+                low REAL,
+                close REAL,
+                volume REAL,
+                PRIMARY KEY (token, interval, ts)
+            ) WITHOUT ROWID
+        """)
+
+        # One row per series: what is stored and when we last asked the broker
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS tradefriend_candle_meta (
+                token TEXT NOT NULL,
+                interval TEXT NOT NULL,
+                covered_from TEXT,
+                last_ts TEXT,
+                fetched_at TEXT,
+                PRIMARY KEY (token, interval)
+            )
+        """)
+
+        self.conn.commit()
+
+    # -------------------------------------------------
+    # READ — SERIES META
+    # -------------------------------------------------
+    def get_meta(self, token: str, interval: str) -> dict | None:
+        row = self.conn.execute("""
+            SELECT covered_from, last_ts, fetched_at
+            FROM tradefriend_candle_meta
+            WHERE token = ? AND interval = ?
+        """, (str(token), interval)).fetchone()
+
+        if not row:
+            return None
+
+        return {
+            "covered_from": _parse_ts(row["covered_from"]),
+            "last_ts": _parse_ts(row["last_ts"]),
+            "fetched_at": _parse_ts(row["fetched_at"]),
+        }
+
+    # -------------------------------------------------
+    # READ — CANDLES
+    # -------------------------------------------------
+    def fetch(self, token: str, interval: str, since: datetime = None) -> pd.DataFrame:
+        """
+        Returns candles in broker shape:
+        datetime, open, high, low, close, volume (ascending)
+        """
+        sql = """
+            SELECT ts, open, high, low, close, volume
+            FROM tradefriend_candles
+            WHERE token = ? AND interval = ?
+        """
+        params = [str(token), interval]
+
+        if since is not None:
+            sql += " AND ts >= ?"
+            params.append(_format_ts(since))
+
+        sql += " ORDER BY ts"
+
+        rows = self.conn.execute(sql, params).fetchall()
+
+        df = pd.DataFrame([tuple(r) for r in rows], columns=CANDLE_COLUMNS)
+        if not df.empty:
+            df["datetime"] = pd.to_datetime(df["datetime"])
+        return df
+
+    def last_bar(self, token: str, interval: str) -> dict | None:
+        """
+        Newest stored bar {ts, open, high, low, close, volume} (one
+        primary-key lookup) — may still be a partial, in-session candle.
+        """
+        row = self.conn.execute("""
+            SELECT ts, open, high, low, close, volume
+            FROM tradefriend_candles
+            WHERE token = ? AND interval = ?
+            ORDER BY ts DESC
+            LIMIT 1
+        """, (str(token), interval)).fetchone()
+
+        if not row:
+            return None
+        bar = dict(row)
+        bar["ts"] = _parse_ts(bar["ts"])
+        return bar
+
+    def iter_series(self, interval: str):
+        """
+        Streams every stored bar for an interval ordered by (token, ts).
+        Used by the columnar snapshot builder.
+        """
+        return self.conn.execute("""
+            SELECT token, ts, open, high, low, close, volume
+            FROM tradefriend_candles
+            WHERE interval = ?
+            ORDER BY token, ts
+        """, (interval,))
+
+    # -------------------------------------------------
+    # WRITE — MERGE CANDLES
+    # -------------------------------------------------
+    def upsert(self, token: str, interval: str, df: pd.DataFrame, covered_from: datetime = None):
+        """
+        Merge broker candles into the store.
+        Existing bars with the same timestamp are overwritten
+        (the last bar may have been a partial, in-session candle).
+        """
+        token = str(token)
+        now = _format_ts(datetime.now())
+
+        rows = []
+        if df is not None and not df.empty:
+            for r in df[CANDLE_COLUMNS].itertuples(index=False):
+                rows.append((
+                    token, interval, _format_ts(r[0]),
+                    float(r[1]), float(r[2]), float(r[3]), float(r[4]),
+                    float(r[5] or 0)
+                ))
+
+        with self._lock:
+            if rows:
+                self.conn.executemany("""
+                    INSERT INTO tradefriend_candles
+                        (token, interval, ts, open, high, low, close, volume)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(token, interval, ts) DO UPDATE SET
+                        open   = excluded.open,
+                        high   = excluded.high,
+                        low    = excluded.low,
+                        close  = excluded.close,
+                        volume = excluded.volume
+                """, rows)
+
+            self.conn.execute("""
+                INSERT INTO tradefriend_candle_meta
+                    (token, interval, covered_from, last_ts, fetched_at)
+                VALUES (
+                    ?, ?, ?,
+                    (SELECT MAX(ts) FROM tradefriend_candles
+                     WHERE token = ? AND interval = ?),
+                    ?
+                )
+                ON CONFLICT(token, interval) DO UPDATE SET
+                    covered_from = MIN(
+                        COALESCE(excluded.covered_from, tradefriend_candle_meta.covered_from),
+                        COALESCE(tradefriend_candle_meta.covered_from, excluded.covered_from)
+                    ),
+                    last_ts    = excluded.last_ts,
+                    fetched_at = excluded.fetched_at
+            """, (
+                token, interval,
+                _format_ts(covered_from) if covered_from else None,
+                token, interval,
+                now
+            ))
+
+            self.conn.commit()
+
+    # -------------------------------------------------
+    # MAINTENANCE
+    # -------------------------------------------------
+    def delete_older_than(self, days: int = 400):
+        cutoff = _format_ts(datetime.now() - pd.Timedelta(days=days))
+        with self._lock:
+            self.conn.execute(
+                "DELETE FROM tradefriend_candles WHERE ts < ?", (cutoff,)
+            )
+            self.conn.execute("""
+                UPDATE tradefriend_candle_meta
+                SET covered_from = ?
+                WHERE covered_from < ?
+            """, (cutoff, cutoff))
+            self.conn.commit()
+
+    def reset_all(self):
+        with self._lock:
+            self.conn.execute("DELETE FROM tradefriend_candles")
+            self.conn.execute("DELETE FROM tradefriend_candle_meta")
+            self.conn.commit()
+
+    def close(self):
+        try:
+            self.conn.close()
+        except Exception:
+            pass
+
+
+# -------------------------------------------------
+# TIMESTAMP HELPERS (naive, sortable text)
+# -------------------------------------------------
+def _format_ts(value) -> str:
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is not None:
+        ts = ts.tz_localize(None)
+    return ts.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _parse_ts(value):
+    if not value:
+        return None
+    return datetime.strptime(value, "%Y-%m-%d %H:%M:%S")
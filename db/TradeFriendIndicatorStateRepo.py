@@ -0,0 +1,164 @@
+import sqlite3
+import os
+import json
+import threading
+from datetime import datetime
+
+# -------------------------------------------------
+# DB CONFIG
+# -------------------------------------------------
+DB_FOLDER = "dbdata"
+DB_FILE = os.path.join(DB_FOLDER, "tradefriend_indicator_state.db")
+
+os.makedirs(DB_FOLDER, exist_ok=True)
+
+
+class TradeFriendIndicatorStateRepo:
+    """
+    PURPOSE:
+    - Persisted recurrence state per (token, interval, indicator)
+    - One row = serialised state + the last bars it has consumed,
+      so the next run only feeds the bars that arrived since
+    """
+
+    def __init__(self):
+        self.conn = sqlite3.connect(DB_FILE, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+
+        self.conn.execute("PRAGMA journal_mode=WAL;")
+        self.conn.execute("PRAGMA synchronous=NORMAL;")
+        self.conn.execute("PRAGMA busy_timeout = 5000;")
+        self._lock = threading.Lock()
+
+        self._create_table()
+
+    # -------------------------------------------------
+    # SCHEMA
+    # -------------------------------------------------
+    def _create_table(self):
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS tradefriend_indicator_state (
+                token TEXT NOT NULL,
+                interval TEXT NOT NULL,
+                name TEXT NOT NULL,
+                spec TEXT NOT NULL,
+                anchor_ts TEXT,
+                last_ts TEXT,
+                last_close REAL,
+                last_high REAL,
+                last_low REAL,
+                bars INTEGER,
+                state TEXT NOT NULL,
+                tail TEXT,
+                updated_at TEXT,
+                PRIMARY KEY (token, interval, name)
+            ) WITHOUT ROWID
+        """)
+
+        # Migration: rows from before last_high / last_low → NULL, which
+        # never matches a bar, so those states rebuild once
+        cols = {r["name"] for r in self.conn.execute("PRAGMA table_info(tradefriend_indicator_state)")}
+        for col in ("last_high", "last_low"):
+            if col not in cols:
+                self.conn.execute(f"ALTER TABLE tradefriend_indicator_state ADD COLUMN {col} REAL")
+        self.conn.commit()
+
+    # -------------------------------------------------
+    # READ
+    # -------------------------------------------------
+    def get_states(self, interval: str, token: str = None) -> dict:
+        """
+        {token: {name: {spec, anchor_ts, last_ts, last_close, last_high,
+                        last_low, bars, state, tail}}}
+        for one token, or every token of the interval in a single query.
+        """
+        sql = """
+            SELECT token, name, spec, anchor_ts, last_ts, last_close, last_high, last_low,
+                   bars, state, tail
+            FROM tradefriend_indicator_state
+            WHERE interval = ?
+        """
+        params = [interval]
+        if token is not None:
+            sql += " AND token = ?"
+            params.append(str(token))
+
+        states = {}
+        for r in self.conn.execute(sql, params):
+            states.setdefault(r["token"], {})[r["name"]] = {
+                "spec": r["spec"],
+                "anchor_ts": r["anchor_ts"],
+                "last_ts": r["last_ts"],
+                "last_close": r["last_close"],
+                "last_high": r["last_high"],
+                "last_low": r["last_low"],
+                "bars": r["bars"],
+                "state": json.loads(r["state"]),
+                "tail": json.loads(r["tail"]) if r["tail"] else {},
+            }
+        return states
+
+    # -------------------------------------------------
+    # WRITE (one transaction for many tokens)
+    # -------------------------------------------------
+    def save_states(self, interval: str, by_token: dict):
+        """
+        by_token: {token: {name: entry}} (same shape get_states returns)
+        """
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        rows = [
+            (
+                str(token), interval, name, e["spec"],
+                e["anchor_ts"], e["last_ts"], e["last_close"],
+                e.get("last_high"), e.get("last_low"), e["bars"],
+                json.dumps(e["state"]), json.dumps(e["tail"]), now
+            )
+            for token, entries in by_token.items()
+            for name, e in entries.items()
+        ]
+        if not rows:
+            return
+
+        with self._lock:
+            self.conn.executemany("""
+                INSERT INTO tradefriend_indicator_state
+                    (token, interval, name, spec, anchor_ts, last_ts,
+                     last_close, last_high, last_low, bars, state, tail, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(token, interval, name) DO UPDATE SET
+                    spec       = excluded.spec,
+                    anchor_ts  = excluded.anchor_ts,
+                    last_ts    = excluded.last_ts,
+                    last_close = excluded.last_close,
+                    last_high  = excluded.last_high,
+                    last_low   = excluded.last_low,
+                    bars       = excluded.bars,
+                    state      = excluded.state,
+                    tail       = excluded.tail,
+                    updated_at = excluded.updated_at
+            """, rows)
+            self.conn.commit()
+
+    # -------------------------------------------------
+    # MAINTENANCE
+    # -------------------------------------------------
+    def delete_token(self, token: str, interval: str = None):
+        sql = "DELETE FROM tradefriend_indicator_state WHERE token = ?"
+        params = [str(token)]
+        if interval:
+            sql += " AND interval = ?"
+            params.append(interval)
+        with self._lock:
+            self.conn.execute(sql, params)
+            self.conn.commit()
+
+    def reset_all(self):
+        with self._lock:
+            self.conn.execute("DELETE FROM tradefriend_indicator_state")
+            self.conn.commit()
+
+    def close(self):
+        try:
+            self.conn.close()
+        except Exception:
+            pass
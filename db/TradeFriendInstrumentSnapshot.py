@@ -0,0 +1,248 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from datetime import datetime
+
+from config.settings import NSE_EQTY_FILE, SYMBOL_NAME_MASTER_FILE
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# -------------------------------------------------
+# SNAPSHOT CONFIG
+# -------------------------------------------------
+DB_FOLDER = "dbdata"
+SNAPSHOT_FILE = os.path.join(DB_FOLDER, "instrument_snapshot.db")
+
+# A failed build (e.g. file locked by another process) is retried after
+REBUILD_RETRY_SEC = 60
+
+# Bump when the snapshot layout changes → forces a rebuild
+SNAPSHOT_VERSION = 2
+
+# source name -> file the snapshot is compiled from
+SOURCES = {
+    "nse": NSE_EQTY_FILE,
+    "names": SYMBOL_NAME_MASTER_FILE,
+}
+
+# Column order of each snapshot table (rows are read back as dicts)
+TABLE_COLUMNS = {
+    "nse": ("symbol", "token", "name", "exch_seg"),
+    "names": ("SEM_CUSTOM_SYMBOL", "SEM_TRADING_SYMBOL"),
+}
+
+SCHEMA = """
+    CREATE TABLE snapshot_meta (
+        source TEXT PRIMARY KEY,
+        mtime_ns INTEGER,
+        size INTEGER,
+        row_count INTEGER
+    );
+
+    CREATE TABLE nse_instrument (
+        seq INTEGER PRIMARY KEY,
+        symbol TEXT NOT NULL,
+        token TEXT,
+        name TEXT,
+        exch_seg TEXT
+    );
+    CREATE INDEX idx_snap_nse_symbol ON nse_instrument(symbol, token, exch_seg);
+    CREATE INDEX idx_snap_nse_token ON nse_instrument(token, symbol);
+
+    CREATE TABLE name_master (
+        seq INTEGER PRIMARY KEY,
+        custom_symbol TEXT NOT NULL,
+        trading_symbol TEXT NOT NULL
+    );
+    CREATE INDEX idx_snap_name_custom ON name_master(custom_symbol COLLATE NOCASE, trading_symbol);
+"""
+
+TABLE_QUERIES = {
+    "nse": "SELECT symbol, token, name, exch_seg FROM nse_instrument ORDER BY seq",
+    "names": "SELECT custom_symbol, trading_symbol FROM name_master ORDER BY seq",
+}
+
+
+def source_signature(path: str):
+    """
+    (mtime_ns, size) of a source file, or (None, None) when missing.
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None, None
+    return st.st_mtime_ns, st.st_size
+
+
+def _read_json(path: str) -> list:
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"⚠️ Instrument master not readable | {os.path.basename(path)} | {e}")
+        return []
+
+
+# ================================================================================
+# CLASS: TradeFriendInstrumentSnapshot
+# ================================================================================
+class TradeFriendInstrumentSnapshot:
+    """
+    PURPOSE:
+    - Compiles NSEEQTYdata.json + symbolnamemaster.json into ONE
+      indexed SQLite file
+    - Cold start reads a few compact tables instead of json-parsing MBs
+    - Rebuilt automatically when any source's mtime / size changes
+    - Built to a temp file and swapped in (readers never see half a build)
+    """
+
+    def __init__(self, path: str = SNAPSHOT_FILE, sources: dict = None):
+        self.path = path
+        self.sources = dict(sources or SOURCES)
+        self._lock = threading.Lock()
+        self._meta = None          # cached snapshot_meta of self.path
+        self._meta_mtime = None
+        self._failed_at = 0.0
+
+    # ==================================================
+    # FRESHNESS
+    # ==================================================
+    def _read_meta(self):
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            self._meta, self._meta_mtime = None, None
+            return None
+
+        if mtime != self._meta_mtime:
+            try:
+                conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+                try:
+                    rows = conn.execute(
+                        "SELECT source, mtime_ns, size, row_count FROM snapshot_meta"
+                    ).fetchall()
+                finally:
+                    conn.close()
+            except sqlite3.Error:
+                rows = None
+            self._meta = {r[0]: r[1:] for r in rows} if rows else None
+            self._meta_mtime = mtime
+        return self._meta
+
+    def is_stale(self) -> bool:
+        meta = self._read_meta()
+        if not meta or meta.get("version", (None,))[0] != SNAPSHOT_VERSION:
+            return True
+        for source, path in self.sources.items():
+            if meta.get(source, (None, None))[:2] != source_signature(path):
+                return True
+        return False
+
+    def ensure(self):
+        """
+        Rebuild if stale. Returns the snapshot's mtime (its generation),
+        or None when no snapshot could be produced.
+        """
+        if self.is_stale() and time.monotonic() - self._failed_at >= REBUILD_RETRY_SEC:
+            with self._lock:
+                if self.is_stale() and not self.build():
+                    self._failed_at = time.monotonic()
+        return self._meta_mtime
+
+    def has_source(self, source: str) -> bool:
+        """
+        False when the source file was missing at build time.
+        """
+        meta = self._meta or {}
+        return meta.get(source, (None,))[0] is not None
+
+    # ==================================================
+    # BUILD (writer)
+    # ==================================================
+    def build(self) -> bool:
+        started = datetime.now()
+        signatures = {source: source_signature(path) for source, path in self.sources.items()}
+
+        nse = _read_json(self.sources["nse"]) if signatures["nse"][0] is not None else []
+        names = _read_json(self.sources["names"]) if signatures["names"][0] is not None else []
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            conn = sqlite3.connect(tmp)
+            try:
+                conn.execute("PRAGMA journal_mode=OFF;")
+                conn.execute("PRAGMA synchronous=OFF;")
+                conn.executescript(SCHEMA)
+
+                conn.executemany(
+                    "INSERT INTO nse_instrument (symbol, token, name, exch_seg) VALUES (?, ?, ?, ?)",
+                    (
+                        (r["symbol"],
+                         None if r.get("token") is None else str(r["token"]),
+                         r.get("name"),
+                         r.get("exch_seg"))
+                        for r in nse if r.get("symbol")
+                    )
+                )
+                conn.executemany(
+                    "INSERT INTO name_master (custom_symbol, trading_symbol) VALUES (?, ?)",
+                    (
+                        (r["SEM_CUSTOM_SYMBOL"], r["SEM_TRADING_SYMBOL"])
+                        for r in names
+                        if r.get("SEM_CUSTOM_SYMBOL") and r.get("SEM_TRADING_SYMBOL")
+                    )
+                )
+
+                counts = {"nse": len(nse), "names": len(names)}
+                meta = [(s, sig[0], sig[1], counts[s]) for s, sig in signatures.items()]
+                meta.append(("version", SNAPSHOT_VERSION, None, None))
+                conn.executemany("INSERT INTO snapshot_meta VALUES (?, ?, ?, ?)", meta)
+                conn.commit()
+            finally:
+                conn.close()
+
+            os.replace(tmp, self.path)
+
+        except (OSError, sqlite3.Error) as e:
+            # Windows: another process may hold the old file open → next check retries
+            logger.warning(f"⚠️ Instrument snapshot not written | {e}")
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            return False
+
+        self._read_meta()
+        logger.info(
+            f"🧱 Instrument snapshot built | nse={len(nse)} | names={len(names)} | "
+            f"{(datetime.now() - started).total_seconds() * 1000:.0f} ms"
+        )
+        return True
+
+    # ==================================================
+    # READ (reader)
+    # ==================================================
+    def load(self, table: str) -> list:
+        """
+        All rows of one snapshot table as dicts (source field names).
+        Connection is closed right away so rebuilds can replace the file.
+        """
+        conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+        try:
+            rows = conn.execute(TABLE_QUERIES[table]).fetchall()
+        finally:
+            conn.close()
+
+        columns = TABLE_COLUMNS[table]
+        return [dict(zip(columns, row)) for row in rows]
+
+
+if __name__ == "__main__":
+    snapshot = TradeFriendInstrumentSnapshot()
+    snapshot.build()
@@ -0,0 +1,325 @@
+import sqlite3
+import os
+import json
+import threading
+from datetime import datetime
+
+# -------------------------------------------------
+# DB CONFIG
+# -------------------------------------------------
+DB_FOLDER = "dbdata"
+DB_FILE = os.path.join(DB_FOLDER, "tradefriend_scan_journal.db")
+
+os.makedirs(DB_FOLDER, exist_ok=True)
+
+# Per-symbol journal states
+PENDING = "PENDING"
+VALID = "VALID"
+REJECTED = "REJECTED"
+SKIPPED = "SKIPPED"
+FAILED = "FAILED"
+
+
+class TradeFriendScanJournalRepo:
+    """
+    PURPOSE:
+    - Checkpoint journal of the daily scan
+    - scan_runs    : one row per run (run id, scan date, status)
+    - scan_journal : the run's universe snapshot, one row per symbol
+                     with status / reason / result / attempts
+    - A restarted scan resumes the PENDING symbols of the day's
+      unfinished DAILY run; FAILED ones go to the bounded retry pass
+    - scan_fingerprints : last outcome per symbol + the fingerprint of
+                          its inputs → unchanged symbols are carried
+                          forward instead of re-evaluated
+    """
+
+    def __init__(self):
+        self.conn = sqlite3.connect(DB_FILE, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+
+        self.conn.execute("PRAGMA journal_mode=WAL;")
+        self.conn.execute("PRAGMA synchronous=NORMAL;")
+        self.conn.execute("PRAGMA busy_timeout = 5000;")
+        self._lock = threading.Lock()
+
+        self._create_table()
+
+    # -------------------------------------------------
+    # SCHEMA
+    # -------------------------------------------------
+    def _create_table(self):
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS scan_runs (
+                run_id TEXT PRIMARY KEY,
+                scan_date TEXT NOT NULL,
+                kind TEXT DEFAULT 'DAILY',
+                status TEXT DEFAULT 'RUNNING',
+                universe INTEGER,
+                started_at TEXT,
+                finished_at TEXT
+            )
+        """)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS scan_journal (
+                run_id TEXT NOT NULL,
+                symbol TEXT NOT NULL,
+                trading_symbol TEXT,
+                token TEXT,
+                status TEXT DEFAULT 'PENDING',
+                reason TEXT,
+                result TEXT,
+                attempts INTEGER DEFAULT 0,
+                updated_at TEXT,
+                PRIMARY KEY (run_id, symbol)
+            ) WITHOUT ROWID
+        """)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS scan_fingerprints (
+                symbol TEXT PRIMARY KEY,
+                fingerprint TEXT NOT NULL,
+                status TEXT,
+                reason TEXT,
+                result TEXT,
+                updated_at TEXT
+            ) WITHOUT ROWID
+        """)
+
+        # Columns added after the first release
+        existing_cols = {r["name"] for r in self.conn.execute("PRAGMA table_info(scan_runs)")}
+        if "kind" not in existing_cols:
+            self.conn.execute("ALTER TABLE scan_runs ADD COLUMN kind TEXT DEFAULT 'DAILY'")
+
+        self.conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_scan_runs_date
+            ON scan_runs(scan_date, status)
+        """)
+        self.conn.commit()
+
+    # -------------------------------------------------
+    # RUNS
+    # -------------------------------------------------
+    def start_run(self, scan_date: str, rows, kind: str = "DAILY") -> str:
+        """
+        New run + universe snapshot (symbol, trading_symbol, token).
+        kind: DAILY (resumable) or RESCAN (on-demand subset)
+        """
+        now = datetime.now()
+        run_id = now.strftime("%Y%m%d-%H%M%S-%f")
+        stamp = now.strftime("%Y-%m-%d %H:%M:%S")
+
+        snapshot = [
+            (run_id, r["symbol"], r["trading_symbol"], str(r["token"]), stamp)
+            for r in rows
+        ]
+
+        with self._lock:
+            self.conn.execute("""
+                INSERT INTO scan_runs (run_id, scan_date, kind, status, universe, started_at)
+                VALUES (?, ?, ?, 'RUNNING', ?, ?)
+            """, (run_id, scan_date, kind, len(snapshot), stamp))
+            self.conn.executemany("""
+                INSERT OR IGNORE INTO scan_journal
+                    (run_id, symbol, trading_symbol, token, status, updated_at)
+                VALUES (?, ?, ?, ?, 'PENDING', ?)
+            """, snapshot)
+            self.conn.commit()
+
+        return run_id
+
+    def get_open_run(self, scan_date: str):
+        """
+        The scan date's unfinished DAILY run id, or None.
+        """
+        row = self.conn.execute("""
+            SELECT run_id
+            FROM scan_runs
+            WHERE scan_date = ? AND status = 'RUNNING' AND kind = 'DAILY'
+            ORDER BY started_at DESC
+            LIMIT 1
+        """, (scan_date,)).fetchone()
+        return row["run_id"] if row else None
+
+    def finish_run(self, run_id: str):
+        with self._lock:
+            self.conn.execute("""
+                UPDATE scan_runs
+                SET status = 'COMPLETED', finished_at = ?
+                WHERE run_id = ?
+            """, (datetime.now().strftime("%Y-%m-%d %H:%M:%S"), run_id))
+            self.conn.commit()
+
+    # -------------------------------------------------
+    # SYMBOLS
+    # -------------------------------------------------
+    def pending(self, run_id: str) -> list:
+        """
+        Universe rows not finished yet (dicts: symbol, trading_symbol, token).
+        """
+        return [
+            dict(r) for r in self.conn.execute("""
+                SELECT symbol, trading_symbol, token
+                FROM scan_journal
+                WHERE run_id = ? AND status = 'PENDING'
+                ORDER BY symbol
+            """, (run_id,))
+        ]
+
+    def retryable(self, run_id: str, reasons, max_attempts: int) -> list:
+        """
+        FAILED rows, REJECTED rows whose reason is transient, and rows
+        a pass left PENDING (never reached an outcome), attempted fewer
+        than max_attempts times.
+        """
+        reasons = list(reasons)
+        marks = ",".join("?" * len(reasons)) or "NULL"
+        return [
+            dict(r) for r in self.conn.execute(f"""
+                SELECT symbol, trading_symbol, token
+                FROM scan_journal
+                WHERE run_id = ?
+                  AND attempts < ?
+                  AND (status IN ('FAILED', 'PENDING')
+                       OR (status = 'REJECTED' AND reason IN ({marks})))
+                ORDER BY symbol
+            """, [run_id, max_attempts, *reasons])
+        ]
+
+    def record(self, run_id: str, outcomes) -> int:
+        """
+        outcomes: [(symbol, status, reason, result dict | None,
+                    fingerprint | None)]
+        One transaction; every record counts as one attempt. Outcomes
+        with a fingerprint (never FAILED) become the symbol's carried-
+        forward result.
+        """
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        rows, prints = [], []
+        for symbol, status, reason, result, fingerprint in outcomes:
+            payload = json.dumps(result, default=_json_default) if result is not None else None
+            rows.append((status, reason, payload, now, run_id, symbol))
+            if fingerprint and status != FAILED:
+                prints.append((symbol, fingerprint, status, reason, payload, now))
+        if not rows:
+            return 0
+
+        with self._lock:
+            self.conn.executemany("""
+                UPDATE scan_journal
+                SET status = ?, reason = ?, result = ?,
+                    attempts = attempts + 1, updated_at = ?
+                WHERE run_id = ? AND symbol = ?
+            """, rows)
+            self.conn.executemany("""
+                INSERT INTO scan_fingerprints
+                    (symbol, fingerprint, status, reason, result, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(symbol) DO UPDATE SET
+                    fingerprint = excluded.fingerprint,
+                    status      = excluded.status,
+                    reason      = excluded.reason,
+                    result      = excluded.result,
+                    updated_at  = excluded.updated_at
+            """, prints)
+            self.conn.commit()
+        return len(rows)
+
+    # -------------------------------------------------
+    # FINGERPRINTS (carry-forward)
+    # -------------------------------------------------
+    def get_fingerprints(self) -> dict:
+        """
+        {symbol: {fingerprint, status, reason, result}} in one query.
+        """
+        return {
+            r["symbol"]: {
+                "fingerprint": r["fingerprint"],
+                "status": r["status"],
+                "reason": r["reason"],
+                "result": json.loads(r["result"]) if r["result"] else None,
+            }
+            for r in self.conn.execute("""
+                SELECT symbol, fingerprint, status, reason, result
+                FROM scan_fingerprints
+            """)
+        }
+
+    def clear_fingerprints(self, symbols=None):
+        """
+        Forget carried results (all, or some symbols) → next scan
+        re-evaluates them.
+        """
+        with self._lock:
+            if symbols is None:
+                self.conn.execute("DELETE FROM scan_fingerprints")
+            else:
+                self.conn.executemany(
+                    "DELETE FROM scan_fingerprints WHERE symbol = ?",
+                    [(s,) for s in symbols]
+                )
+            self.conn.commit()
+
+    def outcomes(self, run_id: str):
+        """
+        (valid, rejected, skipped) report lists for the WHOLE run,
+        whichever process / pass produced them. Symbols still FAILED or
+        PENDING are reported as rejected.
+        """
+        valid, rejected, skipped = [], [], []
+        for r in self.conn.execute("""
+            SELECT symbol, status, reason, result
+            FROM scan_journal
+            WHERE run_id = ?
+            ORDER BY updated_at, symbol
+        """, (run_id,)):
+            if r["status"] == VALID:
+                valid.append(json.loads(r["result"]))
+            elif r["status"] == SKIPPED:
+                skipped.append({"symbol": r["symbol"], "reason": r["reason"]})
+            else:
+                rejected.append({
+                    "symbol": r["symbol"],
+                    "reason": r["reason"] or "Not scanned"
+                })
+        return valid, rejected, skipped
+
+    def progress(self, run_id: str) -> dict:
+        return {
+            r["status"]: r["n"] for r in self.conn.execute("""
+                SELECT status, COUNT(*) AS n
+                FROM scan_journal
+                WHERE run_id = ?
+                GROUP BY status
+            """, (run_id,))
+        }
+
+    # -------------------------------------------------
+    # MAINTENANCE
+    # -------------------------------------------------
+    def delete_older_than(self, days: int):
+        with self._lock:
+            self.conn.execute("""
+                DELETE FROM scan_journal
+                WHERE run_id IN (
+                    SELECT run_id FROM scan_runs
+                    WHERE scan_date <= date('now', ?)
+                )
+            """, (f"-{days} days",))
+            self.conn.execute("""
+                DELETE FROM scan_runs
+                WHERE scan_date <= date('now', ?)
+            """, (f"-{days} days",))
+            self.conn.commit()
+
+    def close(self):
+        try:
+            self.conn.close()
+        except Exception:
+            pass
+
+
+def _json_default(value):
+    # numpy scalars → plain Python numbers
+    if hasattr(value, "item"):
+        return value.item()
+    return str(value)
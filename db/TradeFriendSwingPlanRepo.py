@@ -60,10 +60,16 @@ class TradeFriendSwingPlanRepo:
                 status TEXT DEFAULT 'PLANNED',
                 expiry_date TEXT,
                 created_on TEXT DEFAULT (datetime('now')),
-                triggered_on TEXT
+                triggered_on TEXT,
+                scan_run TEXT
             )
         """)
 
+        # Migration: scan run that last wrote the plan (resume detection)
+        cols = {r[1] for r in self.conn.execute("PRAGMA table_info(swing_trade_plans)")}
+        if "scan_run" not in cols:
+            self.conn.execute("ALTER TABLE swing_trade_plans ADD COLUMN scan_run TEXT")
+
         self.conn.execute("""
             CREATE INDEX IF NOT EXISTS idx_swing_plan_status
             ON swing_trade_plans(status)
@@ -83,20 +89,69 @@ class TradeFriendSwingPlanRepo:
         if not plan:
             return
 
-        plan = dict(plan)
+        self.conn.execute(self._INSERT_SQL, self._plan_params(plan))
+        self.conn.commit()
+
+    def save_plans(self, plans: List[Dict]) -> int:
+        """
+        save_plan() for many plans: one executemany, one commit.
+        """
+        rows = [self._plan_params(plan) for plan in plans if plan]
+        if not rows:
+            return 0
+
+        with self.conn:
+            self.conn.executemany(self._INSERT_SQL, rows)
+        return len(rows)
+
+    # --------------------------------------------------
+    # UPDATE PLAN (BETTER ENTRY ON RESCAN)
+    # --------------------------------------------------
+    def update_plan(self, plan_id: int, new_plan: Dict):
+        self.update_plans([(plan_id, new_plan)])
+
+    def update_plans(self, updates: List[tuple]) -> int:
+        """
+        [(plan_id, plan)] → levels / metadata replaced, status and
+        created_on kept. One executemany, one commit.
+        """
+        rows = [
+            self._plan_params(plan)[1:] + (plan_id,)
+            for plan_id, plan in updates
+            if plan
+        ]
+        if not rows:
+            return 0
+
+        with self.conn:
+            self.conn.executemany("""
+                UPDATE swing_trade_plans
+                SET strategy = ?,
+                    direction = ?, order_type = ?, trade_type = ?,
+                    carry_forward = ?, product_type = ?,
+                    entry = ?, sl = ?, target1 = ?, rr = ?,
+                    expiry_date = ?, scan_run = ?
+                WHERE id = ?
+            """, rows)
+        return len(rows)
+
+    _INSERT_SQL = """
+        INSERT INTO swing_trade_plans (
+            symbol, strategy,
+            direction, order_type, trade_type, carry_forward, product_type,
+            entry, sl, target1, rr,
+            status, expiry_date, scan_run, created_on
+        )
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'PLANNED', ?, ?, datetime('now'))
+    """
+
+    @staticmethod
+    def _plan_params(plan: Dict) -> tuple:
         target1 = plan.get("target1") or plan.get("target")
         if target1 is None:
             raise ValueError(f"Missing target for {plan.get('symbol')}")
 
-        self.conn.execute("""
-            INSERT INTO swing_trade_plans (
-                symbol, strategy,
-                direction, order_type, trade_type, carry_forward, product_type,
-                entry, sl, target1, rr,
-                status, expiry_date, created_on
-            )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'PLANNED', ?, datetime('now'))
-        """, (
+        return (
             plan["symbol"],
             plan.get("strategy"),
             plan.get("direction", "BUY"),
@@ -108,10 +163,9 @@ class TradeFriendSwingPlanRepo:
             float(plan["sl"]),
             float(target1),
             plan.get("rr"),
-            plan.get("expiry_date")
-        ))
-
-        self.conn.commit()
+            plan.get("expiry_date"),
+            plan.get("scan_run")
+        )
 
     # --------------------------------------------------
     # FETCH ACTIVE PLANS (PLANNED + HOLD)
@@ -137,6 +191,24 @@ class TradeFriendSwingPlanRepo:
             LIMIT 1
         """, (symbol,)).fetchone()
 
+    # --------------------------------------------------
+    # ACTIVE PLAN MAP (ONE QUERY PER SCAN)
+    # --------------------------------------------------
+    def get_active_plan_map(self) -> Dict[str, dict]:
+        """
+        {symbol: newest active plan} — get_active_plan() for every
+        symbol in one query.
+        """
+        rows = self.conn.execute("""
+            SELECT *
+            FROM swing_trade_plans
+            WHERE status IN ('PLANNED', 'HOLD')
+            ORDER BY created_on ASC, id ASC
+        """).fetchall()
+
+        # Ascending → the newest plan per symbol is written last
+        return {r["symbol"]: dict(r) for r in rows}
+
     # --------------------------------------------------
     # MARK TRIGGERED
     # --------------------------------------------------
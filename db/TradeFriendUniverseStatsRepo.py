@@ -0,0 +1,216 @@
+import sqlite3
+import os
+import threading
+from datetime import datetime
+
+from config.TradeFriendConfig import PREFILTER_PRICE_BAND
+
+# -------------------------------------------------
+# DB CONFIG
+# -------------------------------------------------
+DB_FOLDER = "dbdata"
+DB_FILE = os.path.join(DB_FOLDER, "tradefriend_universe_stats.db")
+
+os.makedirs(DB_FOLDER, exist_ok=True)
+
+# data freshness: calendar days since the last stored bar
+AGE_DAYS = "max(julianday(date('now', 'localtime')) - julianday(last_bar_date), 0)"
+
+# Predicate columns → SQL expression (whitelist: nothing else reaches the SQL)
+STAT_COLUMNS = {
+    "last_close": "last_close",
+    "avg_turnover_20": "avg_turnover_20",
+    "avg_turnover_50": "avg_turnover_50",
+    "atr_pct": "atr_pct",
+    "high_52w_dist_pct": "high_52w_dist_pct",
+    "low_52w_dist_pct": "low_52w_dist_pct",
+    "age_days": AGE_DAYS,
+    # Upper bounds of what today's fetch can show: one new bar per
+    # day since the stats, the high moving at most PREFILTER_PRICE_BAND
+    # per day → a stale row never excludes a symbol the scan would keep
+    "bars": f"bars + {AGE_DAYS}",
+    "last_high": f"last_high * (1 + {float(PREFILTER_PRICE_BAND)} * {AGE_DAYS})",
+}
+UPPER_BOUND_COLUMNS = ("bars", "last_high")
+OPERATORS = ("<", "<=", ">", ">=", "=", "!=")
+
+
+class TradeFriendUniverseStatsRepo:
+    """
+    PURPOSE:
+    - One row of cheap per-token statistics for the whole universe
+      (last close / high, 20/50-day avg turnover, ATR%, distance from
+      the 52-week high / low, last bar date, history length)
+    - Rebuilt in ONE transaction per published candle snapshot
+    - excluded_tokens() evaluates every strategy's pre-filter in ONE
+      indexed query before any per-symbol work
+    """
+
+    def __init__(self):
+        self.conn = sqlite3.connect(DB_FILE, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+
+        self.conn.execute("PRAGMA journal_mode=WAL;")
+        self.conn.execute("PRAGMA synchronous=NORMAL;")
+        self.conn.execute("PRAGMA busy_timeout = 5000;")
+        self._lock = threading.Lock()
+
+        self._create_table()
+
+    # -------------------------------------------------
+    # SCHEMA
+    # -------------------------------------------------
+    def _create_table(self):
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS universe_stats (
+                token TEXT PRIMARY KEY,
+                last_close REAL,
+                last_high REAL,
+                avg_turnover_20 REAL,
+                avg_turnover_50 REAL,
+                atr_pct REAL,
+                high_52w REAL,
+                low_52w REAL,
+                high_52w_dist_pct REAL,
+                low_52w_dist_pct REAL,
+                last_bar_date TEXT,
+                bars INTEGER,
+                updated_at TEXT
+            ) WITHOUT ROWID
+        """)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS universe_stats_meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            )
+        """)
+
+        # Migration: tables created before last_high (rebuild on next refresh)
+        cols = {r["name"] for r in self.conn.execute("PRAGMA table_info(universe_stats)")}
+        if "last_high" not in cols:
+            self.conn.execute("ALTER TABLE universe_stats ADD COLUMN last_high REAL")
+            self.conn.execute("DELETE FROM universe_stats_meta WHERE key = 'source'")
+
+        # Filter columns most predicates lead with
+        self.conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_universe_stats_turnover
+            ON universe_stats(avg_turnover_20, last_close)
+        """)
+        self.conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_universe_stats_bar_date
+            ON universe_stats(last_bar_date)
+        """)
+        self.conn.commit()
+
+    # -------------------------------------------------
+    # WRITE (full rebuild)
+    # -------------------------------------------------
+    def replace_all(self, rows, source: str = None) -> int:
+        """
+        rows: dicts with token + the stat columns.
+        Replaces the table in one transaction; `source` (the candle
+        snapshot generation) is remembered for refreshed_from().
+        """
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        params = [
+            (
+                str(r["token"]), r["last_close"], r["last_high"],
+                r["avg_turnover_20"], r["avg_turnover_50"],
+                r["atr_pct"], r["high_52w"], r["low_52w"],
+                r["high_52w_dist_pct"], r["low_52w_dist_pct"],
+                r["last_bar_date"], r["bars"], now
+            )
+            for r in rows
+        ]
+
+        with self._lock:
+            self.conn.execute("DELETE FROM universe_stats")
+            self.conn.executemany("""
+                INSERT INTO universe_stats (
+                    token, last_close, last_high, avg_turnover_20, avg_turnover_50,
+                    atr_pct, high_52w, low_52w,
+                    high_52w_dist_pct, low_52w_dist_pct,
+                    last_bar_date, bars, updated_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, params)
+            self.conn.executemany("""
+                INSERT OR REPLACE INTO universe_stats_meta (key, value)
+                VALUES (?, ?)
+            """, [("source", source), ("refreshed_at", now)])
+            self.conn.commit()
+
+        return len(params)
+
+    def refreshed_from(self):
+        """
+        Candle snapshot generation the table was built from, or None.
+        """
+        row = self.conn.execute(
+            "SELECT value FROM universe_stats_meta WHERE key = 'source'"
+        ).fetchone()
+        return row["value"] if row else None
+
+    # -------------------------------------------------
+    # READ
+    # -------------------------------------------------
+    def get(self, token: str) -> dict | None:
+        row = self.conn.execute(
+            "SELECT * FROM universe_stats WHERE token = ?", (str(token),)
+        ).fetchone()
+        return dict(row) if row else None
+
+    def count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM universe_stats").fetchone()[0]
+
+    # -------------------------------------------------
+    # PRE-FILTER
+    # -------------------------------------------------
+    def excluded_tokens(self, prefilters, revalidate_days: int) -> set:
+        """
+        prefilters: one predicate list per strategy, each predicate a
+                    (column, operator, value) tuple → a token passes a
+                    strategy when ALL its predicates hold, and is scanned
+                    when ANY strategy passes it; a callable value is
+                    resolved here, None → the predicate always holds
+        Returns the tokens that fail every strategy. Never excluded:
+        - tokens without a stats row (new listings)
+        - tokens whose last bar is older than revalidate_days (their
+          history is fetched again, which refreshes their stats)
+        - predicates on a NULL stat (not enough history to judge)
+        """
+        clauses, params = [], []
+        for predicates in prefilters:
+            if not predicates:
+                return set()        # a strategy without pre-filter scans everything
+            parts = []
+            for column, op, value in predicates:
+                if column not in STAT_COLUMNS or op not in OPERATORS:
+                    raise ValueError(f"Invalid pre-filter predicate: {(column, op, value)}")
+                if callable(value):
+                    value = value()
+                if value is None:
+                    continue
+                parts.append(f"{STAT_COLUMNS[column]} {op} ?")
+                params.append(value)
+            if not parts:
+                return set()        # nothing left to judge → everything passes
+            clauses.append("(" + " AND ".join(parts) + ")")
+
+        if not clauses:
+            return set()
+
+        # NOT(...) on a NULL comparison stays NULL → row not excluded
+        return {
+            r["token"] for r in self.conn.execute(f"""
+                SELECT token
+                FROM universe_stats
+                WHERE last_bar_date >= date('now', 'localtime', ?)
+                  AND NOT ({" OR ".join(clauses)})
+            """, [f"-{revalidate_days} days", *params])
+        }
+
+    def close(self):
+        try:
+            self.conn.close()
+        except Exception:
+            pass
@@ -105,6 +105,42 @@ class TradeFriendWatchlistRepo:
 
         self.conn.commit()
 
+    # -------------------------------------------------
+    # BULK UPSERT (ONE TRANSACTION)
+    # -------------------------------------------------
+    def upsert_many(self, records: List[Dict]) -> int:
+        """
+        upsert() for many records: one executemany, one commit.
+        """
+        rows = [
+            (
+                r["symbol"],
+                r.get("strategy"),
+                r.get("bias"),
+                int(r.get("score") or 0)
+            )
+            for r in records
+            if r and r.get("symbol")
+        ]
+        if not rows:
+            return 0
+
+        with self.conn:
+            self.conn.executemany("""
+                INSERT INTO tradefriend_watchlist
+                    (symbol, strategy, bias, score, scanned_on, status)
+                VALUES
+                    (?, ?, ?, ?, datetime('now'), 'WATCH')
+                ON CONFLICT(symbol) DO UPDATE SET
+                    strategy   = excluded.strategy,
+                    bias       = excluded.bias,
+                    score      = excluded.score,
+                    scanned_on = datetime('now'),
+                    status     = 'WATCH'
+            """, rows)
+
+        return len(rows)
+
     # -------------------------------------------------
     # READ — FULL WATCHLIST
     # -------------------------------------------------
@@ -3,6 +3,8 @@ import re
 import sqlite3
 from datetime import datetime
 
+from utils.symbol_search_index import TradeFriendSymbolSearchIndex
+
 
 # -----------------------------
 # DB PATH (separate database)
@@ -23,6 +25,7 @@ class TradeFindDB:
         self.conn = sqlite3.connect(DB_FILE, check_same_thread=False)
         self.conn.row_factory = sqlite3.Row
         self.cursor = self.conn.cursor()
+        self._search_cache = None   # (version, rows, search index)
         self._ensure_table()
         self._ensure_indexes()
 
@@ -212,22 +215,34 @@ class TradeFindDB:
         return self.cursor.fetchall()
 
     def search(self, text, active_only=True):
-        pattern = f"%{text.upper()}%"
-        sql = """
-            SELECT symbol, trading_symbol, token, is_active
-            FROM tradefindinstrument
-            WHERE (UPPER(symbol) LIKE ?
-               OR UPPER(trading_symbol) LIKE ?)
         """
-        params = [pattern, pattern]
-
+        Rows whose symbol / trading_symbol contains text, in symbol
+        order. Served from an in-memory trigram index, rebuilt only when
+        the table changed (this connection or any other).
+        """
+        rows, index = self._search_index()
+        ids = index.filter_ids(text)
         if active_only:
-            sql += " AND is_active = 1"
-
-        sql += " ORDER BY symbol"
-
-        self.cursor.execute(sql, params)
-        return self.cursor.fetchall()
+            return [rows[i] for i in ids if rows[i]["is_active"] == 1]
+        return [rows[i] for i in ids]
+
+    def _search_index(self):
+        # data_version moves on other connections' commits, total_changes on ours
+        version = (
+            self.conn.execute("PRAGMA data_version").fetchone()[0],
+            self.conn.total_changes,
+        )
+        if self._search_cache is None or self._search_cache[0] != version:
+            rows = self.conn.execute("""
+                SELECT symbol, trading_symbol, token, is_active
+                FROM tradefindinstrument
+                ORDER BY symbol
+            """).fetchall()
+            # One label per row: both columns searchable; the newline keeps
+            # a match from spanning the two columns
+            labels = [f"{r['symbol']}\n{r['trading_symbol']}" for r in rows]
+            self._search_cache = (version, rows, TradeFriendSymbolSearchIndex(labels))
+        return self._search_cache[1], self._search_cache[2]
 
     # ---------------------------------------------------
     # STATS
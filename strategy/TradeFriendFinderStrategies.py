@@ -0,0 +1,92 @@
+from core.TradeFriendIndicatorPlanner import TradeFriendIndicatorPlanner, need
+from core.TradeFriendUniverseStatsService import where
+from utils.indicators import IndicatorEngine
+
+# ================================================================================
+# TRADE FINDER STRATEGIES (declared indicator needs + universe pre-filters)
+# PREFILTER = the minimum history evaluate() itself rejects below
+# ================================================================================
+class TradeFriendEmaCrossoverStrategy:
+    """
+    PURPOSE:
+    - EMA 20/50 crossover with RSI and signed-volume sizing
+    - Evaluation: IndicatorEngine.check_ema_crossover on the shared bars
+    """
+
+    name = "ema_crossover"
+    PREFILTER = (where("bars", ">=", 55),)
+    NEEDS = dict([
+        need("ema", period=20),
+        need("ema", period=50),
+        need("rsi", period=14),
+        need("signed_volume"),
+        need("sma", period=20, source="signed_volume"),
+    ])
+
+    def evaluate(self, bars, symbol, token=None):
+        return IndicatorEngine(bars, symbol, token=token).check_ema_crossover()
+
+
+class TradeFriendBollingerMomentumStrategy:
+    """
+    PURPOSE:
+    - BB(30, 2) middle-band pullback with ADX / RSI / volume filters
+    """
+
+    name = "bollinger_momentum"
+    PREFILTER = (where("bars", ">=", 50),)
+    NEEDS = dict([
+        need("bbands", period=30, nbdevup=2, nbdevdn=2),
+        need("rsi", period=14),
+        need("adx", period=14),
+        need("sma", period=20, source="volume"),
+    ])
+
+    def evaluate(self, bars, symbol, token=None):
+        return IndicatorEngine(bars, symbol, token=token).bollinger_momentum()
+
+
+class TradeFriendMidBandEntryStrategy:
+    """
+    PURPOSE:
+    - Mid-band cross + bullish engulfing + EMA50 slope
+    """
+
+    name = "mid_band_entry"
+    PREFILTER = (where("bars", ">=", 50),)
+    NEEDS = dict([
+        need("bbands", period=20),
+        need("ema", period=50),
+    ])
+
+    def evaluate(self, bars, symbol, token=None):
+        return IndicatorEngine(bars, symbol, token=token).strategy_mid_band_entry()
+
+
+class TradeFriendMultiSetupStrategy:
+    """
+    PURPOSE:
+    - Support rebound / upper breakout (same indicators as TradeFriendScanner)
+    """
+
+    name = "multi_setup"
+    PREFILTER = (where("bars", ">=", 50),)
+    NEEDS = dict([
+        need("bbands", period=20),
+        need("rsi", period=14),
+        need("ema", period=50),
+        need("sma", period=20, source="volume"),
+    ])
+
+    def evaluate(self, bars, symbol, token=None):
+        return IndicatorEngine(bars, symbol, token=token).scanner_multi_strategy()
+
+
+def finder_planner() -> TradeFriendIndicatorPlanner:
+    """
+    Strategies run by the trade finder (EMA first, BB on rejection).
+    """
+    return TradeFriendIndicatorPlanner([
+        TradeFriendEmaCrossoverStrategy(),
+        TradeFriendBollingerMomentumStrategy(),
+    ])
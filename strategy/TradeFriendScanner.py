@@ -1,5 +1,8 @@
-import talib
-import logging
+import numpy as np
+
+from core.TradeFriendIndicatorCache import get_indicator_cache
+from core.TradeFriendPositionSizer import TradeFriendPositionSizer
+from core.TradeFriendUniverseStatsService import where
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -12,10 +15,40 @@ class TradeFriendScanner:
     - Saves only SYMBOL + STRATEGY
     """
 
+    # Universe stats pre-filter (one SQL query before any fetch):
+    # - the 60 bars scan() rejects below
+    # - planned entry = last high; below the lowest enabled sizer slab
+    #   the plan always sizes to qty 0 (floor read from settings per run)
+    PREFILTER = (
+        where("bars", ">=", 60),
+        where("last_high", ">=", lambda: TradeFriendPositionSizer().min_sized_price()),
+    )
+
     def __init__(self, df, symbol):
-        self.df = df.copy()
+        # DataFrame or TradeFriendPanelView — read-only, never copied
+        self.df = df
         self.symbol = symbol
 
+    def _indicators(self) -> dict:
+        """
+        Columns the scan needs as NumPy arrays.
+        Panel views carry them precomputed; plain frames get them here.
+        """
+        df = self.df
+        cols = {f: np.asarray(df[f], dtype=np.float64) for f in ("open", "high", "low", "close", "volume")}
+
+        if all(name in df for name in ("bb_upper", "bb_middle", "ema_50", "rsi", "vol_sma_20")):
+            for name in ("bb_upper", "bb_middle", "ema_50", "rsi", "vol_sma_20"):
+                cols[name] = np.asarray(df[name])
+            return cols
+
+        ind = get_indicator_cache().series(self.symbol, df)
+        cols["bb_upper"], cols["bb_middle"], _ = ind.bbands(20)
+        cols["ema_50"] = ind.ema(50)
+        cols["rsi"] = ind.rsi(14)
+        cols["vol_sma_20"] = ind.sma(20, source="volume")
+        return cols
+
     def scan(self):
         df = self.df
 
@@ -25,20 +58,11 @@ class TradeFriendScanner:
             logger.info(f"{self.symbol} → Skipped (insufficient data)")
             return None
 
-        close = df["close"].astype(float)
-        volume = df["volume"].astype(float)
-
-        # Indicators
-        df["bb_upper"], df["bb_middle"], df["bb_lower"] = talib.BBANDS(
-            close, timeperiod=20
-        )
-        df["ema_50"] = talib.EMA(close, timeperiod=50)
-        df["rsi"] = talib.RSI(close, timeperiod=14)
-
-        last = df.iloc[-1]
+        c = self._indicators()
+        last = {name: values[-1] for name, values in c.items()}
 
         # --------- GLOBAL TREND FILTER ----------
-        ema_slope = df["ema_50"].iloc[-1] - df["ema_50"].iloc[-5]
+        ema_slope = c["ema_50"][-1] - c["ema_50"][-5]
         if ema_slope <= 0:
             logger.debug(
                 f"{self.symbol} → Rejected (EMA slope down: {ema_slope:.2f})"
@@ -66,7 +90,7 @@ class TradeFriendScanner:
             }
 
         # --------- SETUP 2: UPPER BAND EXPANSION ----------
-        vol_avg = volume.rolling(20).mean().iloc[-1]
+        vol_avg = last["vol_sma_20"]
         breakout = last["close"] > last["bb_upper"]
         vol_spike = last["volume"] > vol_avg * 1.3
 
@@ -1,6 +1,6 @@
 # core/TradeFriendSwingEntryPlanner.py
 
-import pandas as pd
+import numpy as np
 from datetime import datetime, timedelta
 import logging
 from db.TradeFriendSettingsRepo import TradeFriendSettingsRepo
@@ -17,7 +17,12 @@ class TradeFriendSwingEntryPlanner:
     - Pure logic class (NO DB writes, NO API calls)
     """
 
-    def __init__(self, df: pd.DataFrame, symbol: str, strategy: str):
+    # Every settings column build_plan() reads — the daily scan's
+    # carry-forward fingerprint hashes exactly these
+    SETTINGS_KEYS = ("target_sl_mode", "fixed_sl_percent", "fixed_target_percent")
+
+    def __init__(self, df, symbol: str, strategy: str):
+        # df: DataFrame or TradeFriendPanelView (columns read as arrays)
         self.df = df
         self.symbol = symbol
         self.strategy = strategy
@@ -66,8 +71,7 @@ class TradeFriendSwingEntryPlanner:
         """
         Default: breakout above previous candle high
         """
-        last = self.df.iloc[-1]
-        entry = float(last["high"])
+        entry = float(np.asarray(self.df["high"])[-1])
         logger.debug(f"{self.symbol} → Entry calculated: {entry}")
         return entry
 
@@ -81,7 +85,7 @@ class TradeFriendSwingEntryPlanner:
         logger.debug(f"{self.symbol} → SL mode: {mode}")
 
         if mode == "TRADITIONAL":
-            recent_lows = self.df["low"].tail(5)
+            recent_lows = np.asarray(self.df["low"])[-5:]
             sl = float(recent_lows.min())
             return sl
 
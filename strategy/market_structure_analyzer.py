@@ -1,4 +1,5 @@
 import os
+import numpy as np
 import pandas as pd
 import mplfinance as mpf
 from reportlab.lib.pagesizes import A4
@@ -9,6 +10,7 @@ import logging
 import matplotlib.pyplot as plt
 
 from utils.symbol_resolver import SymbolResolver
+from utils.rolling_kernels import swing_pivots
 
 logger = logging.getLogger(__name__)
 
@@ -28,17 +30,20 @@ class MarketStructureAnalyzer:
         return df
 
     def identify_structure(self, df):
-        """Simple pivot-based structure analysis"""
-        df['swing_high'] = (df['high'] > df['high'].shift(1)) & (df['high'] > df['high'].shift(-1))
-        df['swing_low'] = (df['low'] < df['low'].shift(1)) & (df['low'] < df['low'].shift(-1))
-        df['trend'] = None
-        trend = None
-        for i in range(2, len(df)):
-            if df['swing_high'].iloc[i]:
-                trend = 'down'
-            elif df['swing_low'].iloc[i]:
-                trend = 'up'
-            df.at[df.index[i], 'trend'] = trend
+        """Simple pivot-based structure analysis (vectorized)"""
+        swing_high, swing_low = swing_pivots(
+            df['high'].to_numpy(np.float64), df['low'].to_numpy(np.float64)
+        )
+        df['swing_high'] = swing_high
+        df['swing_low'] = swing_low
+
+        # Trend from bar 2 on = last pivot seen (swing high wins a tie):
+        # high → 'down', low → 'up', carried forward
+        event = np.where(swing_high, 1, np.where(swing_low, 2, 0))
+        event[:2] = 0
+        last_event = np.maximum.accumulate(np.where(event > 0, np.arange(len(event)), 0))
+        trend = np.array([None, 'down', 'up'], dtype=object)[event[last_event]]
+        df['trend'] = pd.Series(trend, index=df.index, dtype=object)
         return df
 
     def generate_chart(self, df):
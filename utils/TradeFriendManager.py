@@ -24,6 +24,13 @@ class TradeFriendManager:
         engine.run()
         logger.info("✅ TradeFriend Daily scan completed")
 
+    # ---------------- Rescan (subset) ----------------
+    def tf_rescan(self, symbols, force: bool = False):
+        logger.info(f"🎯 TradeFriend rescan started | symbols={list(symbols)} | force={force}")
+        result = WatchlistEngine().rescan(symbols, force=force)
+        logger.info("✅ TradeFriend rescan completed")
+        return result
+
     # ---------------- Morning Confirmation ----------------
     def tf_morning_confirm(self, capital: float, mode: str):
         logger.info(f"🚀 TradeFriend Morning confirmation started | Mode={mode}")
@@ -3,6 +3,7 @@ import os
 import json
 import pandas as pd
 from utils.logger import get_logger
+from utils.instrument_index import get_instrument_index
 from config.settings import MASTERDATA_DIR,OUTPUT_FOLDER
 import zipfile
 from datetime import datetime
@@ -45,13 +46,9 @@ def load_symbols_from_csv(folder_path: str):
 
     logger.info(f"Found {len(files)} CSV file(s) to process in {folder_path}")
 
-    # --- Load masterdata once for MyScreen files ---
-    master_file = os.path.join(MASTERDATA_DIR, "symbolnamemaster.json")
-    if not os.path.exists(master_file):
-        raise FileNotFoundError("symbolnamemaster.json missing in masterdata folder")
-
-    with open(master_file, "r") as f:
-        master_data = json.load(f)
+    # --- Shared name master index for MyScreen files (raises if missing) ---
+    index = get_instrument_index()
+    index.warm("names")
 
     all_symbols = set()  # ✅ ensures uniqueness
 
@@ -75,10 +72,7 @@ def load_symbols_from_csv(folder_path: str):
                 logger.info(f"Extracted {len(raw_names)} raw names from MyScreen file {file}")
 
                 for name in raw_names:
-                    match = next(
-                        (item for item in master_data if item["SEM_CUSTOM_SYMBOL"] == name),
-                        None
-                    )
+                    match = index.by_custom_name(name)
                     if match:
                         all_symbols.add(f"{match['SEM_TRADING_SYMBOL']}-EQ")
 
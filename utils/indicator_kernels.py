@@ -0,0 +1,259 @@
+"""
+================================================================================
+Module: indicator_kernels.py
+Description:
+    TA-Lib compatible indicator kernels on NumPy arrays.
+    Work on 1-D series or 2-D panels (symbols x bars, time on the last
+    axis); recurrences loop over bars only, every symbol advances in the
+    same vectorized step.
+    Sums accumulate bar by bar in TA-Lib's order, so the incremental
+    states in utils/indicator_state.py reproduce them bit for bit.
+Usage:
+    from utils.indicator_kernels import ema, rsi, bbands, adx, atr, sma, signed_volume
+================================================================================
+"""
+import numpy as np
+
+
+# TA-Lib's float "zero" tests
+def _is_zero(v):
+    return (v > -1e-8) & (v < 1e-8)
+
+
+def _as_2d(x):
+    arr = np.asarray(x, dtype=np.float64)
+    return arr[np.newaxis, :] if arr.ndim == 1 else arr
+
+
+def _shape_like(out, x):
+    return out[0] if np.ndim(x) == 1 else out
+
+
+def _seed_sum(x2, start: int, stop: int):
+    # Sequential (not pairwise) sum, as TA-Lib seeds its recurrences
+    total = np.zeros(x2.shape[0])
+    for t in range(start, stop):
+        total = total + x2[:, t]
+    return total
+
+
+# ================================================================================
+# MOVING AVERAGES
+# ================================================================================
+def sma(x, period: int):
+    """
+    Simple moving average (TA-Lib SMA, running total).
+    NaN for the first period-1 bars.
+    """
+    x2 = _as_2d(x)
+    n = x2.shape[-1]
+    out = np.full(x2.shape, np.nan)
+    if n < period:
+        return _shape_like(out, x)
+
+    total = _seed_sum(x2, 0, period - 1)
+    for t in range(period - 1, n):
+        total = total + x2[:, t]
+        out[:, t] = total / period
+        total = total - x2[:, t - period + 1]
+    return _shape_like(out, x)
+
+
+def ema(x, period: int):
+    """
+    Exponential moving average (TA-Lib EMA, SMA-seeded).
+    First value at bar period-1.
+    """
+    x2 = _as_2d(x)
+    n = x2.shape[-1]
+    out = np.full(x2.shape, np.nan)
+    if n < period:
+        return _shape_like(out, x)
+
+    k = 2.0 / (period + 1)
+    prev = _seed_sum(x2, 0, period) / period
+    out[:, period - 1] = prev
+    for t in range(period, n):
+        prev = ((x2[:, t] - prev) * k) + prev
+        out[:, t] = prev
+    return _shape_like(out, x)
+
+
+# ================================================================================
+# VOLUME
+# ================================================================================
+def signed_volume(open_, close, volume):
+    """
+    +volume on up bars (close > open), -volume otherwise.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    volume = np.asarray(volume, dtype=np.float64)
+    return np.where(close > np.asarray(open_, dtype=np.float64), volume, -volume)
+
+
+# ================================================================================
+# OSCILLATORS
+# ================================================================================
+def rsi(x, period: int = 14):
+    """
+    Wilder RSI (TA-Lib RSI). First value at bar `period`.
+    """
+    x2 = _as_2d(x)
+    n = x2.shape[-1]
+    out = np.full(x2.shape, np.nan)
+    if n <= period:
+        return _shape_like(out, x)
+
+    diff = np.diff(x2, axis=-1)
+    gains = np.where(diff > 0, diff, 0.0)
+    losses = np.where(diff < 0, -diff, 0.0)
+
+    avg_gain = _seed_sum(gains, 0, period) / period
+    avg_loss = _seed_sum(losses, 0, period) / period
+    out[:, period] = _rsi_value(avg_gain, avg_loss)
+
+    for t in range(period + 1, n):
+        avg_gain = (avg_gain * (period - 1) + gains[:, t - 1]) / period
+        avg_loss = (avg_loss * (period - 1) + losses[:, t - 1]) / period
+        out[:, t] = _rsi_value(avg_gain, avg_loss)
+    return _shape_like(out, x)
+
+
+def _rsi_value(avg_gain, avg_loss):
+    total = avg_gain + avg_loss
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(_is_zero(total), 0.0, 100.0 * (avg_gain / total))
+
+
+# ================================================================================
+# VOLATILITY
+# ================================================================================
+def bbands(x, period: int = 20, nbdevup: float = 2.0, nbdevdn: float = 2.0):
+    """
+    Bollinger Bands on an SMA (TA-Lib BBANDS, matype=0).
+    Returns (upper, middle, lower); population standard deviation
+    from running sum / sum-of-squares windows.
+    """
+    x2 = _as_2d(x)
+    shape = x2.shape
+    n = shape[-1]
+    upper = np.full(shape, np.nan)
+    middle = np.full(shape, np.nan)
+    lower = np.full(shape, np.nan)
+
+    if n >= period:
+        squares = x2 * x2
+        total = _seed_sum(x2, 0, period - 1)
+        total_sq = _seed_sum(squares, 0, period - 1)
+
+        for t in range(period - 1, n):
+            total = total + x2[:, t]
+            total_sq = total_sq + squares[:, t]
+
+            mean = total / period
+            std = _band_std(total_sq / period - mean * mean)
+            middle[:, t] = mean
+            upper[:, t] = mean + nbdevup * std
+            lower[:, t] = mean - nbdevdn * std
+
+            old = t - period + 1
+            total = total - x2[:, old]
+            total_sq = total_sq - squares[:, old]
+
+    return _shape_like(upper, x), _shape_like(middle, x), _shape_like(lower, x)
+
+
+def _band_std(variance):
+    # TA-Lib: zero-or-negative variance → 0
+    with np.errstate(invalid="ignore"):
+        return np.where(variance < 1e-8, 0.0, np.sqrt(np.maximum(variance, 0.0)))
+
+
+def true_range(high, low, close):
+    """
+    True range; bar 0 has no previous close → NaN (as in TA-Lib TRANGE).
+    """
+    h, l, c = _as_2d(high), _as_2d(low), _as_2d(close)
+    out = np.full(h.shape, np.nan)
+    if h.shape[-1] > 1:
+        prev_close = c[:, :-1]
+        out[:, 1:] = np.maximum.reduce([
+            h[:, 1:] - l[:, 1:],
+            np.abs(h[:, 1:] - prev_close),
+            np.abs(l[:, 1:] - prev_close),
+        ])
+    return _shape_like(out, high)
+
+
+def atr(high, low, close, period: int = 14):
+    """
+    Wilder average true range (TA-Lib ATR). First value at bar `period`.
+    """
+    tr = _as_2d(true_range(high, low, close))
+    n = tr.shape[-1]
+    out = np.full(tr.shape, np.nan)
+    if n <= period:
+        return _shape_like(out, high)
+
+    prev = _seed_sum(tr, 1, period + 1) / period
+    out[:, period] = prev
+    for t in range(period + 1, n):
+        prev = (prev * (period - 1) + tr[:, t]) / period
+        out[:, t] = prev
+    return _shape_like(out, high)
+
+
+# ================================================================================
+# TREND STRENGTH
+# ================================================================================
+def adx(high, low, close, period: int = 14):
+    """
+    Average directional index (TA-Lib ADX). First value at bar 2*period-1.
+    """
+    h, l = _as_2d(high), _as_2d(low)
+    n = h.shape[-1]
+    out = np.full(h.shape, np.nan)
+    if n < 2 * period:
+        return _shape_like(out, high)
+
+    tr = _as_2d(true_range(high, low, close))
+    diff_p = np.full(h.shape, np.nan)
+    diff_m = np.full(h.shape, np.nan)
+    diff_p[:, 1:] = h[:, 1:] - h[:, :-1]
+    diff_m[:, 1:] = l[:, :-1] - l[:, 1:]
+
+    minus_dm = np.where((diff_m > 0) & (diff_p < diff_m), diff_m, 0.0)
+    plus_dm = np.where(~((diff_m > 0) & (diff_p < diff_m)) & (diff_p > 0) & (diff_p > diff_m), diff_p, 0.0)
+
+    # Seed: plain sums over bars 1..period-1
+    prev_plus = plus_dm[:, 1:period].sum(axis=-1)
+    prev_minus = minus_dm[:, 1:period].sum(axis=-1)
+    prev_tr = tr[:, 1:period].sum(axis=-1)
+
+    def _step(t, prev_plus, prev_minus, prev_tr):
+        prev_plus = prev_plus - prev_plus / period + plus_dm[:, t]
+        prev_minus = prev_minus - prev_minus / period + minus_dm[:, t]
+        prev_tr = prev_tr - prev_tr / period + tr[:, t]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            plus_di = 100.0 * (prev_plus / prev_tr)
+            minus_di = 100.0 * (prev_minus / prev_tr)
+            di_sum = plus_di + minus_di
+            dx = 100.0 * (np.abs(minus_di - plus_di) / di_sum)
+        valid = ~_is_zero(prev_tr) & ~_is_zero(di_sum)
+        return prev_plus, prev_minus, prev_tr, dx, valid
+
+    # Next `period` bars: average DX → first ADX
+    sum_dx = np.zeros(h.shape[0])
+    for t in range(period, 2 * period):
+        prev_plus, prev_minus, prev_tr, dx, valid = _step(t, prev_plus, prev_minus, prev_tr)
+        sum_dx += np.where(valid, dx, 0.0)
+
+    prev_adx = sum_dx / period
+    out[:, 2 * period - 1] = prev_adx
+
+    for t in range(2 * period, n):
+        prev_plus, prev_minus, prev_tr, dx, valid = _step(t, prev_plus, prev_minus, prev_tr)
+        prev_adx = np.where(valid, (prev_adx * (period - 1) + dx) / period, prev_adx)
+        out[:, t] = prev_adx
+
+    return _shape_like(out, high)
@@ -0,0 +1,263 @@
+"""
+================================================================================
+Module: indicator_state.py
+Description:
+    O(1)-per-bar recurrence states for EMA, Wilder RSI, ATR, SMA and
+    Bollinger Bands. Each update performs the same float operations in
+    the same order as utils/indicator_kernels.py, so feeding a series
+    bar by bar gives exactly the kernel's full-recompute values.
+    States serialise to plain dicts for persistence.
+Usage:
+    from utils.indicator_state import make_state, state_from_dict
+================================================================================
+"""
+import math
+from collections import deque
+
+NAN = float("nan")
+
+
+# ================================================================================
+# BASE
+# ================================================================================
+class _IndicatorState:
+    """
+    PURPOSE:
+    - update(bar) consumes one CLOSED bar {open, high, low, close, volume}
+      and returns {output column: value} (NaN during warm-up)
+    - to_dict() / from_dict() round-trip every field exactly
+    """
+
+    kind = None
+    fields = ()
+
+    def to_dict(self) -> dict:
+        data = {"kind": self.kind}
+        for name in self.fields:
+            value = getattr(self, name)
+            data[name] = list(value) if isinstance(value, deque) else value
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        state = cls.__new__(cls)
+        for name in cls.fields:
+            setattr(state, name, data[name])
+        state._restore()
+        return state
+
+    def _restore(self):
+        pass
+
+    def copy(self):
+        return self.from_dict(self.to_dict())
+
+
+# ================================================================================
+# EMA (SMA-seeded)
+# ================================================================================
+class EmaState(_IndicatorState):
+    kind = "ema"
+    fields = ("name", "period", "source", "count", "total", "value")
+
+    def __init__(self, name: str, period: int, source: str = "close"):
+        self.name = name
+        self.period = period
+        self.source = source
+        self.count = 0
+        self.total = 0.0
+        self.value = NAN
+
+    def update(self, bar: dict) -> dict:
+        x = bar[self.source]
+        self.count += 1
+        if self.count < self.period:
+            self.total = self.total + x
+        elif self.count == self.period:
+            self.value = (self.total + x) / self.period
+        else:
+            k = 2.0 / (self.period + 1)
+            self.value = ((x - self.value) * k) + self.value
+        return {self.name: self.value}
+
+
+# ================================================================================
+# RSI (Wilder)
+# ================================================================================
+class RsiState(_IndicatorState):
+    kind = "rsi"
+    fields = ("name", "period", "prev_close", "count", "avg_gain", "avg_loss", "value")
+
+    def __init__(self, name: str, period: int = 14):
+        self.name = name
+        self.period = period
+        self.prev_close = None
+        self.count = 0            # price changes seen
+        self.avg_gain = 0.0       # running sums until the seed, averages after
+        self.avg_loss = 0.0
+        self.value = NAN
+
+    def update(self, bar: dict) -> dict:
+        close = bar["close"]
+        prev, self.prev_close = self.prev_close, close
+        if prev is None:
+            return {self.name: self.value}
+
+        diff = close - prev
+        gain = diff if diff > 0 else 0.0
+        loss = -diff if diff < 0 else 0.0
+        period = self.period
+
+        self.count += 1
+        if self.count < period:
+            self.avg_gain = self.avg_gain + gain
+            self.avg_loss = self.avg_loss + loss
+            return {self.name: self.value}
+
+        if self.count == period:
+            self.avg_gain = (self.avg_gain + gain) / period
+            self.avg_loss = (self.avg_loss + loss) / period
+        else:
+            self.avg_gain = (self.avg_gain * (period - 1) + gain) / period
+            self.avg_loss = (self.avg_loss * (period - 1) + loss) / period
+
+        total = self.avg_gain + self.avg_loss
+        self.value = 0.0 if -1e-8 < total < 1e-8 else 100.0 * (self.avg_gain / total)
+        return {self.name: self.value}
+
+
+# ================================================================================
+# ATR (Wilder)
+# ================================================================================
+class AtrState(_IndicatorState):
+    kind = "atr"
+    fields = ("name", "period", "prev_close", "count", "value")
+
+    def __init__(self, name: str, period: int = 14):
+        self.name = name
+        self.period = period
+        self.prev_close = None
+        self.count = 0            # true ranges seen
+        self.value = 0.0          # running TR sum until the seed
+
+    def update(self, bar: dict) -> dict:
+        prev, self.prev_close = self.prev_close, bar["close"]
+        if prev is None:
+            self.value = 0.0
+            return {self.name: NAN}
+
+        high, low = bar["high"], bar["low"]
+        tr = max(high - low, abs(high - prev), abs(low - prev))
+
+        self.count += 1
+        if self.count < self.period:
+            self.value = self.value + tr
+            return {self.name: NAN}
+        if self.count == self.period:
+            self.value = (self.value + tr) / self.period
+        else:
+            self.value = (self.value * (self.period - 1) + tr) / self.period
+        return {self.name: self.value}
+
+
+# ================================================================================
+# ROLLING WINDOWS (running sum / sum of squares)
+# ================================================================================
+class SmaState(_IndicatorState):
+    kind = "sma"
+    fields = ("name", "period", "source", "window", "total")
+
+    def __init__(self, name: str, period: int, source: str = "close"):
+        self.name = name
+        self.period = period
+        self.source = source
+        self.window = deque(maxlen=period)
+        self.total = 0.0
+
+    def _restore(self):
+        self.window = deque(self.window, maxlen=self.period)
+
+    def update(self, bar: dict) -> dict:
+        x = bar[self.source]
+        self.window.append(x)
+        self.total = self.total + x
+        if len(self.window) < self.period:
+            return {self.name: NAN}
+
+        value = self.total / self.period
+        # Oldest value leaves the window now; the next append evicts it
+        self.total = self.total - self.window[0]
+        return {self.name: value}
+
+
+class BbandsState(_IndicatorState):
+    kind = "bbands"
+    fields = ("name", "period", "nbdevup", "nbdevdn", "window", "total", "total_sq")
+
+    def __init__(self, name: str, period: int = 20, nbdevup: float = 2.0, nbdevdn: float = 2.0):
+        self.name = name
+        self.period = period
+        self.nbdevup = nbdevup
+        self.nbdevdn = nbdevdn
+        self.window = deque(maxlen=period)
+        self.total = 0.0
+        self.total_sq = 0.0
+
+    def _restore(self):
+        self.window = deque(self.window, maxlen=self.period)
+
+    def update(self, bar: dict) -> dict:
+        x = bar["close"]
+        self.window.append(x)
+        self.total = self.total + x
+        self.total_sq = self.total_sq + x * x
+        if len(self.window) < self.period:
+            return {f"{self.name}_upper": NAN, f"{self.name}_middle": NAN, f"{self.name}_lower": NAN}
+
+        mean = self.total / self.period
+        variance = self.total_sq / self.period - mean * mean
+        std = 0.0 if variance < 1e-8 else math.sqrt(variance)
+
+        old = self.window[0]
+        self.total = self.total - old
+        self.total_sq = self.total_sq - old * old
+
+        return {
+            f"{self.name}_upper": mean + self.nbdevup * std,
+            f"{self.name}_middle": mean,
+            f"{self.name}_lower": mean - self.nbdevdn * std,
+        }
+
+
+# ================================================================================
+# FACTORY
+# ================================================================================
+STATE_KINDS = {
+    "ema": EmaState,
+    "rsi": RsiState,
+    "atr": AtrState,
+    "sma": SmaState,
+    "bbands": BbandsState,
+}
+
+# Bar fields a state can read (derived columns need the full series)
+STATE_SOURCES = ("open", "high", "low", "close", "volume")
+
+
+def supports(kernel: str, params: dict = None) -> bool:
+    return kernel in STATE_KINDS and (params or {}).get("source", "close") in STATE_SOURCES
+
+
+def make_state(name: str, kernel: str, params: dict) -> _IndicatorState:
+    """
+    Panel-style spec (name, kernel, params) → fresh state.
+    """
+    if kernel in ("ema", "sma"):
+        return STATE_KINDS[kernel](name, params["period"], source=params.get("source", "close"))
+    if kernel == "bbands":
+        return BbandsState(name, params["period"], params.get("nbdevup", 2.0), params.get("nbdevdn", 2.0))
+    return STATE_KINDS[kernel](name, params["period"])
+
+
+def state_from_dict(data: dict) -> _IndicatorState:
+    return STATE_KINDS[data["kind"]].from_dict(data)
@@ -1,63 +1,93 @@
+import numpy as np
 import pandas as pd
-import talib
+
+from core.TradeFriendIndicatorCache import get_indicator_cache
+from core.TradeFriendIndicatorPlanner import need_name
+from utils.ohlcv import OHLCVSeries
+from utils.rolling_kernels import recent_max
 
 class IndicatorEngine:
-    def __init__(self, df, symbol):
-        self.df = df.copy()
+    def __init__(self, df, symbol, token=None):
+        # DataFrame or OHLCVSeries → array-backed series, never copied again
+        self.df = OHLCVSeries.coerce(df)
         self.symbol = symbol
+        # Shared memo: RSI / EMA / bands computed once per symbol per bar
+        self.ind = get_indicator_cache().series(token or symbol, self.df)
+
+    def _need(self, bars, compute, kernel, **params):
+        """
+        Column precomputed by the indicator planner (shared frame),
+        else computed through the cache.
+        """
+        name = need_name(kernel, **params)
+        if name in bars:
+            return bars[name]
+        return compute()
+
+    def _need_bbands(self, bars, period, nbdevup=2.0, nbdevdn=2.0):
+        name = need_name("bbands", period=period, nbdevup=nbdevup, nbdevdn=nbdevdn)
+        if f"{name}_middle" in bars:
+            return tuple(bars[f"{name}_{part}"] for part in ("upper", "middle", "lower"))
+        return self.ind.bbands(period, nbdevup, nbdevdn)
+
+    def _recent_cross(self, ema_short, ema_long, lookback):
+        """
+        Bars ago (1 = last bar) of the latest short-over-long cross, or None.
+        """
+        for i in range(1, lookback + 1):
+            if ema_short[-i] > ema_long[-i] and ema_short[-i - 1] <= ema_long[-i - 1]:
+                return i
+        return None
 
     # ---------------------------
     # EMA Crossover Check
     # ---------------------------
     def check_ema_crossover(self, EMA_SHORT=20, EMA_LONG=50, RSI_PERIOD=14,
                             VOL_PERIOD=20, CANDLES_ABOVE=3, CROSS_LOOKBACK=5, PIVOT_LOOKBACK=20):
-        df = self.df.copy()
-        for col in ["close", "open", "high", "low", "volume"]:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors="coerce")
-        if df.empty or "close" not in df.columns:
+        bars = self.df
+        if bars.empty or "close" not in bars:
             return {"symbol": self.symbol, "reason": "No data or missing close column"}
 
-        # Indicators
-        close = df["close"].values
-        df["ema_short"] = talib.EMA(close, timeperiod=EMA_SHORT)
-        df["ema_long"] = talib.EMA(close, timeperiod=EMA_LONG)
-        df["rsi"] = talib.RSI(close, timeperiod=RSI_PERIOD)
-        df["signed_vol"] = df.apply(lambda row: row["volume"] if row["close"] > row["open"] else -row["volume"], axis=1)
-        df["signed_vol_avg"] = df["signed_vol"].rolling(window=VOL_PERIOD).mean()
-        df["vol_avg"] = df["signed_vol_avg"]
+        # Indicators (column arrays, no frame copies)
+        c = {
+            "close": bars["close"],
+            "volume": bars["volume"],
+            "ema_short": self._need(bars, lambda: self.ind.ema(EMA_SHORT), "ema", period=EMA_SHORT),
+            "ema_long": self._need(bars, lambda: self.ind.ema(EMA_LONG), "ema", period=EMA_LONG),
+            "rsi": self._need(bars, lambda: self.ind.rsi(RSI_PERIOD), "rsi", period=RSI_PERIOD),
+            "signed_vol": self._need(bars, self.ind.signed_volume, "signed_volume"),
+        }
+        c["signed_vol_avg"] = self._need(
+            bars, lambda: self.ind.sma(VOL_PERIOD, source="signed_volume"),
+            "sma", period=VOL_PERIOD, source="signed_volume"
+        )
+        c["vol_avg"] = c["signed_vol_avg"]
 
         # Recent crossover
         # Sanity check
         min_rows = max(EMA_LONG, VOL_PERIOD, CANDLES_ABOVE, PIVOT_LOOKBACK) + 5
-        if len(df) < min_rows:
+        if len(bars) < min_rows:
             return {"symbol": self.symbol, "reason": f"Insufficient data (< {min_rows} rows)"}
 
-        last = df.iloc[-1]
-        prev = df.iloc[-2]
-        recent = df.tail(CANDLES_ABOVE)
+        last = {name: values[-1] for name, values in c.items()}
 
         # --- Recent crossover logic ---
-        cross_idx = None
-        for i in range(1, CROSS_LOOKBACK + 1):
-            if (df["ema_short"].iloc[-i] > df["ema_long"].iloc[-i]) and \
-               (df["ema_short"].iloc[-i-1] <= df["ema_long"].iloc[-i-1]):
-                cross_idx = i
-                break
+        cross_idx = self._recent_cross(c["ema_short"], c["ema_long"], CROSS_LOOKBACK)
         recent_cross = cross_idx is not None
 
         # Count how many recent closes are above EMA_LONG
-        count_above = (recent["close"] > recent["ema_long"]).sum()
-        closes_above_long = count_above >= len(recent) / 2  # at least half
+        count_above = np.count_nonzero(c["close"][-CANDLES_ABOVE:] > c["ema_long"][-CANDLES_ABOVE:])
+        closes_above_long = count_above >= CANDLES_ABOVE / 2  # at least half
 
         rsi_curr = last["rsi"]
         rsi_ok = not pd.isna(rsi_curr) and rsi_curr < 85
 
         # --- Pivot Calculation (using previous candle) ---
-        if {"high", "low", "close"}.issubset(df.columns):
-            prev_high = float(prev["high"])
-            prev_low = float(prev["low"])
-            prev_close = float(prev["close"])
+        if all(f in bars for f in ("high", "low", "close")):
+            prev_high = float(bars["high"][-2])
+            prev_low = float(bars["low"][-2])
+            prev_close = float(bars["close"][-2])
+
 
             # Classic Pivot
             pivot_classic = (prev_high + prev_low + prev_close) / 3
@@ -91,7 +121,7 @@ class IndicatorEngine:
             if last["signed_vol"] <= 0:
                 return {
                     "symbol": self.symbol,
-                    "date": str(last.name) if hasattr(last, "name") else str(last.get("date", "")),
+                    "date": bars.label(-1),
                     "close": self.safe_number(entry_price),
                     "ema_short": self.safe_number(last["ema_short"]),
                     "ema_long": self.safe_number(last["ema_long"]),
@@ -119,14 +149,14 @@ class IndicatorEngine:
 
             # --- Adaptive Targets ---
             try:
-                targets, note = self.calculate_targets(df, last, entry_price)
+                targets, note = self.calculate_targets(bars, entry_price)
                 if not targets or len(targets) < 3:
                     raise ValueError("Target calculation failed")
                 target1, target2, target3 = targets[:3]
             except Exception as e:
                 return {"symbol": self.symbol, "reason": f"Target calculation error: {e}"}
 
-            date_str = str(last.name) if hasattr(last, "name") else str(last.get("date", ""))
+            date_str = bars.label(-1)
 
             return {
         "symbol": self.symbol,
@@ -168,7 +198,7 @@ class IndicatorEngine:
         "note": note,
     }   
       
-        reason = self.build_rejection_reason( df, last, prev, recent, CROSS_LOOKBACK)
+        reason = self.build_rejection_reason(c, CANDLES_ABOVE, CROSS_LOOKBACK)
         return {"symbol": self.symbol, "reason": reason or "Conditions not met"}
 
     # ---------------------------
@@ -210,50 +240,43 @@ class IndicatorEngine:
     #         return {"symbol": self.symbol, "signal": "No Bollinger Signal"}
 
     def bollinger_momentum(self, period=30, stddev=2):
-        df = self.df.copy()
+        bars = self.df
     
         # 1. Basic Validation
-        if df.empty or len(df) < 50 or "close" not in df.columns:
+        if bars.empty or len(bars) < 50 or "close" not in bars:
             return {"symbol": self.symbol, "signal": "No Bollinger Signal"}
     
-        close = df["close"].values.astype(float)
-        
-        high = df["high"].values.astype(float)
-        low = df["low"].values.astype(float)
-        volume = df["volume"].values.astype(float)
-    
-        # 2. Indicator Calculation
-        df["bb_upper"], df["bb_middle"], df["bb_lower"] = talib.BBANDS(
-            close, timeperiod=period, nbdevup=stddev, nbdevdn=stddev, matype=0
-        )
-        df["rsi"] = talib.RSI(close, timeperiod=14)
-        df["adx"] = talib.ADX(high, low, close, timeperiod=14)
-        df["vol_sma"] = talib.SMA(volume, timeperiod=20)
+        # 2. Indicator Calculation (shared cache)
+        bb_upper, bb_middle, bb_lower = self._need_bbands(bars, period, stddev, stddev)
+        rsi = self._need(bars, lambda: self.ind.rsi(14), "rsi", period=14)
+        adx = self._need(bars, lambda: self.ind.adx(14), "adx", period=14)
+        vol_sma = self._need(bars, lambda: self.ind.sma(20, source="volume"),
+                             "sma", period=20, source="volume")
     
-        last = df.iloc[-1]
-        recent = df.iloc[-5:]
+        close = bars["close"][-1]
+        recent_low = bars["low"][-5:].min()
     
         # 3. Swing-tuned Conditions (BB Middle based)
     
         # Trend intact
-        above_middle = last["close"] > last["bb_middle"]
+        above_middle = close > bb_middle[-1]
     
         # Healthy pullback near middle band
-        pullback = recent["low"].min() <= last["bb_middle"] * 1.01
+        pullback = recent_low <= bb_middle[-1] * 1.01
     
         # Momentum & participation
-        is_strong_trend = last["adx"] >= 20
-        is_healthy_rsi = last["rsi"] > 55
-        is_decent_volume = last["volume"] >= last["vol_sma"] * 0.9
+        is_strong_trend = adx[-1] >= 20
+        is_healthy_rsi = rsi[-1] > 55
+        is_decent_volume = bars["volume"][-1] >= vol_sma[-1] * 0.9
     
         # 4. Entry Signal
         if above_middle and pullback and is_strong_trend and is_healthy_rsi and is_decent_volume:
         
-            entry = self.safe_number(round(last["close"], 2))
+            entry = self.safe_number(round(close, 2))
     
             # Swing-safe Stop Loss
             sl = self.safe_number(round(
-                min(recent["low"].min(), last["bb_lower"]), 2
+                min(recent_low, bb_lower[-1]), 2
             ))
     
             risk = entry - sl
@@ -282,31 +305,31 @@ class IndicatorEngine:
     # ---------------------------
     # Target Calculation
     # ---------------------------
-    def calculate_targets(self, df, last, entry_price, swing_short=30, swing_long=90):
+    def calculate_targets(self, bars, entry_price, swing_short=30, swing_long=90):
         valid_targets = []
         note = ""
 
         # Target 1 → Previous candle high
-        prev_high = float(df.iloc[-2]["high"]) if len(df) > 1 and "high" in df.columns else None
+        prev_high = float(bars["high"][-2]) if len(bars) > 1 and "high" in bars else None
         if prev_high and prev_high > entry_price:
             valid_targets.append(prev_high)
 
         # Filter bullish + strong volume candles
-        if {"open", "close", "volume", "high"}.issubset(df.columns):
-            avg_vol = df["volume"].mean()
-            bullish_df = df[(df["close"] > df["open"]) & (df["volume"] > avg_vol)]
+        high = bars["high"]
+        if all(f in bars for f in ("open", "close", "volume", "high")):
+            volume = bars["volume"]
+            avg_vol = np.nanmean(volume)
+            bullish_high = high[(bars["close"] > bars["open"]) & (volume > avg_vol)]
         else:
-            bullish_df = df.copy()
+            bullish_high = high
 
         # Target 2 → Recent swing high (lookback 30 bullish candles)
-        if not bullish_df.empty:
-            t2 = bullish_df.tail(swing_short)["high"].max()
+        # Target 3 → Bigger swing high (lookback 90 bullish candles)
+        # Both from one reversed running-max pass
+        if len(bullish_high):
+            t2, t3 = recent_max(bullish_high, (swing_short, swing_long))
             if t2 > entry_price:
                 valid_targets.append(t2)
-
-        # Target 3 → Bigger swing high (lookback 90 bullish candles)
-        if not bullish_df.empty:
-            t3 = bullish_df.tail(swing_long)["high"].max()
             if t3 > entry_price:
                 valid_targets.append(t3)
 
@@ -334,25 +357,23 @@ class IndicatorEngine:
     # ---------------------------
     # Build Rejection Reason
     # ---------------------------
-    def build_rejection_reason(self, df, last, prev, recent, CROSS_LOOKBACK=5):
+    def build_rejection_reason(self, c, recent=3, CROSS_LOOKBACK=5):
+        """
+        c: {close, volume, ema_short, ema_long, rsi, vol_avg} arrays
+        recent: number of latest candles that must close above EMA_LONG
+        """
         reasons = []
         # EMA crossover check
-        cross_found = False
-        for i in range(1, CROSS_LOOKBACK + 1):
-            if (df["ema_short"].iloc[-i] > df["ema_long"].iloc[-i]) and \
-               (df["ema_short"].iloc[-i-1] <= df["ema_long"].iloc[-i-1]):
-                cross_found = True
-                break
-        if not cross_found:
+        if self._recent_cross(c["ema_short"], c["ema_long"], CROSS_LOOKBACK) is None:
             reasons.append(f"No recent EMA crossover (last {CROSS_LOOKBACK} candles)")
 
         # Close vs EMA_LONG
-        if not all(recent["close"] > recent["ema_long"]):
-            reasons.append(f"Not all last {len(recent)} closes above EMA_LONG")
+        if not np.all(c["close"][-recent:] > c["ema_long"][-recent:]):
+            reasons.append(f"Not all last {recent} closes above EMA_LONG")
 
         # RSI check
-        rsi_curr = last["rsi"]
-        rsi_prev = df.iloc[-2]["rsi"] if not pd.isna(df.iloc[-2]["rsi"]) else None
+        rsi_curr = c["rsi"][-1]
+        rsi_prev = c["rsi"][-2] if not pd.isna(c["rsi"][-2]) else None
         if pd.isna(rsi_curr):
             reasons.append("RSI not available")
         else:
@@ -362,7 +383,7 @@ class IndicatorEngine:
                 reasons.append(f"RSI losing momentum (falling from {rsi_prev:.2f} to {rsi_curr:.2f})")
 
         # Volume check
-        if last["volume"] <= last["vol_avg"]:
+        if c["volume"][-1] <= c["vol_avg"][-1]:
             reasons.append("Volume not supportive")
 
         return f"{self.symbol} → " + "; ".join(reasons) if reasons else None
@@ -484,37 +505,32 @@ Special Note: {sig.get('note', '')}
         TRADITIONAL MID-BAND TO UPPER-BAND TARGET
         Logic: Buy when price crosses above the middle band with a Bullish Engulfing.
         """
-        df = self.df.copy()
-        if df.empty or len(df) < 50:
+        bars = self.df
+        if bars.empty or len(bars) < 50:
             return None
     
-        # Fix: Ensure float64 for TA-Lib compatibility
-        close = df["close"].values.astype(float)
-        open_p = df["open"].values.astype(float)
-    
-        # Indicators
-        df["bb_upper"], df["bb_middle"], df["bb_lower"] = talib.BBANDS(close, timeperiod=period)
-        df["ema_50"] = talib.EMA(close, timeperiod=50)
+        # Indicators (shared frame / cache)
+        bb_upper, bb_middle, _ = self._need_bbands(bars, period)
+        ema_50 = self._need(bars, lambda: self.ind.ema(50), "ema", period=50)
         
-        last = df.iloc[-1]
-        prev = df.iloc[-2]
+        close, open_ = bars["close"], bars["open"]
     
         # 1. Trigger: Middle Band Breakout (Price crosses from below to above)
-        crossed_mid = prev["close"] <= prev["bb_middle"] and last["close"] > last["bb_middle"]
+        crossed_mid = close[-2] <= bb_middle[-2] and close[-1] > bb_middle[-1]
         
         # 2. Pattern: Bullish Engulfing (Current Green engulfs Previous Red)
-        is_engulfing = (last["close"] > last["open"] and 
-                        prev["close"] < prev["open"] and 
-                        last["close"] >= prev["open"] and 
-                        last["open"] <= prev["close"])
+        is_engulfing = (close[-1] > open_[-1] and 
+                        close[-2] < open_[-2] and 
+                        close[-1] >= open_[-2] and 
+                        open_[-1] <= close[-2])
         
         # 3. Filter: EMA 50 Slope (Ensures we are not in a downtrend)
-        is_uptrend = last["ema_50"] > df["ema_50"].iloc[-5]
+        is_uptrend = ema_50[-1] > ema_50[-5]
     
         if crossed_mid and is_engulfing and is_uptrend:
-            entry = self.safe_number(round(last["close"], 2))
-            target = self.safe_number(round(last["bb_upper"], 2))
-            sl = self.safe_number(round(last["bb_middle"] * 0.98, 2)) # 2% buffer below MA
+            entry = self.safe_number(round(close[-1], 2))
+            target = self.safe_number(round(bb_upper[-1], 2))
+            sl = self.safe_number(round(bb_middle[-1] * 0.98, 2)) # 2% buffer below MA
     
             return {
                 "symbol": self.symbol,
@@ -533,23 +549,22 @@ Special Note: {sig.get('note', '')}
         MULTI-STRATEGY SCANNER
         Logic: Detects either a 'Support Rebound' (Dip Buy) or 'Upper Breakout' (Momentum).
         """
-        df = self.df.copy()
-        if df.empty or len(df) < 50:
+        bars = self.df
+        if bars.empty or len(bars) < 50:
             return None
     
-        close = df["close"].values.astype(float)
-        volume = df["volume"].values.astype(float)
-    
-        # Indicators
-        df["bb_upper"], df["bb_middle"], df["bb_lower"] = talib.BBANDS(close, timeperiod=period)
-        df["rsi"] = talib.RSI(close, timeperiod=14)
-        df["ema_50"] = talib.EMA(close, timeperiod=50)
-        vol_sma = talib.SMA(volume, timeperiod=20)
+        # Indicators (shared frame / cache)
+        bb_upper, bb_middle, _ = self._need_bbands(bars, period)
+        rsi = self._need(bars, lambda: self.ind.rsi(14), "rsi", period=14)
+        ema_50 = self._need(bars, lambda: self.ind.ema(50), "ema", period=50)
+        vol_sma = self._need(bars, lambda: self.ind.sma(20, source="volume"),
+                             "sma", period=20, source="volume")
         
-        last = df.iloc[-1]
+        last = {f: bars[f][-1] for f in ("open", "high", "low", "close", "volume")}
+        last.update(bb_upper=bb_upper[-1], bb_middle=bb_middle[-1], rsi=rsi[-1])
         
         # Global Trend Filter: Avoid stocks in a long-term decline
-        if last["ema_50"] <= df["ema_50"].iloc[-5]:
+        if ema_50[-1] <= ema_50[-5]:
             return None
     
         # --- SETUP 1: SUPPORT REBOUND (Safe Value Entry) ---
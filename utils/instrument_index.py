@@ -0,0 +1,299 @@
+"""
+================================================================================
+Module: instrument_index.py
+Description:
+    Process-wide, lazily loaded index over the instrument masters
+    (NSEEQTYdata.json, symbolnamemaster.json)
+    with O(1) lookups by trading symbol, token, name and custom name.
+Usage:
+    from utils.instrument_index import get_instrument_index
+================================================================================
+"""
+import os
+import json
+import time
+import threading
+
+from utils.logger import get_logger
+from utils.symbol_search_index import TradeFriendSymbolSearchIndex
+from config.settings import NSE_EQTY_FILE, SYMBOL_NAME_MASTER_FILE
+from db.TradeFriendInstrumentSnapshot import (
+    TradeFriendInstrumentSnapshot, SOURCES as SNAPSHOT_SOURCES, source_signature
+)
+
+logger = get_logger(__name__)
+
+NAME_MASTER_FILE = SYMBOL_NAME_MASTER_FILE
+
+# Source freshness is re-checked at most this often (seconds)
+MTIME_CHECK_SEC = 5
+
+# ------------------------------------------------------------------------
+# Singleton Index Holder
+# ------------------------------------------------------------------------
+_index = None
+_index_lock = threading.Lock()
+
+
+# ================================================================================
+# TABLE BUILDERS
+# ================================================================================
+def _build_nse(rows) -> dict:
+    """
+    NSEEQTYdata.json → {by_symbol, by_token, by_name}
+    """
+    by_symbol, by_token, by_name = {}, {}, {}
+    for row in rows:
+        symbol = row.get("symbol")
+        if not symbol:
+            continue
+        by_symbol.setdefault(symbol, row)
+        if row.get("token") is not None:
+            by_token.setdefault(str(row["token"]), row)
+        name = (row.get("name") or symbol.rsplit("-", 1)[0]).upper()
+        # Prefer the -EQ series when a name has several
+        if name not in by_name or symbol.endswith("-EQ"):
+            by_name[name] = row
+    return {"by_symbol": by_symbol, "by_token": by_token, "by_name": by_name}
+
+
+def _build_names(rows) -> dict:
+    """
+    symbolnamemaster.json → {by_custom, by_trading, custom_names}
+    """
+    by_custom, by_trading, custom_names = {}, {}, []
+    for row in rows:
+        custom = row.get("SEM_CUSTOM_SYMBOL")
+        trading = row.get("SEM_TRADING_SYMBOL")
+        if not custom or not trading:
+            continue
+        key = custom.lower()
+        if key not in by_custom:
+            by_custom[key] = row
+            custom_names.append((key, custom))
+        by_trading.setdefault(trading.upper(), row)
+    return {"by_custom": by_custom, "by_trading": by_trading, "custom_names": tuple(custom_names)}
+
+
+# ================================================================================
+# CLASS: TradeFriendInstrumentIndex
+# ================================================================================
+class TradeFriendInstrumentIndex:
+    """
+    PURPOSE:
+    - ONE in-memory copy of each instrument table per process
+    - Loaded on first use from the compiled instrument snapshot
+      (db/TradeFriendInstrumentSnapshot), which is rebuilt whenever a
+      master file changes; falls back to parsing the
+      JSON masters if the snapshot cannot be written
+    - Tables are built off to the side and swapped in whole, so
+      readers never see a half-built index (no lock on reads)
+
+    TABLES:
+    - nse       : by_symbol ('SBIN-EQ'), by_token ('3045'), by_name ('SBIN')
+    - names     : by_custom (lower-cased SEM_CUSTOM_SYMBOL), by_trading
+    """
+
+    def __init__(self, nse_file: str = NSE_EQTY_FILE, name_file: str = NAME_MASTER_FILE,
+                 snapshot: TradeFriendInstrumentSnapshot = None):
+        self._files = {"nse": nse_file, "names": name_file}
+        self._builders = {
+            "nse": _build_nse,
+            "names": _build_names,
+        }
+        if snapshot is None:
+            sources = dict(SNAPSHOT_SOURCES, nse=nse_file, names=name_file)
+            snapshot = TradeFriendInstrumentSnapshot(sources=sources)
+        self.snapshot = snapshot
+
+        self._tables = {}          # kind -> table dict
+        self._generation = None    # snapshot mtime, or JSON signatures in fallback
+        self._from_snapshot = False
+        self._checked_at = 0.0     # monotonic ts of last freshness check
+        self._lock = threading.Lock()
+
+    # --------------------------------------------------
+    # LOADING
+    # --------------------------------------------------
+    def _table(self, kind: str) -> dict:
+        table = self._tables.get(kind)
+        if table is not None and time.monotonic() - self._checked_at < MTIME_CHECK_SEC:
+            return table
+
+        with self._lock:
+            self._check_generation()
+            table = self._tables.get(kind)
+            if table is None:
+                started = time.perf_counter()
+                rows = self._rows(kind)
+                table = self._builders[kind](rows)
+                self._tables[kind] = table
+                logger.info(
+                    f"📇 Instrument index built | {kind} | {len(rows)} rows | "
+                    f"{'snapshot' if self._from_snapshot else 'json'} | "
+                    f"{(time.perf_counter() - started) * 1000:.0f} ms"
+                )
+        return table
+
+    def _check_generation(self):
+        now = time.monotonic()
+        if self._tables and now - self._checked_at < MTIME_CHECK_SEC:
+            return
+
+        try:
+            generation = self.snapshot.ensure()
+        except Exception as e:
+            logger.warning(f"⚠️ Instrument snapshot unavailable, reading JSON | {e}")
+            generation = None
+
+        self._from_snapshot = generation is not None
+        if generation is None:
+            generation = tuple(source_signature(path) for path in self._files.values())
+
+        if generation != self._generation:
+            # Sources changed → every table is rebuilt on next use
+            self._tables = {}
+            self._generation = generation
+        self._checked_at = now
+
+    def _rows(self, kind: str) -> list:
+        if self._from_snapshot:
+            if not self.snapshot.has_source(kind):
+                raise FileNotFoundError(
+                    f"{os.path.basename(self._files[kind])} missing in masterdata folder"
+                )
+            return self.snapshot.load(kind)
+
+        path = self._files[kind]
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"{os.path.basename(path)} missing in masterdata folder")
+        with open(path, "r") as f:
+            return json.load(f)
+
+    def warm(self, *kinds):
+        """
+        Load the given tables now (default: NSE + name masters).
+        Raises FileNotFoundError when a master file is missing.
+        """
+        for kind in kinds or tuple(self._files):
+            self._table(kind)
+
+    def invalidate(self, kind: str = None):
+        with self._lock:
+            if kind:
+                self._tables.pop(kind, None)
+            else:
+                self._tables = {}
+                self._generation = None
+            self._checked_at = 0.0
+
+    # --------------------------------------------------
+    # NSE MASTER LOOKUPS
+    # --------------------------------------------------
+    def by_symbol(self, trading_symbol: str):
+        if not trading_symbol:
+            return None
+        return self._table("nse")["by_symbol"].get(trading_symbol)
+
+    def by_token(self, token):
+        if token is None:
+            return None
+        return self._table("nse")["by_token"].get(str(token))
+
+    def by_name(self, name: str):
+        if not name:
+            return None
+        return self._table("nse")["by_name"].get(name.upper())
+
+    def resolve(self, symbol: str):
+        """
+        'SBIN' / 'SBIN-EQ' → {symbol, token, exchange} or None.
+        """
+        if not symbol:
+            return None
+        symbol_eq = symbol if symbol.endswith("-EQ") else f"{symbol}-EQ"
+        row = self.by_symbol(symbol_eq)
+        if row is None:
+            return None
+        return {
+            "symbol": symbol_eq,
+            "token": row["token"],
+            "exchange": row.get("exch_seg") or "NSE",
+        }
+
+    # --------------------------------------------------
+    # NAME MASTER LOOKUPS
+    # --------------------------------------------------
+    def by_custom_name(self, custom_name: str, partial: bool = False):
+        """
+        SEM_CUSTOM_SYMBOL → master row (case-insensitive).
+        partial=True falls back to the best-ranked name containing it.
+        """
+        if not custom_name:
+            return None
+        row = self._table("names")["by_custom"].get(custom_name.lower())
+        if row is None and partial:
+            row = self._search("names").best(custom_name)
+        return row
+
+    def by_trading_name(self, trading_symbol: str):
+        """
+        SEM_TRADING_SYMBOL ('SBIN', no suffix) → master row.
+        """
+        if not trading_symbol:
+            return None
+        return self._table("names")["by_trading"].get(trading_symbol.upper())
+
+    def search_custom(self, query: str, limit: int = 20) -> list:
+        """
+        Ranked SEM_CUSTOM_SYMBOLs containing query (autocomplete).
+        """
+        if not query:
+            return []
+        return self._search("names").search(query, limit)
+
+    # --------------------------------------------------
+    # SEARCH (trigram / prefix, built on first use per table)
+    # --------------------------------------------------
+    def search_symbols(self, query: str, limit: int = 20) -> list:
+        """
+        Ranked NSE trading symbols ('SBIN-EQ') containing query.
+        """
+        if not query:
+            return []
+        return self._search("nse").search(query, limit)
+
+    def _search(self, kind: str) -> TradeFriendSymbolSearchIndex:
+        # Stored inside the table → dropped with it when sources change
+        table = self._table(kind)
+        search = table.get("search")
+        if search is None:
+            if kind == "names":
+                labels = [original for _, original in table["custom_names"]]
+                payloads = [table["by_custom"][key] for key, _ in table["custom_names"]]
+            else:
+                labels = list(table["by_symbol"])
+                payloads = list(table["by_symbol"].values())
+            search = table["search"] = TradeFriendSymbolSearchIndex(labels, payloads)
+        return search
+
+    # --------------------------------------------------
+    # REPORT
+    # --------------------------------------------------
+    def stats(self) -> dict:
+        nse = self._tables.get("nse")
+        names = self._tables.get("names")
+        return {
+            "nse_symbols": len(nse["by_symbol"]) if nse else 0,
+            "custom_names": len(names["by_custom"]) if names else 0,
+            "source": "snapshot" if self._from_snapshot else "json",
+        }
+
+
+def get_instrument_index() -> TradeFriendInstrumentIndex:
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = TradeFriendInstrumentIndex()
+    return _index
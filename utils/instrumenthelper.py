@@ -1,17 +1,16 @@
 # instrument_helper.py
 
 import time
-import random
 import json
 import sqlite3
 from brokers.angel_client import AngelClient
+from brokers.tradefriend_circuit_breaker import backoff_delay
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
 MAX_RETRIES = 3
-BASE_DELAY = 0.6    # seconds (Angel safe)
-JITTER = 0.25       # random jitter
+BASE_DELAY = 0.6    # seconds (Angel safe), doubled per attempt + jitter
 
 
 class InstrumentHelper:
@@ -52,7 +51,7 @@ class InstrumentHelper:
         """
         Angel API safe search with:
         - input normalization
-        - rate limiting
+        - rate limiting (shared limiter)
         - retry + backoff
         - JSON safety
         """
@@ -69,9 +68,7 @@ class InstrumentHelper:
 
         for attempt in range(1, MAX_RETRIES + 1):
             try:
-                # ⏳ Throttle
-                time.sleep(BASE_DELAY + random.uniform(0, JITTER))
-
+                # ⏳ Pacing → shared rate limiter (AngelClient.search_symbol)
                 logger.info(f"Searching symbol {symbol} in Angel API...")
 
                 result = self.broker.search_symbol(exchange, symbol)
@@ -103,8 +100,8 @@ class InstrumentHelper:
                     f"(Attempt {attempt}/{MAX_RETRIES}): {e}"
                 )
 
-                # ⏳ Exponential backoff
-                time.sleep((BASE_DELAY * attempt) + random.uniform(0, JITTER))
+                # ⏳ Exponential backoff (full jitter)
+                time.sleep(backoff_delay(attempt, base=BASE_DELAY))
 
         logger.error(f"Search failed permanently for {symbol}")
         return {}
@@ -0,0 +1,174 @@
+"""
+================================================================================
+Module: ohlcv.py
+Description:
+    Compact array-backed OHLCV series for the hot paths (scanners,
+    strategies, data provider). Columns are contiguous float64 NumPy
+    arrays; slicing (tail / window / [a:b]) returns views, never copies.
+    Converts to pandas only when a report asks for it.
+Usage:
+    from utils.ohlcv import OHLCVSeries
+    bars = OHLCVSeries.coerce(df)
+    bars["close"][-1], bars.tail(20)["high"].max(), bars.to_frame()
+================================================================================
+"""
+import numpy as np
+import pandas as pd
+
+PRICE_FIELDS = ("open", "high", "low", "close", "volume")
+
+
+class OHLCVSeries:
+    """
+    PURPOSE:
+    - One symbol's bars as NumPy columns + an index (timestamps)
+    - DataFrame-like reads: bars["close"], "rsi" in bars, len(bars),
+      bars.empty, bars.columns, bars.index
+    - Extra columns (precomputed indicators) ride along in `extra`
+    - Instances are cheap views: slicing shares the parent's memory,
+      so callers must treat columns as read-only
+    """
+
+    __slots__ = ("index", "open", "high", "low", "close", "volume", "extra")
+
+    def __init__(self, open=None, high=None, low=None, close=None, volume=None,
+                 index=None, extra: dict = None):
+        self.open = _column(open)
+        self.high = _column(high)
+        self.low = _column(low)
+        self.close = _column(close)
+        self.volume = _column(volume)
+        self.index = index if index is None or isinstance(index, pd.Index) else pd.Index(index)
+        self.extra = {name: _column(values) for name, values in (extra or {}).items()}
+
+    # ==================================================
+    # BUILD
+    # ==================================================
+    @classmethod
+    def coerce(cls, data) -> "OHLCVSeries":
+        """
+        OHLCVSeries as-is, DataFrame → series (no copy for float64 columns).
+        """
+        if isinstance(data, cls):
+            return data
+        return cls.from_frame(data)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "OHLCVSeries":
+        """
+        Every numeric-convertible column is kept; OHLCV go to slots,
+        the rest (indicator columns) to `extra`. Index kept as-is.
+        """
+        columns = {}
+        for name in df.columns:
+            values = df[name]
+            if values.dtype.kind not in "fiub":
+                if values.dtype.kind == "M" or name in ("date", "datetime", "timestamp"):
+                    continue
+                values = pd.to_numeric(values, errors="coerce")
+            columns[name] = values.to_numpy(dtype=np.float64, copy=False)
+
+        prices = {f: columns.pop(f, None) for f in PRICE_FIELDS}
+        return cls(index=df.index, extra=columns, **prices)
+
+    @classmethod
+    def from_arrays(cls, cols: dict) -> "OHLCVSeries":
+        """
+        TradeFriendCandleArrayStore.get() result ({field: view, ts: epoch
+        seconds}) → series sharing the memory-mapped columns.
+        """
+        index = pd.DatetimeIndex(pd.to_datetime(np.asarray(cols["ts"]), unit="s"), name="date")
+        return cls(index=index, **{f: cols[f] for f in PRICE_FIELDS if f in cols})
+
+    def with_columns(self, **columns) -> "OHLCVSeries":
+        """
+        Same bars plus extra columns (arrays aligned with the bars).
+        """
+        return OHLCVSeries(
+            self.open, self.high, self.low, self.close, self.volume,
+            index=self.index, extra=dict(self.extra, **columns),
+        )
+
+    # ==================================================
+    # ACCESS
+    # ==================================================
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return self._slice(key)
+
+        if key in PRICE_FIELDS:
+            values = getattr(self, key)
+            if values is not None:
+                return values
+        elif key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __contains__(self, name) -> bool:
+        if name in PRICE_FIELDS:
+            return getattr(self, name) is not None
+        return name in self.extra
+
+    def __len__(self) -> int:
+        for name in ("close", "open", "high", "low", "volume"):
+            values = getattr(self, name)
+            if values is not None:
+                return len(values)
+        return 0
+
+    def __repr__(self) -> str:
+        return f"OHLCVSeries(bars={len(self)}, columns={self.columns})"
+
+    @property
+    def columns(self) -> list:
+        return [f for f in PRICE_FIELDS if getattr(self, f) is not None] + list(self.extra)
+
+    @property
+    def empty(self) -> bool:
+        return len(self) == 0
+
+    def last(self, name: str) -> float:
+        return float(self[name][-1])
+
+    def label(self, pos: int = -1) -> str:
+        """
+        Index label of bar `pos` as text (report "date" fields).
+        """
+        if self.index is None or not len(self.index):
+            return ""
+        return str(self.index[pos])
+
+    # ==================================================
+    # SLICING (views)
+    # ==================================================
+    def tail(self, n: int) -> "OHLCVSeries":
+        return self._slice(slice(max(len(self) - n, 0), None))
+
+    def window(self, start: int, stop: int = None) -> "OHLCVSeries":
+        return self._slice(slice(start, stop))
+
+    def _slice(self, key: slice) -> "OHLCVSeries":
+        return OHLCVSeries(
+            *(None if values is None else values[key]
+              for values in (self.open, self.high, self.low, self.close, self.volume)),
+            index=None if self.index is None else self.index[key],
+            extra={name: values[key] for name, values in self.extra.items()},
+        )
+
+    # ==================================================
+    # EXPORT
+    # ==================================================
+    def to_frame(self) -> pd.DataFrame:
+        """
+        DataFrame copy — reports / legacy consumers only.
+        """
+        return pd.DataFrame({name: self[name] for name in self.columns}, index=self.index)
+
+
+# -------------------------------------------------
+# HELPERS
+# -------------------------------------------------
+def _column(values):
+    if values is None:
+        return None
+    return np.ascontiguousarray(values, dtype=np.float64)
@@ -0,0 +1,272 @@
+"""
+================================================================================
+Module: rolling_kernels.py
+Description:
+    Rolling-window kernels on NumPy arrays, in two modes:
+    - batch  : whole series at once, O(n) and vectorized; 1-D series or
+               2-D panels (symbols x bars, time on the last axis)
+    - stream : O(1) (amortized) update per bar for live / tick paths
+    Max / min use block prefix-suffix maxima (van Herk / Gil-Werman) in
+    batch mode and a monotonic deque when streaming; the mean uses
+    shifted running sums. Warm-up bars are NaN, as in
+    indicator_kernels.py.
+Usage:
+    from utils.rolling_kernels import rolling_max, rolling_mean, swing_pivots
+    from utils.rolling_kernels import RollingMax
+================================================================================
+"""
+from collections import deque
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+NAN = float("nan")
+
+
+def _as_2d(x):
+    arr = np.asarray(x, dtype=np.float64)
+    return arr[np.newaxis, :] if arr.ndim == 1 else arr
+
+
+def _shape_like(out, x):
+    return out[0] if np.ndim(x) == 1 else out
+
+
+def _check_window(window: int):
+    if window < 1:
+        raise ValueError(f"Rolling window must be >= 1, got {window}")
+
+
+# ================================================================================
+# BATCH: MAX / MIN / ARGMAX
+# ================================================================================
+def _rolling_extreme(x, window: int, ufunc, pad_value: float):
+    """
+    Window [s, t] never spans more than two blocks of `window` bars:
+    result = ufunc(suffix of s's block from s, prefix of t's block to t).
+    A NaN inside the window gives NaN (same as pandas rolling).
+    """
+    _check_window(window)
+    x2 = _as_2d(x)
+    rows, n = x2.shape
+    out = np.full(x2.shape, np.nan)
+    if n < window:
+        return _shape_like(out, x)
+    if window == 1:
+        out[:] = x2
+        return _shape_like(out, x)
+
+    pad = (-n) % window
+    padded = np.concatenate((x2, np.full((rows, pad), pad_value)), axis=1)
+    blocks = padded.reshape(rows, -1, window)
+
+    prefix = ufunc.accumulate(blocks, axis=2).reshape(rows, -1)
+    suffix = ufunc.accumulate(blocks[:, :, ::-1], axis=2)[:, :, ::-1].reshape(rows, -1)
+
+    out[:, window - 1:] = ufunc(suffix[:, :n - window + 1], prefix[:, window - 1:n])
+    return _shape_like(out, x)
+
+
+def rolling_max(x, window: int):
+    """
+    Highest value of the last `window` bars (pandas rolling(window).max()).
+    """
+    return _rolling_extreme(x, window, np.maximum, -np.inf)
+
+
+def rolling_min(x, window: int):
+    """
+    Lowest value of the last `window` bars (pandas rolling(window).min()).
+    """
+    return _rolling_extreme(x, window, np.minimum, np.inf)
+
+
+def rolling_argmax(x, window: int):
+    """
+    Bar index (absolute, as float) of the window high; first occurrence
+    on ties. NaN during warm-up.
+    """
+    _check_window(window)
+    x2 = _as_2d(x)
+    n = x2.shape[-1]
+    out = np.full(x2.shape, np.nan)
+    if n >= window:
+        offsets = sliding_window_view(x2, window, axis=-1).argmax(axis=-1)
+        out[:, window - 1:] = offsets + np.arange(n - window + 1)
+    return _shape_like(out, x)
+
+
+def recent_max(x, lookbacks):
+    """
+    (max of the last n values for n in lookbacks) from one reversed
+    running-max pass; NaNs are skipped, n is clipped to the series.
+    """
+    values = np.asarray(x, dtype=np.float64)
+    if not len(values):
+        return tuple(NAN for _ in lookbacks)
+    reach = np.fmax.accumulate(values[::-1])
+    return tuple(float(reach[min(n, len(reach)) - 1]) for n in lookbacks)
+
+
+def recent_min(x, lookbacks):
+    """
+    recent_max() for lows.
+    """
+    values = np.asarray(x, dtype=np.float64)
+    if not len(values):
+        return tuple(NAN for _ in lookbacks)
+    reach = np.fmin.accumulate(values[::-1])
+    return tuple(float(reach[min(n, len(reach)) - 1]) for n in lookbacks)
+
+
+# ================================================================================
+# BATCH: MEAN
+# ================================================================================
+def _window_sums(x2, window: int):
+    """
+    Per-window sum of (x - first value) plus whether the window holds a
+    NaN. Shifting by the first value keeps the running sum small (no
+    cancellation on price levels).
+    """
+    rows, n = x2.shape
+    shift = x2[:, :1]
+    shift = np.where(np.isnan(shift), 0.0, shift)
+
+    d = x2 - shift
+    missing = np.isnan(d)
+    d = np.where(missing, 0.0, d)
+
+    zero = np.zeros((rows, 1))
+    cs = np.concatenate((zero, np.cumsum(d, axis=1)), axis=1)
+    cn = np.concatenate((zero, np.cumsum(missing, axis=1)), axis=1)
+
+    s1 = cs[:, window:] - cs[:, :-window]
+    nans = cn[:, window:] - cn[:, :-window]
+    return shift, s1, nans > 0
+
+
+def rolling_mean(x, window: int):
+    """
+    Mean of the last `window` bars (pandas rolling(window).mean()).
+    """
+    _check_window(window)
+    x2 = _as_2d(x)
+    out = np.full(x2.shape, np.nan)
+    if x2.shape[-1] >= window:
+        shift, s1, has_nan = _window_sums(x2, window)
+        out[:, window - 1:] = np.where(has_nan, np.nan, s1 / window + shift)
+    return _shape_like(out, x)
+
+
+# ================================================================================
+# BATCH: SWING PIVOTS
+# ================================================================================
+def swing_pivots(high, low, left: int = 1, right: int = 1):
+    """
+    (swing_high, swing_low) boolean arrays.
+    Bar i is a swing high when its high is strictly above the `left`
+    bars before AND the `right` bars after it (lows mirrored). The
+    first `left` and last `right` bars can never qualify.
+    """
+    _check_window(left)
+    _check_window(right)
+    return _pivots(_as_2d(high), left, right, rolling_max, np.greater, high), \
+        _pivots(_as_2d(low), left, right, rolling_min, np.less, low)
+
+
+def _pivots(x2, left, right, rolling, beats, like):
+    rows, n = x2.shape
+    out = np.zeros(x2.shape, dtype=bool)
+    if n < left + right + 1:
+        return _shape_like(out, like)
+
+    before = rolling(x2, left)       # [t] = extreme of bars t-left+1 .. t
+    after = rolling(x2, right)
+    centre = slice(left, n - right)
+    with np.errstate(invalid="ignore"):
+        out[:, centre] = (
+            beats(x2[:, centre], before[:, left - 1:n - right - 1])
+            & beats(x2[:, centre], after[:, left + right:])
+        )
+    return _shape_like(out, like)
+
+
+# ================================================================================
+# STREAM: O(1) UPDATE STATES
+# ================================================================================
+class RollingMax:
+    """
+    PURPOSE:
+    - update(x) → max of the last `window` values (NaN in warm-up)
+    - Monotonic deque of (bar, value): amortized O(1) per bar
+    - .argmax → bar number (0-based, since the first update) of the
+      window high, first occurrence on ties
+    """
+
+    def __init__(self, window: int):
+        _check_window(window)
+        self.window = window
+        self.count = 0
+        self._deque = deque()
+
+    def _beats(self, new, old) -> bool:
+        return new > old
+
+    def update(self, x: float) -> float:
+        i = self.count
+        self.count += 1
+
+        candidates = self._deque
+        while candidates and self._beats(x, candidates[-1][1]):
+            candidates.pop()
+        candidates.append((i, x))
+        if candidates[0][0] <= i - self.window:
+            candidates.popleft()
+
+        return candidates[0][1] if self.count >= self.window else NAN
+
+    @property
+    def argmax(self):
+        return self._deque[0][0] if self._deque and self.count >= self.window else None
+
+
+class RollingMin(RollingMax):
+    """
+    RollingMax for lows (.argmax is then the bar of the window low).
+    """
+
+    def _beats(self, new, old) -> bool:
+        return new < old
+
+
+class SwingPivotTracker:
+    """
+    PURPOSE:
+    - update(high, low) → (swing_high, swing_low) for the bar `right`
+      bars back, the newest bar whose pivot status is now final
+    - Same rule as swing_pivots(); O(left + right) per bar
+    """
+
+    def __init__(self, left: int = 1, right: int = 1):
+        _check_window(left)
+        _check_window(right)
+        self.left = left
+        self.right = right
+        self._highs = deque(maxlen=left + right + 1)
+        self._lows = deque(maxlen=left + right + 1)
+
+    def update(self, high: float, low: float):
+        self._highs.append(high)
+        self._lows.append(low)
+        if len(self._highs) < self.left + self.right + 1:
+            return False, False
+
+        return (
+            _is_pivot(list(self._highs), self.left, lambda a, b: a > b),
+            _is_pivot(list(self._lows), self.left, lambda a, b: a < b),
+        )
+
+
+def _is_pivot(window, left, beats) -> bool:
+    centre = window[left]
+    return all(beats(centre, v) for i, v in enumerate(window) if i != left)
@@ -3,16 +3,14 @@
 Module: symbol_resolver.py
 Description:
     Resolves holdings symbols to Angel One required format (symbol, token, exchange)
-    using NSEEQTYdata.json and instruments stored in SQLite (DhanDBHelper).
+    using the shared instrument index (NSEEQTYdata.json / symbolnamemaster.json)
+    and instruments stored in SQLite (DhanDBHelper).
 Usage:
     from utils.symbol_resolver import SymbolResolver
 ================================================================================
 """
-import os
-import json
 from utils.logger import get_logger
-from config.settings import NSE_EQTY_FILE, MASTERDATA_DIR
-from db.dhan_db_helper import DhanDBHelper   # ✅ use DB instead of JSON
+from utils.instrument_index import get_instrument_index
 
 logger = get_logger(__name__)
 
@@ -21,26 +19,36 @@ logger = get_logger(__name__)
 # ================================================================================
 class SymbolResolver:
     """
-    Reads instruments from SQLite and NSE token data to resolve trading symbols 
-    for Angel One.
+    Resolves trading symbols for Angel One via the process-wide
+    instrument index (O(1) dict lookups, masters parsed once).
 
     Attributes:
-        holdings (list): List of holdings read from instruments (SQLite).
-        nse_data (list): List of token info from NSEEQTYdata.json.
+        index (TradeFriendInstrumentIndex): Shared instrument index.
+        holdings (list): Instruments from SQLite (loaded on first use).
     """
 
     # ------------------------------------------------------------------------
     def __init__(self):
         """
-        Initialize SymbolResolver with holdings (from DB) and NSE token mapping.
+        Cheap: no file or DB access until a lookup needs it.
         """
-        # ✅ Fetch holdings directly from DB
-        self.db = DhanDBHelper()
-        self.holdings = self.db.get_all() or []
+        self.index = get_instrument_index()
+        self._db = None
+        self._holdings = None
 
-        # Load NSE token master
-        with open(NSE_EQTY_FILE, "r") as f:
-            self.nse_data = json.load(f)
+    # ------------------------------------------------------------------------
+    @property
+    def db(self):
+        if self._db is None:
+            from db.dhan_db_helper import DhanDBHelper
+            self._db = DhanDBHelper()
+        return self._db
+
+    @property
+    def holdings(self):
+        if self._holdings is None:
+            self._holdings = self.db.get_all() or []
+        return self._holdings
 
     # ------------------------------------------------------------------------
     def resolve_all(self):
@@ -59,18 +67,12 @@ class SymbolResolver:
             if not name:
                 continue
 
-            symbol_eq = f"{name}-EQ" if not name.endswith("-EQ") else name
-            token_info = next((x for x in self.nse_data if x["symbol"] == symbol_eq), None)
-
-            if not token_info:
-                logger.error(f"Token not found for {symbol_eq}, skipping.")
+            resolved = self.index.resolve(name)
+            if not resolved:
+                logger.error(f"Token not found for {name}, skipping.")
                 continue
 
-            resolved_list.append({
-                "symbol": symbol_eq,
-                "token": token_info["token"],
-                "exchange": token_info.get("exch_seg", "NSE")
-            })
+            resolved_list.append(resolved)
 
         logger.info(f"Resolved {len(resolved_list)} symbols for Angel One.")
         return resolved_list
@@ -84,28 +86,28 @@ class SymbolResolver:
             symbol_name (str): Name of the symbol, e.g., 'CSLFINANCE'
 
         Returns:
-            dict | None: {symbol, token, exchange} or None if not found
+            dict | None: {symbol, token, exchange, trading_symbol} or None if not found
         """
         if not symbol_name:
             return None
 
-        # Normalize: append -EQ only if not already there
-        symbol_eq = f"{symbol_name}-EQ" if not symbol_name.endswith("-EQ") else symbol_name
-
-        token_info = next((x for x in self.nse_data if x["symbol"] == symbol_eq), None)
-        if not token_info:
-            logger.error(f"Token not found for {symbol_eq}")
+        resolved = self.index.resolve(symbol_name)
+        if not resolved:
+            logger.error(f"Token not found for {symbol_name}")
             return None
 
-        resolved = {
-            "symbol": symbol_eq,
-            "token": token_info["token"],
-            "exchange": token_info.get("exch_seg", "NSE"),
-            "trading_symbol": symbol_eq,
-        }
-        logger.info(f"Resolved symbol: {resolved}")
+        resolved["trading_symbol"] = resolved["symbol"]
+        logger.debug(f"Resolved symbol: {resolved}")
         return resolved
 
+    # ------------------------------------------------------------------------
+    def get_token(self, trading_symbol: str):
+        """
+        Trading symbol (with or without -EQ) → token, or None.
+        """
+        resolved = self.index.resolve(trading_symbol)
+        return resolved["token"] if resolved else None
+
     # ---------------------------------------------------------------------
     # Formatter for resolve_symbol
     # ---------------------------------------------------------------------
@@ -113,14 +115,7 @@ class SymbolResolver:
         """
         Resolve Trading Symbol (already with -EQ) → Token from NSEEQTYdata.json.
         """
-        nse_file = os.path.join(MASTERDATA_DIR, "NSEEQTYdata.json")
-        if not os.path.exists(nse_file):
-            raise FileNotFoundError("NSEEQTYdata.json missing")
-
-        with open(nse_file, "r") as f:
-            nse_data = json.load(f)
-
-        token_info = next((item for item in nse_data if item.get("symbol") == trading_symbol), None)
+        token_info = self.index.by_symbol(trading_symbol)
         token = token_info.get("token") if token_info else None
 
         return {
@@ -128,10 +123,11 @@ class SymbolResolver:
             "trading_symbol": trading_symbol,
             "token": token
         }
+
     # ---------------------------------------------------------------------
     # extract symbol objects
     # ---------------------------------------------------------------------
-    
+    @staticmethod
     def extract_symbol_objects(result: dict):
         """
         Extract all tradingsymbols ending with -EQ or -SQ
@@ -168,38 +164,22 @@ class SymbolResolver:
     def get_symbol_tradefinder(self, name):
         """
         Resolve Trading Symbol (SEM_CUSTOM_SYMBOL → SEM_TRADING_SYMBOL) from symbolnamemaster.json.
+        Exact custom name first, then the first custom name containing it.
         """
-        master_file = os.path.join(MASTERDATA_DIR, "symbolnamemaster.json")
-        if not os.path.exists(master_file):
-            raise FileNotFoundError("symbolnamemaster.json missing in masterdata folder")
-
-        with open(master_file, "r") as f:
-            master_data = json.load(f)
-
-        # Find the matching item
         logger.info(f"Entered into get_symbol_tradefinder with value {name}")
 
-        match = next(
-                (item for item in master_data if name.lower() in item["SEM_CUSTOM_SYMBOL"].lower()), 
-                None
-            )
+        match = self.index.by_custom_name(name, partial=True)
         if match:
-            logger.info(f"Found  into get_symbol_tradefinder with value { match["SEM_TRADING_SYMBOL"]}")
+            logger.info(f"Found  into get_symbol_tradefinder with value {match['SEM_TRADING_SYMBOL']}")
             return {"trading_symbol": match["SEM_TRADING_SYMBOL"]}
         return None
     
     @staticmethod
-    def search_by_name(self, query):
+    def search_by_name(query):
         """
         Return a list of SEM_CUSTOM_SYMBOLs matching partial query (for dropdown suggestions)
         """
-        master_file = os.path.join(MASTERDATA_DIR, "symbolnamemaster.json")
-        if not os.path.exists(master_file):
+        try:
+            return get_instrument_index().search_custom(query, limit=20)
+        except FileNotFoundError:
             return []
-
-        with open(master_file, "r") as f:
-            master_data = json.load(f)
-
-        # Return top matches containing query (case-insensitive)
-        results = [item["SEM_CUSTOM_SYMBOL"] for item in master_data if query.lower() in item["SEM_CUSTOM_SYMBOL"].lower()]
-        return results[:20]  # limit top 20 suggestions
\ No newline at end of file
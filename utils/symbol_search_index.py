@@ -0,0 +1,158 @@
+"""
+================================================================================
+Module: symbol_search_index.py
+Description:
+    In-memory trigram + word-prefix index for symbol / company-name
+    autocomplete. Returns ranked top-k matches without scanning the corpus.
+Usage:
+    from utils.symbol_search_index import TradeFriendSymbolSearchIndex
+================================================================================
+"""
+import re
+import heapq
+from collections import defaultdict
+
+# Queries shorter than this use the word-prefix table, longer ones trigrams
+TRIGRAM = 3
+
+_WORD_RE = re.compile(r"[a-z0-9&]+")
+
+# Rank buckets (lower is better)
+RANK_EXACT = 0
+RANK_PREFIX = 1
+RANK_WORD_PREFIX = 2
+RANK_SUBSTRING = 3
+
+
+def _trigrams(text: str):
+    return {text[i:i + TRIGRAM] for i in range(len(text) - TRIGRAM + 1)}
+
+
+# ================================================================================
+# CLASS: TradeFriendSymbolSearchIndex
+# ================================================================================
+class TradeFriendSymbolSearchIndex:
+    """
+    PURPOSE:
+    - Case-insensitive substring search over a fixed list of labels
+      (ranked search: 1-2 character queries match word starts only)
+    - filter_ids(): plain substring FILTER in original order (tables,
+      DB search) — short queries fall back to a linear scan
+    - Postings: trigram -> ids, word-prefix (1-2 chars) -> ids
+    - Candidates = intersection of the query's postings (rarest first),
+      verified with a plain `in` check → exact substring semantics
+    - Ranking: exact > starts-with > word starts-with > contains,
+      then shorter label, then original order
+
+    ENTRIES:
+    - labels   : strings searched / returned
+    - payloads : optional objects returned alongside (same order)
+    """
+
+    def __init__(self, labels, payloads=None):
+        self.labels = list(labels)
+        self.payloads = list(payloads) if payloads is not None else self.labels
+        self._lowered = [label.lower() for label in self.labels]
+
+        trigrams = defaultdict(list)
+        prefixes = defaultdict(list)
+        for i, text in enumerate(self._lowered):
+            for gram in _trigrams(text):
+                trigrams[gram].append(i)
+
+            starts = set()
+            for word in _WORD_RE.findall(text):
+                starts.update(word[:n] for n in range(1, TRIGRAM))
+            starts.update(text[:n] for n in range(1, TRIGRAM))
+            for prefix in starts:
+                prefixes[prefix].append(i)
+
+        # Ids were appended in ascending order → postings are sorted
+        self._trigrams = dict(trigrams)
+        self._prefixes = dict(prefixes)
+
+    def __len__(self):
+        return len(self.labels)
+
+    # --------------------------------------------------
+    # CANDIDATES
+    # --------------------------------------------------
+    def _candidates(self, query: str):
+        if len(query) < TRIGRAM:
+            return self._prefixes.get(query, ())
+
+        postings = []
+        for gram in _trigrams(query):
+            ids = self._trigrams.get(gram)
+            if not ids:
+                return ()
+            postings.append(ids)
+
+        postings.sort(key=len)
+        candidates = postings[0]
+        for ids in postings[1:]:
+            if len(candidates) < 64:
+                break    # few enough → the substring check below is cheaper
+            keep = set(ids)
+            candidates = [i for i in candidates if i in keep]
+        return candidates
+
+    def _rank(self, i: int, query: str):
+        text = self._lowered[i]
+        pos = text.find(query)
+        if pos < 0:
+            return None
+        if text == query:
+            bucket = RANK_EXACT
+        elif pos == 0:
+            bucket = RANK_PREFIX
+        elif not text[pos - 1].isalnum():
+            bucket = RANK_WORD_PREFIX
+        else:
+            bucket = RANK_SUBSTRING
+        return bucket, len(text), i
+
+    # --------------------------------------------------
+    # SEARCH
+    # --------------------------------------------------
+    def search_ids(self, query: str, limit: int = 20) -> list:
+        query = (query or "").strip().lower()
+        if not query:
+            return []
+
+        ranked = (self._rank(i, query) for i in self._candidates(query))
+        ranked = [r for r in ranked if r is not None]
+        if limit is None:
+            ranked.sort()
+        else:
+            ranked = heapq.nsmallest(limit, ranked)
+        return [r[2] for r in ranked]
+
+    def filter_ids(self, query: str) -> list:
+        """
+        Ids of every label containing `query`, in original order.
+        """
+        query = (query or "").strip().lower()
+        if not query:
+            return list(range(len(self.labels)))
+        if len(query) < TRIGRAM:
+            # Prefix postings only cover word starts → scan
+            return [i for i, text in enumerate(self._lowered) if query in text]
+        # Trigram candidates are ascending ids → order preserved
+        return [i for i in self._candidates(query) if query in self._lowered[i]]
+
+    def search(self, query: str, limit: int = 20) -> list:
+        """
+        Ranked labels containing `query` (limit=None → all matches).
+        """
+        return [self.labels[i] for i in self.search_ids(query, limit)]
+
+    def search_payloads(self, query: str, limit: int = 20) -> list:
+        return [self.payloads[i] for i in self.search_ids(query, limit)]
+
+    def best(self, query: str):
+        """
+        Payload of the top-ranked match, or None.
+        """
+        ids = self.search_ids(query, 1)
+        return self.payloads[ids[0]] if ids else None